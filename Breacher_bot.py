@@ -15,7 +15,7 @@ from selenium.webdriver.common.keys import Keys
 import random
 import logging
 from urllib.parse import urlparse
-import aiohttp
+from http_client import get_http_client
 
 # Fix for "RuntimeError: There is no current event loop"
 if sys.platform == 'win32':
@@ -27,7 +27,8 @@ class DynamicScraperBot:
         self.user_agent = self.get_random_user_agent()
         self.working_proxies = []
         self.current_proxy = None
-        asyncio.run(self.initialize_proxies())
+        self.http = get_http_client(self.user_agent)
+        asyncio.run(self._bootstrap_proxies())
         self.headers = {
             "User-Agent": self.user_agent,
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -105,7 +106,7 @@ class DynamicScraperBot:
 
     async def cleanup(self):
         """Cleanup resources."""
-        pass
+        await self.http.close()
 
     def init_logging(self):
         """Initialize logging."""
@@ -127,6 +128,13 @@ class DynamicScraperBot:
         except Exception:
             return "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
+    async def _bootstrap_proxies(self):
+        """Run initialize_proxies on its own loop, closing the sessions bound to it."""
+        try:
+            await self.initialize_proxies()
+        finally:
+            await self.http.close()
+
     async def initialize_proxies(self):
         """Asynchronously initialize working proxies."""
         try:
@@ -136,37 +144,35 @@ class DynamicScraperBot:
                 'https://raw.githubusercontent.com/monosans/proxy-list/main/proxies/http.txt'
             ]
             
-            async with aiohttp.ClientSession() as session:
-                for url in proxy_urls:
-                    try:
-                        async with session.get(url, timeout=10) as response:
-                            if response.status == 200:
-                                proxies = await response.text()
-                                for proxy in proxies.split('\n'):
-                                    proxy = proxy.strip()
-                                    if proxy and self.is_valid_proxy(proxy):
-                                        # Validate proxy more thoroughly
-                                        if await self.test_proxy(session, proxy):
-                                            self.working_proxies.append(proxy)
-                    except Exception as e:
-                        logging.warning(f"Error fetching proxies from {url}: {e}")
-                
-                # Select a random proxy if available
-                if self.working_proxies:
-                    self.current_proxy = random.choice(self.working_proxies)
-                    logging.info(f"Selected proxy: {self.current_proxy}")
-                    logging.info(f"Total working proxies: {len(self.working_proxies)}")
-                else:
-                    logging.warning("No working proxies found. Continuing without proxy.")
+            for url in proxy_urls:
+                try:
+                    response = await self.http.get(url, timeout=10, limited=False)
+                    if response.status == 200:
+                        proxies = response.text
+                        for proxy in proxies.split('\n'):
+                            proxy = proxy.strip()
+                            if proxy and self.is_valid_proxy(proxy):
+                                # Validate proxy more thoroughly
+                                if await self.test_proxy(proxy):
+                                    self.working_proxies.append(proxy)
+                except Exception as e:
+                    logging.warning(f"Error fetching proxies from {url}: {e}")
+            
+            # Select a random proxy if available
+            if self.working_proxies:
+                self.current_proxy = random.choice(self.working_proxies)
+                logging.info(f"Selected proxy: {self.current_proxy}")
+                logging.info(f"Total working proxies: {len(self.working_proxies)}")
+            else:
+                logging.warning("No working proxies found. Continuing without proxy.")
         except Exception as e:
             logging.error(f"Proxy initialization failed: {e}")
 
-    async def test_proxy(self, session, proxy):
+    async def test_proxy(self, proxy):
         """
         Test if a proxy is working by making a quick request.
         
         Args:
-            session (aiohttp.ClientSession): Active client session
             proxy (str): Proxy URL to test
         
         Returns:
@@ -178,8 +184,8 @@ class DynamicScraperBot:
             
             # Configure proxy for the request
             proxy_url = f'http://{proxy}'
-            async with session.get(test_url, proxy=proxy_url, timeout=5) as response:
-                return response.status == 200
+            response = await self.http.get(test_url, proxy=proxy_url, timeout=5, limited=False)
+            return response.status == 200
         except Exception as e:
             logging.debug(f"Proxy {proxy} failed test: {e}")
             return False
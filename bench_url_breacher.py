@@ -0,0 +1,341 @@
+"""Micro-benchmarks for URLBreacher hot paths.
+
+Fixture pages are saved listing pages named `<site>_<anything>.html`
+(e.g. `amazon_electronics_p1.html`) so the site selectors can be picked
+from the file name.
+
+Usage:
+    python bench_url_breacher.py harvest fixtures/
+    python bench_url_breacher.py classify --count 1000000
+    python bench_url_breacher.py parsers fixtures/
+    python bench_url_breacher.py store --count 1000000
+    python bench_url_breacher.py canonicalize --count 1000000
+    python bench_url_breacher.py readiness https://www.amazon.com/s?k=laptop
+"""
+import argparse
+import asyncio
+import glob
+import os
+import random
+import re
+import time
+import tracemalloc
+
+
+def load_fixtures(fixture_dir):
+    """Return (site_type, name, html) for every saved page in `fixture_dir`."""
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, '*.html'))):
+        name = os.path.basename(path)
+        site_type = name.split('_', 1)[0]
+        with open(path, encoding='utf-8', errors='replace') as f:
+            fixtures.append((site_type, name, f.read()))
+    if not fixtures:
+        raise SystemExit(f"No *.html fixtures found in {fixture_dir}")
+    return fixtures
+
+
+def report(label, timings, items):
+    total = sum(timings)
+    print(f"{label:<28} {total * 1000:10.1f} ms total  {total / len(timings) * 1000:8.2f} ms/page  {items} links")
+
+
+async def _legacy_harvest(page, product_selectors, link_selectors):
+    """The per-element query_selector/get_attribute path harvest_links replaced."""
+    hrefs = []
+    for product_selector in product_selectors:
+        for product in await page.query_selector_all(product_selector):
+            for link_selector in link_selectors:
+                link = await product.query_selector(link_selector)
+                if link:
+                    url = await link.get_attribute('href')
+                    if url:
+                        hrefs.append(url)
+    return hrefs
+
+
+async def bench_harvest(fixture_dir, rounds=3):
+    """Compare per-element link harvesting against the single evaluate call."""
+    from browser_pool import BrowserPool
+    from url_breacher import SITE_SELECTORS, URLBreacher
+
+    # Skip __init__ so no proxies are fetched; harvest_links needs no instance state
+    breacher = URLBreacher.__new__(URLBreacher)
+    fixtures = load_fixtures(fixture_dir)
+
+    async with BrowserPool(size=1) as pool:
+        async with pool.lease_page() as page:
+            legacy, bulk = [], []
+            legacy_links = bulk_links = 0
+            for _ in range(rounds):
+                for site_type, name, html in fixtures:
+                    selectors = SITE_SELECTORS.get(site_type, SITE_SELECTORS['generic'])
+                    product_selectors, link_selectors = selectors['product'], selectors['link']
+                    await page.set_content(html)
+
+                    start = time.perf_counter()
+                    hrefs = await _legacy_harvest(page, product_selectors, link_selectors)
+                    legacy.append(time.perf_counter() - start)
+                    legacy_links += len(hrefs)
+
+                    start = time.perf_counter()
+                    harvest = await breacher.harvest_links(page, product_selectors, link_selectors)
+                    bulk.append(time.perf_counter() - start)
+                    bulk_links += len(harvest['hrefs'])
+
+    report('query_selector per element', legacy, legacy_links)
+    report('single evaluate', bulk, bulk_links)
+
+
+def synthetic_urls(count, seed=0):
+    """Generate a mix of product, category, pagination and other URLs."""
+    return list(iter_synthetic_urls(count, seed))
+
+
+def iter_synthetic_urls(count, seed=0):
+    """Lazy synthetic_urls, so a store under test is the only thing holding the strings."""
+    rng = random.Random(seed)
+    shapes = [
+        'https://www.noon.com/uae-en/item-{n}/N{n}A/p/?o={n}',
+        'https://uae.sharafdg.com/p/{n}/',
+        'https://www.alibaba.com/product/{n}-{n}.html',
+        'https://www.amazon.in/dp/B0{n:08d}?ref=sr_1_{n}',
+        'https://www.example.com/category/shoes?page={n}',
+        'https://www.example.com/collection/summer/',
+        'https://www.example.com/blog/post-{n}',
+        'https://www.example.com/help/contact?utm_source={n}',
+    ]
+    for _ in range(count):
+        yield rng.choice(shapes).format(n=rng.randrange(10 ** 8))
+
+
+def _legacy_classify(url, patterns):
+    """The per-call re.search loops the URLClassifier replaced."""
+    lowered = url.lower()
+    return frozenset(
+        label for label, label_patterns in patterns.items()
+        if any(re.search(pattern, lowered) for pattern in label_patterns)
+    )
+
+
+def bench_classify(count, batch=200):
+    """Compare per-pattern re.search loops with the precompiled classifier."""
+    from url_classifier import DEFAULT_PATTERNS, URLClassifier
+
+    urls = synthetic_urls(count)
+    # Site patterns are left out so every path applies the same rule set
+    classifier = URLClassifier(site_patterns={})
+
+    start = time.perf_counter()
+    legacy = [_legacy_classify(url, DEFAULT_PATTERNS) for url in urls]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [classifier.classify(url) for url in urls]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = []
+    for i in range(0, len(urls), batch):
+        batched.extend(classifier.classify_many(urls[i:i + batch]))
+    batched_time = time.perf_counter() - start
+
+    assert legacy == single == batched, "classifier disagrees with the legacy patterns"
+    for label, elapsed in (('legacy re.search loops', legacy_time),
+                           ('URLClassifier.classify', single_time),
+                           (f'classify_many (batch={batch})', batched_time)):
+        print(f"{label:<28} {elapsed:8.2f} s  {count / elapsed:12,.0f} URLs/s  "
+              f"{legacy_time / elapsed:5.1f}x")
+
+
+def _legacy_extract(html):
+    """The BeautifulSoup select-per-pair plus find_all('a') pass extract_urls replaced."""
+    from bs4 import BeautifulSoup
+    from url_breacher import SITE_SELECTORS
+
+    def run(site_type):
+        soup = BeautifulSoup(html, 'html.parser')
+        selectors = SITE_SELECTORS.get(site_type, SITE_SELECTORS['generic'])
+        site_links = []
+        for product_selector in selectors['product']:
+            for product in soup.select(product_selector):
+                for link_selector in selectors['link']:
+                    site_links.extend(link.get('href') for link in product.select(link_selector) if link.get('href'))
+        return site_links, [link['href'] for link in soup.find_all('a', href=True)]
+    return run
+
+
+def bench_parsers(fixture_dir, rounds=3):
+    """Compare HTML parser backends on saved listing pages."""
+    from html_parsers import available_backends, get_parser_backend, iter_hrefs
+    from url_breacher import SITE_SELECTORS
+
+    fixtures = load_fixtures(fixture_dir)
+
+    timings, links = [], 0
+    for _ in range(rounds):
+        for site_type, name, html in fixtures:
+            start = time.perf_counter()
+            site_links, all_links = _legacy_extract(html)(site_type)
+            timings.append(time.perf_counter() - start)
+            links += len(site_links) + len(all_links)
+    report('legacy BeautifulSoup', timings, links)
+
+    for backend_name in available_backends():
+        backend = get_parser_backend(backend_name)
+        timings, links = [], 0
+        for _ in range(rounds):
+            for site_type, name, html in fixtures:
+                selectors = SITE_SELECTORS.get(site_type, SITE_SELECTORS['generic'])
+                start = time.perf_counter()
+                site_links = backend.select_hrefs(html, selectors['product'], selectors['link'])
+                all_links = list(iter_hrefs(html))
+                timings.append(time.perf_counter() - start)
+                links += len(site_links) + len(all_links)
+        report(f'{backend_name} + href tokenizer', timings, links)
+
+
+def bench_store(count, lookups=200000):
+    """Compare memory and throughput of plain URL sets with the compact URL stores."""
+    from url_store import CompactURLSet
+
+    stores = (
+        ('set of URL strings', set),
+        ('CompactURLSet (hash)', lambda: CompactURLSet(track_new=False)),
+        ('CompactURLSet (bloom)', lambda: CompactURLSet(capacity=count, bloom=True, track_new=False)),
+    )
+
+    # Time spent generating URLs is subtracted from every measurement
+    start = time.perf_counter()
+    for _ in iter_synthetic_urls(count):
+        pass
+    generate_time = time.perf_counter() - start
+    lookup_generate_time = generate_time * lookups / count
+
+    print(f"{count:,} URLs, {lookups:,} hit and {lookups:,} miss lookups")
+    for label, factory in stores:
+        tracemalloc.start()
+        store = factory()
+        for url in iter_synthetic_urls(count):
+            store.add(url)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del store
+
+        store = factory()
+        start = time.perf_counter()
+        for url in iter_synthetic_urls(count):
+            store.add(url)
+        add_time = max(time.perf_counter() - start - generate_time, 1e-9)
+
+        start = time.perf_counter()
+        hits = sum(url in store for url in iter_synthetic_urls(lookups))
+        hit_time = max(time.perf_counter() - start - lookup_generate_time, 1e-9)
+        start = time.perf_counter()
+        false_hits = sum(url in store for url in iter_synthetic_urls(lookups, seed=1))
+        miss_time = max(time.perf_counter() - start - lookup_generate_time, 1e-9)
+
+        print(f"{label:<24} {retained / 2 ** 20:9.1f} MiB  {retained / len(store):6.1f} B/URL  "
+              f"peak {peak / 2 ** 20:7.1f} MiB  add {count / add_time:10,.0f}/s  "
+              f"hit {lookups / hit_time:10,.0f}/s  miss {lookups / miss_time:10,.0f}/s  "
+              f"({hits:,} hits, {false_hits:,} hits in a fresh sample)")
+        del store
+
+
+def bench_canonicalize(count):
+    """Canonicalization throughput (cold and memoized) and how many duplicates it collapses."""
+    from url_canonicalizer import URLCanonicalizer
+
+    urls = synthetic_urls(count)
+    # Re-render each URL with tracking noise a crawl would pick up from different pages
+    noisy = [f"{url}{'&' if '?' in url else '?'}utm_campaign=c{i % 7}#top" for i, url in enumerate(urls)]
+
+    canonicalizer = URLCanonicalizer(cache_size=0)
+    start = time.perf_counter()
+    canonical = canonicalizer.canonicalize_many(noisy)
+    cold_time = time.perf_counter() - start
+
+    canonicalizer = URLCanonicalizer(cache_size=count)
+    canonicalizer.canonicalize_many(noisy)
+    start = time.perf_counter()
+    canonicalizer.canonicalize_many(noisy)
+    warm_time = time.perf_counter() - start
+
+    print(f"{count:,} URLs: {len(set(noisy)):,} distinct raw, {len(set(canonical)):,} distinct canonical")
+    for label, elapsed in (('canonicalize_many (cold)', cold_time), ('canonicalize_many (memoized)', warm_time)):
+        print(f"{label:<30} {elapsed:8.3f}s  {count / elapsed:12,.0f} URLs/s")
+
+
+async def bench_readiness(urls, rounds=2):
+    """Time loading live listing pages to network idle vs to their readiness condition."""
+    from browser_pool import BrowserPool
+    from readiness import ReadinessEngine
+    from url_breacher import SITE_SELECTORS, URLBreacher
+
+    # Skip __init__; detect_site_type needs no instance state
+    breacher = URLBreacher.__new__(URLBreacher)
+    engine = ReadinessEngine(SITE_SELECTORS)
+    idle, ready = [], []
+    async with BrowserPool(size=1) as pool:
+        for _ in range(rounds):
+            for url in urls:
+                site_type = breacher.detect_site_type(url)
+                async with pool.lease_page(profile='links-only') as page:
+                    start = time.perf_counter()
+                    await page.goto(url, wait_until='networkidle', timeout=60000)
+                    idle.append(time.perf_counter() - start)
+                async with pool.lease_page(profile='links-only') as page:
+                    start = time.perf_counter()
+                    await page.goto(url, wait_until='domcontentloaded', timeout=60000)
+                    await engine.wait(page, site_type, 'load')
+                    ready.append(time.perf_counter() - start)
+
+    report('networkidle', idle, 0)
+    report('readiness condition', ready, 0)
+    print(f"Saved {sum(idle) - sum(ready):.1f}s over {len(ready)} loads; readiness waits: {engine.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='bench', required=True)
+
+    harvest = sub.add_parser('harvest', help='bulk link harvesting vs per-element queries')
+    harvest.add_argument('fixture_dir')
+    harvest.add_argument('--rounds', type=int, default=3)
+
+    classify = sub.add_parser('classify', help='URL classification throughput')
+    classify.add_argument('--count', type=int, default=1000000)
+    classify.add_argument('--batch', type=int, default=200)
+
+    parsers = sub.add_parser('parsers', help='HTML parser backends for extract_urls')
+    parsers.add_argument('fixture_dir')
+    parsers.add_argument('--rounds', type=int, default=3)
+
+    store = sub.add_parser('store', help='URL set memory and throughput')
+    store.add_argument('--count', type=int, default=1000000)
+    store.add_argument('--lookups', type=int, default=200000)
+
+    canonicalize = sub.add_parser('canonicalize', help='URL canonicalization throughput and dedupe')
+    canonicalize.add_argument('--count', type=int, default=1000000)
+
+    readiness = sub.add_parser('readiness', help='network idle vs readiness conditions on live pages')
+    readiness.add_argument('urls', nargs='+')
+    readiness.add_argument('--rounds', type=int, default=2)
+
+    args = parser.parse_args()
+    if args.bench == 'harvest':
+        asyncio.run(bench_harvest(args.fixture_dir, args.rounds))
+    elif args.bench == 'classify':
+        bench_classify(args.count, args.batch)
+    elif args.bench == 'parsers':
+        bench_parsers(args.fixture_dir, args.rounds)
+    elif args.bench == 'store':
+        bench_store(args.count, args.lookups)
+    elif args.bench == 'canonicalize':
+        bench_canonicalize(args.count)
+    elif args.bench == 'readiness':
+        asyncio.run(bench_readiness(args.urls, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
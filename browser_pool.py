@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from request_profiles import get_profile
+
+logger = logging.getLogger(__name__)
+
+# Stealth script injected into every leased context
+STEALTH_INIT_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+    Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+    Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
+    window.chrome = { runtime: {} };
+"""
+
+DEFAULT_LAUNCH_ARGS = [
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-gpu',
+]
+
+
+class _PooledBrowser:
+    """Book-keeping for one warm browser in the pool."""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.launched_at = time.monotonic()
+        self.pages_served = 0
+        self.active_leases = 0
+        self.retiring = False
+
+    def is_healthy(self):
+        return self.browser.is_connected() and not self.retiring
+
+
+class PageLease:
+    """A leased context/page pair. Call `release()` (or use `async with`) when done."""
+
+    def __init__(self, pool, entry, context, page=None, interception=None):
+        self._pool = pool
+        self._entry = entry
+        self.context = context
+        self.page = page
+        self.interception = interception
+        self._released = False
+
+    def blocked_stats(self):
+        """Requests blocked and estimated bytes saved on this lease's page."""
+        if self.interception is None:
+            return None
+        return self.interception.for_page(self.page) if self.page else self.interception.totals()
+
+    async def release(self):
+        if self._released:
+            return
+        self._released = True
+        saved = self.blocked_stats()
+        if saved and saved['requests']:
+            logger.info(f"Profile {self.interception.profile_name}: blocked {saved['requests']} requests "
+                        f"(~{saved['bytes'] / 1024:.0f} KiB saved)")
+        try:
+            await self.context.close()
+        except Exception as e:
+            logger.debug(f"Error closing leased context: {e}")
+        await self._pool._release(self._entry)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.release()
+
+
+class BrowserPool:
+    """Keeps N warm Chromium browsers and hands out fresh contexts or pages.
+
+    Browsers are recycled after serving `max_pages_per_browser` leases, when the
+    combined Chromium memory exceeds `max_memory_mb` (requires psutil), or when
+    they disconnect.
+    """
+
+    def __init__(self, size=2, max_pages_per_browser=200, max_memory_mb=None,
+                 max_leases_per_browser=8, headless=True, launch_args=None,
+                 default_timeout=30000, context_options=None):
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_memory_mb = max_memory_mb
+        self.max_leases_per_browser = max_leases_per_browser
+        self.headless = headless
+        self.launch_args = launch_args or list(DEFAULT_LAUNCH_ARGS)
+        self.default_timeout = default_timeout
+        self.context_options = context_options or {'viewport': {'width': 1920, 'height': 1080}}
+
+        self._playwright = None
+        self._browsers = []
+        self._lock = asyncio.Lock()
+        self._slots = None
+        self._closed = False
+
+        self.stats = {
+            'browsers_launched': 0,
+            'browsers_recycled': 0,
+            'leases': 0,
+        }
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def started(self):
+        return self._playwright is not None
+
+    async def start(self):
+        """Start Playwright and launch the warm browsers."""
+        async with self._lock:
+            if self._playwright is not None:
+                return
+            self._closed = False
+            self._playwright = await async_playwright().start()
+            self._slots = asyncio.Semaphore(self.size * self.max_leases_per_browser)
+            for _ in range(self.size):
+                self._browsers.append(await self._launch())
+            logger.info(f"Browser pool started with {self.size} browsers")
+
+    async def _launch(self):
+        browser = await self._playwright.chromium.launch(
+            headless=self.headless,
+            args=self.launch_args,
+            ignore_default_args=['--enable-automation']
+        )
+        self.stats['browsers_launched'] += 1
+        return _PooledBrowser(browser)
+
+    async def _close_entry(self, entry):
+        try:
+            await entry.browser.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled browser: {e}")
+
+    async def _replace(self, entry):
+        """Close `entry` and launch a fresh browser in its place."""
+        if entry in self._browsers:
+            self._browsers.remove(entry)
+        await self._close_entry(entry)
+        if not self._closed:
+            self._browsers.append(await self._launch())
+            self.stats['browsers_recycled'] += 1
+
+    async def _acquire(self):
+        if not self.started:
+            await self.start()
+        await self._slots.acquire()
+        try:
+            async with self._lock:
+                # Drop browsers that died since the last lease
+                for entry in [b for b in self._browsers if not b.browser.is_connected()]:
+                    logger.warning("Pooled browser disconnected, replacing it")
+                    await self._replace(entry)
+
+                candidates = [b for b in self._browsers if b.is_healthy()]
+                if not candidates:
+                    entry = await self._launch()
+                    self._browsers.append(entry)
+                    candidates = [entry]
+
+                entry = min(candidates, key=lambda b: b.active_leases)
+                entry.active_leases += 1
+                entry.pages_served += 1
+                self.stats['leases'] += 1
+                if entry.pages_served >= self.max_pages_per_browser:
+                    entry.retiring = True
+                return entry
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _release(self, entry):
+        try:
+            async with self._lock:
+                entry.active_leases -= 1
+                if not entry.retiring and self._memory_exceeded():
+                    logger.info("Chromium memory limit reached, recycling browser")
+                    entry.retiring = True
+                if entry.retiring and entry.active_leases <= 0:
+                    await self._replace(entry)
+        finally:
+            self._slots.release()
+
+    def _memory_exceeded(self):
+        """Check combined RSS of Chromium child processes against `max_memory_mb`."""
+        if not self.max_memory_mb:
+            return False
+        try:
+            import psutil
+        except ImportError:
+            return False
+        try:
+            rss = 0
+            for child in psutil.Process().children(recursive=True):
+                if 'chrom' in child.name().lower():
+                    rss += child.memory_info().rss
+            return rss / (1024 * 1024) > self.max_memory_mb
+        except Exception:
+            return False
+
+    async def acquire_context(self, profile=None, **context_options):
+        """Lease a fresh browser context. Returns a PageLease without a page.
+
+        `profile` names a request_profiles interception profile applied to the context.
+        """
+        profile = get_profile(profile)
+        entry = await self._acquire()
+        try:
+            options = dict(self.context_options)
+            options.update(context_options)
+            context = await entry.browser.new_context(**options)
+            await context.add_init_script(STEALTH_INIT_SCRIPT)
+            interception = await profile.apply(context) if profile and profile.blocks_anything else None
+        except BaseException:
+            await self._release(entry)
+            raise
+        return PageLease(self, entry, context, interception=interception)
+
+    async def acquire_page(self, profile=None, **context_options):
+        """Lease a fresh page in its own context."""
+        lease = await self.acquire_context(profile=profile, **context_options)
+        try:
+            lease.page = await lease.context.new_page()
+            lease.page.set_default_timeout(self.default_timeout)
+            lease.page.set_default_navigation_timeout(self.default_timeout)
+        except BaseException:
+            await lease.release()
+            raise
+        return lease
+
+    @asynccontextmanager
+    async def lease_context(self, profile=None, **context_options):
+        lease = await self.acquire_context(profile=profile, **context_options)
+        try:
+            yield lease.context
+        finally:
+            await lease.release()
+
+    @asynccontextmanager
+    async def lease_page(self, profile=None, **context_options):
+        lease = await self.acquire_page(profile=profile, **context_options)
+        try:
+            yield lease.page
+        finally:
+            await lease.release()
+
+    async def health_check(self):
+        """Replace disconnected browsers and top the pool back up to `size`."""
+        async with self._lock:
+            for entry in list(self._browsers):
+                if not entry.browser.is_connected():
+                    await self._replace(entry)
+            while not self._closed and len(self._browsers) < self.size:
+                self._browsers.append(await self._launch())
+        return len(self._browsers)
+
+    async def close(self):
+        """Close every browser and stop Playwright."""
+        async with self._lock:
+            self._closed = True
+            for entry in self._browsers:
+                await self._close_entry(entry)
+            self._browsers = []
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception as e:
+                    logger.debug(f"Error stopping Playwright: {e}")
+                self._playwright = None
+        logger.info(f"Browser pool closed. Stats: {self.stats}")
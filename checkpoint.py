@@ -0,0 +1,69 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = 'url_breacher_checkpoint.json'
+CHECKPOINT_VERSION = 1
+
+
+class Checkpointer:
+    """Crash-safe crawl checkpoints written at most every `interval` seconds.
+
+    Each save goes to a temp file that is fsynced and then renamed over the
+    checkpoint, so a crash mid-write leaves the previous checkpoint intact.
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH, interval=30):
+        self.path = path
+        self.interval = interval
+        self._last_save = 0.0
+        self.saves = 0
+
+    def due(self):
+        return time.monotonic() - self._last_save >= self.interval
+
+    def save(self, state):
+        state = dict(state, version=CHECKPOINT_VERSION, saved_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+        self.saves += 1
+        logger.debug(f"Checkpoint saved to {self.path}")
+
+    def clear(self):
+        """Remove the checkpoint once a run has finished cleanly."""
+        for path in (self.path, f"{self.path}.tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def finish(self, state):
+        """Final checkpoint of a run: cleared when `state` has nothing left to resume, else saved."""
+        if run_finished(state):
+            self.clear()
+            logger.debug(f"Run finished, removed checkpoint {self.path}")
+        else:
+            self.save(state)
+
+
+def run_finished(state):
+    """Whether a checkpoint state has nothing left to resume (frontier drained or every start URL done)."""
+    if state.get('frontier_crawl'):
+        return not state['frontier']
+    return all(state['categories'].get(url, {}).get('done') for url in state['start_urls'])
+
+
+def load_checkpoint(path=DEFAULT_CHECKPOINT_PATH):
+    """Read a checkpoint written by Checkpointer.save."""
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version in {path}: {state.get('version')!r}")
+    return state
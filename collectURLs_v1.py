@@ -1,10 +1,16 @@
+import argparse
 import asyncio
 import json
 import logging
 import random
+import time
 from time import sleep
 from fake_useragent import UserAgent
-from playwright.async_api import async_playwright
+from browser_pool import BrowserPool
+from crawl_engine import CrawlEngine
+from rate_limiter import get_rate_limiter
+from scroll_harvester import harvest_infinite_scroll
+from sinks import SINK_TYPES, open_sink
 
 # Configure logger
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -30,112 +36,124 @@ async def mimic_mouse(page):
         await page.mouse.move(x, y)
         await asyncio.sleep(random.uniform(0.5, 1.5))
 
+# Runs a navigating action once the shared per-domain rate limiter allows a request to `url`
+async def paced_navigation(url, navigate):
+    limiter = get_rate_limiter()
+    await limiter.acquire(url)
+    start = time.monotonic()
+    try:
+        response = await navigate()
+    except Exception:
+        limiter.observe(url, None)
+        raise
+    if response is None:
+        # Clicks and form submits carry no response; a finished load counts as a success
+        limiter.observe(url, 200, time.monotonic() - start)
+    else:
+        limiter.observe(url, response.status, time.monotonic() - start, response.headers.get("retry-after"))
+    return response
+
+# Collects the href of every element matching a selector in one evaluate call
+HREFS_JS = "els => els.map(el => el.getAttribute('href'))"
+
 # Function to handle pagination
 async def handle_pagination(page, selector, next_button_selector):
-    links = []
+    # Insertion-ordered set: O(1) dedupe, links kept in the order found
+    links = {}
     while True:
         logger.info("Collecting links on the current page.")
-        elements = await page.query_selector_all(selector)
-        for element in elements:
-            url = await element.get_attribute("href")
-            if url and url not in links:
-                links.append(url.strip())
+        for url in await page.eval_on_selector_all(selector, HREFS_JS):
+            if url:
+                links.setdefault(url.strip())
 
         next_button = await page.query_selector(next_button_selector)
 
         if next_button:
             logger.info("Clicking next page button.")
-            await next_button.click()
-            await page.wait_for_timeout(random.uniform(2000, 4000))
+
+            async def click_next():
+                await next_button.click()
+                await page.wait_for_load_state()
+
+            await paced_navigation(page.url, click_next)
             await mimic_mouse(page)
         else:
             logger.info("No more pages to navigate.")
             break
 
-    return links
+    return list(links)
 
 # Function to handle infinite scroll
 async def handle_infinite_scroll(page, selector, scroll_limit=10):
-    links = []
+    # A MutationObserver collects links as they are added; each scroll follows as soon as they stop arriving
     logger.info("Starting infinite scroll collection.")
-    previous_height = 0
-
-    for _ in range(scroll_limit):
-        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        await page.wait_for_timeout(random.uniform(2000, 4000))  # Mimic realistic scrolling delays
-        current_height = await page.evaluate("document.body.scrollHeight")
-        if current_height == previous_height:
-            logger.info("Reached the end of the page.")
-            break
-        previous_height = current_height
+    harvest = await harvest_infinite_scroll(page, selector, max_scrolls=scroll_limit)
+    logger.info("Infinite scroll completed.")
+    return list(dict.fromkeys(url.strip() for url in harvest["hrefs"]))
 
-        elements = await page.query_selector_all(selector)
-        for element in elements:
-            url = await element.get_attribute("href")
-            if url and url not in links:
-                links.append(url.strip())
+# Collect and save product URLs for a single brand on its own leased page
+async def scrape_brand(pool, brand_url, pagination=True, sink=None):
+    async with pool.lease_page(profile="links-only", user_agent=get_random_user_agent()) as page:
+        logger.info("Processing brand URL: %s", brand_url)
+        await paced_navigation(brand_url, lambda: page.goto(brand_url))
 
-        await mimic_mouse(page)
+        product_links_selector = "a.product-link"  # Update with the actual selector
+        next_button_selector = "button.next-page"  # Update with the actual selector
 
-    logger.info("Infinite scroll completed.")
-    return links
+        if pagination:
+            product_urls = await handle_pagination(page, product_links_selector, next_button_selector)
+        else:
+            product_urls = await handle_infinite_scroll(page, product_links_selector)
+
+    # Save product URLs to a JSON file, or to the chosen sink
+    brand_name = brand_url.split("/")[-1]
+    logger.info("Saving %d product URLs for brand: %s", len(product_urls), brand_name)
+    if sink:
+        with open_sink(f"{brand_name}_platform", kind=sink) as out:
+            out.write_many({"url": url, "type": "product", "brand": brand_name} for url in product_urls)
+    else:
+        with open(f"{brand_name}_platform.json", "w") as f:
+            json.dump(product_urls, f, indent=4)
+    return product_urls
 
 # Main scraping function
-async def scrape_platform(url: str, item: str, pagination=True):
+async def scrape_platform(url: str, item: str, pagination=True, concurrency=4, sink=None):
     logger.info("Starting scrape for URL: %s", url)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent=get_random_user_agent()
-        )
-        page = await context.new_page()
-
-        # Navigate to the URL
-        logger.info("Navigating to URL: %s", url)
-        await page.goto(url)
-        await mimic_mouse(page)
-
-        # Type the search item in the search box
-        logger.info("Typing search item: %s", item)
-        search_box_selector = "input[name='search']"  # Update with the actual selector
-        await page.fill(search_box_selector, item)
-        await page.press(search_box_selector, 'Enter')
-        await page.wait_for_timeout(3000)
-
-        # Collect all brand links using pagination or infinite scroll
-        logger.info("Collecting all brand links.")
-        brand_links_selector = "a.brand-link"  # Update with the actual selector
-        next_button_selector = "button.next-page"  # Update with the actual selector
+    async with BrowserPool(size=max(1, concurrency // 4)) as pool:
+        async with pool.lease_page(profile="links-only", user_agent=get_random_user_agent()) as page:
+            # Navigate to the URL
+            logger.info("Navigating to URL: %s", url)
+            await paced_navigation(url, lambda: page.goto(url))
+            await mimic_mouse(page)
 
-        if pagination:
-            brands = await handle_pagination(page, brand_links_selector, next_button_selector)
-        else:
-            brands = await handle_infinite_scroll(page, brand_links_selector)
+            # Type the search item in the search box
+            logger.info("Typing search item: %s", item)
+            search_box_selector = "input[name='search']"  # Update with the actual selector
+            await page.fill(search_box_selector, item)
 
-        logger.info("Found %d brands.", len(brands))
+            async def submit_search():
+                await page.press(search_box_selector, 'Enter')
+                await page.wait_for_load_state()
 
-        # Iterate through each brand and collect product URLs
-        for brand_url in brands:
-            logger.info("Processing brand URL: %s", brand_url)
-            await page.goto(brand_url)
-            await page.wait_for_timeout(3000)
+            await paced_navigation(url, submit_search)
 
-            product_links_selector = "a.product-link"  # Update with the actual selector
+            # Collect all brand links using pagination or infinite scroll
+            logger.info("Collecting all brand links.")
+            brand_links_selector = "a.brand-link"  # Update with the actual selector
+            next_button_selector = "button.next-page"  # Update with the actual selector
 
             if pagination:
-                product_urls = await handle_pagination(page, product_links_selector, next_button_selector)
+                brands = await handle_pagination(page, brand_links_selector, next_button_selector)
             else:
-                product_urls = await handle_infinite_scroll(page, product_links_selector)
+                brands = await handle_infinite_scroll(page, brand_links_selector)
 
-            # Save product URLs to JSON file
-            brand_name = brand_url.split("/")[-1]
-            filename = f"{brand_name}_platform.json"
-            logger.info("Saving %d product URLs for brand: %s", len(product_urls), brand_name)
-            with open(filename, "w") as f:
-                json.dump(product_urls, f, indent=4)
+        logger.info("Found %d brands.", len(brands))
 
-        await browser.close()
+        # Fan the brands out across leased pages, `concurrency` at a time
+        engine = CrawlEngine(lambda brand_url: scrape_brand(pool, brand_url, pagination, sink),
+                             concurrency=concurrency, per_domain=concurrency)
+        await engine.run(brands)
 
     logger.info("Scraping completed.")
 
@@ -144,11 +162,16 @@ if __name__ == "__main__":
     import nest_asyncio
     from url_breacher import URLBreacher
     
+    parser = argparse.ArgumentParser(description="Collect product URLs from a category page.")
+    parser.add_argument("--sink", choices=sorted(SINK_TYPES), default="jsonl",
+                        help="Output backend for found URLs (default: jsonl)")
+    args = parser.parse_args()
+    
     # Apply nest_asyncio to allow nested event loops
     nest_asyncio.apply()
     
     # Initialize the URL breacher
-    breacher = URLBreacher()
+    breacher = URLBreacher(sink=args.sink)
     
     # Example URL to scrape
     url = "https://www.amazon.in/s?i=electronics&rh=n%3A1805560031&s=popularity-rank&fs=true&ref=lp_1805560031_sar"
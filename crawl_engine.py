@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from collections import deque
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlEngine:
+    """Bounded asyncio worker pool that fans URLs out to an async handler.
+
+    Concurrency is capped globally (`concurrency` workers) and per domain
+    (`per_domain` handlers in flight for the same netloc). Handlers may call
+    `submit()` to enqueue follow-up URLs while the engine is running.
+    A URL taken from the queue while its domain is saturated is parked
+    instead of holding a worker, and is picked up by the next worker that
+    finishes a handler for that domain. At most one URL is parked per idle
+    worker; beyond that workers wait for a handler to finish, so a priority
+    queue such as the Frontier keeps ordering (and spilling) the rest.
+    """
+
+    def __init__(self, handler, concurrency=8, per_domain=4, queue=None):
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.per_domain = max(1, per_domain)
+        self.queue = queue if queue is not None else asyncio.Queue()
+        self._active = {}
+        self._parked = {}
+        self._released = asyncio.Event()
+        self.results = {}
+        self.errors = {}
+        self.stats = {
+            'processed': 0,
+            'failed': 0,
+            'in_flight': 0,
+            'max_in_flight': 0,
+        }
+
+    @staticmethod
+    def _domain(url):
+        return urlparse(url).netloc.lower()
+
+    def _has_slot(self, domain):
+        return self._active.get(domain, 0) < self.per_domain
+
+    def _take_parked(self):
+        """A parked URL whose domain has a free slot again, or None."""
+        for domain, parked in self._parked.items():
+            if self._has_slot(domain):
+                url = parked.popleft()
+                if not parked:
+                    del self._parked[domain]
+                return url
+        return None
+
+    def _may_dequeue(self):
+        parked = sum(len(urls) for urls in self._parked.values())
+        return parked < self.concurrency - self.stats['in_flight']
+
+    def submit(self, url):
+        """Queue a URL for processing."""
+        self.queue.put_nowait(url)
+
+    async def _worker(self, worker_id):
+        while True:
+            url = self._take_parked()
+            if url is None:
+                if not self._may_dequeue():
+                    self._released.clear()
+                    await self._released.wait()
+                    continue
+                url = await self.queue.get()
+            domain = self._domain(url)
+            if not self._has_slot(domain):
+                # Still unfinished in the queue; a worker leaving this domain picks it up
+                self._parked.setdefault(domain, deque()).append(url)
+                continue
+            self._active[domain] = self._active.get(domain, 0) + 1
+            self.stats['in_flight'] += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+            try:
+                self.results[url] = await self.handler(url)
+                self.stats['processed'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed on {url}: {e}")
+                self.errors[url] = str(e)
+                self.stats['failed'] += 1
+            finally:
+                self.stats['in_flight'] -= 1
+                self._active[domain] -= 1
+                self._released.set()
+                self.queue.task_done()
+
+    async def run(self, urls=()):
+        """Process `urls` (plus anything submitted meanwhile) and return results by URL."""
+        for url in urls:
+            self.submit(url)
+
+        workers = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+        try:
+            await self.queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        logger.info(f"Crawl engine finished: {self.stats}")
+        return self.results
@@ -0,0 +1,94 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Evaluated in the page with the compiled field list; returns every field in one round-trip
+EXTRACT_FIELDS_JS = """
+(fields) => {
+    const read = (el, attr) => el ? (attr ? el.getAttribute(attr) : el.textContent) : null;
+    const out = {};
+    for (const f of fields) {
+        if (f.many) {
+            out[f.name] = Array.from(document.querySelectorAll(f.selector), el => read(el, f.attr));
+        } else {
+            out[f.name] = read(document.querySelector(f.selector), f.attr);
+        }
+    }
+    return out;
+}
+"""
+
+
+def clean_text(value):
+    """Collapse whitespace in extracted text."""
+    return " ".join(value.split()) if isinstance(value, str) else value
+
+
+class Field:
+    """One declarative field: a CSS selector, text or an attribute, and an optional post-processor."""
+
+    def __init__(self, name, selector, attr=None, post=None, many=False, default=""):
+        self.name = name
+        self.selector = selector
+        self.attr = attr
+        self.post = post
+        self.many = many
+        self.default = default
+
+
+class FieldSpec:
+    """A set of fields extracted together, either live from a page or offline from raw HTML."""
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self._js_args = [
+            {'name': f.name, 'selector': f.selector, 'attr': f.attr, 'many': f.many}
+            for f in self.fields
+        ]
+        self._css = None
+        self._parser = None
+
+    def _finish(self, raw):
+        data = {}
+        for field in self.fields:
+            value = raw.get(field.name)
+            if field.many:
+                value = [v for v in (value or []) if v is not None]
+                if field.post:
+                    value = [field.post(v) for v in value]
+            elif value is None:
+                value = field.default
+            elif field.post:
+                value = field.post(value)
+            data[field.name] = value
+        return data
+
+    async def extract_page(self, page):
+        """Extract every field from a live Playwright page with a single evaluate call."""
+        raw = await page.evaluate(EXTRACT_FIELDS_JS, self._js_args)
+        return self._finish(raw or {})
+
+    def _compiled_css(self):
+        if self._css is None:
+            from lxml.cssselect import CSSSelector
+            self._css = {f.name: CSSSelector(f.selector) for f in self.fields}
+        return self._css
+
+    def extract_html(self, html):
+        """Extract every field from raw HTML with lxml (offline mode)."""
+        from lxml import html as lxml_html
+
+        if self._parser is None:
+            # UTF-8 bytes with an explicit encoding, as in html_parsers.LxmlBackend, so pages
+            # starting with an <?xml ... encoding=...?> declaration parse too
+            self._parser = lxml_html.HTMLParser(encoding='utf-8')
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        root = lxml_html.fromstring(html, parser=self._parser)
+        compiled = self._compiled_css()
+        raw = {}
+        for field in self.fields:
+            matches = compiled[field.name](root)
+            values = [m.get(field.attr) if field.attr else m.text_content() for m in matches]
+            raw[field.name] = values if field.many else (values[0] if values else None)
+        return self._finish(raw)
@@ -0,0 +1,231 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+from urllib.parse import urlsplit
+
+from url_store import CompactURLSet
+
+logger = logging.getLogger(__name__)
+
+# Product links a page is expected to yield before anything is observed for its domain
+DEFAULT_YIELD_PRIORS = {
+    'seed': 50.0,
+    'pagination': 20.0,
+    'category': 10.0,
+    None: 1.0,
+}
+# Weight of the prior against observed pages when estimating yield
+PRIOR_WEIGHT = 2.0
+
+
+class FrontierURL(str):
+    """A URL string that carries its crawl depth and label through the crawl engine."""
+
+    def __new__(cls, url, depth=0, label=None):
+        obj = super().__new__(cls, url)
+        obj.depth = depth
+        obj.label = label
+        return obj
+
+
+class Frontier(asyncio.Queue):
+    """Priority crawl frontier usable as CrawlEngine's queue.
+
+    URLs come out best expected product yield first, then shallowest
+    first. The expected yield of a (domain, label) pair starts at its prior
+    and moves toward the products per page actually observed
+    (`record_yield`). Each URL is admitted once (`seen`, a CompactURLSet by
+    default). URLs deeper than `max_depth`, or outside the allowed domains
+    once any are set, are dropped. When more than `max_in_memory` entries
+    are queued, the lower-priority half moves to a SQLite file and is read
+    back in priority order as the heap drains.
+    """
+
+    def __init__(self, max_depth=3, max_in_memory=50000, spill_path=None, priors=None, seen=None):
+        self.max_depth = max_depth
+        self.max_in_memory = max(2, max_in_memory)
+        self.spill_path = spill_path
+        self.priors = dict(DEFAULT_YIELD_PRIORS)
+        self.priors.update(priors or {})
+        self.seen = seen if seen is not None else CompactURLSet(track_new=False)
+        self.domains = set()
+        self._active = set()
+        self._yields = {}
+        self._seq = itertools.count()
+        self._db = None
+        self._owns_spill_file = False
+        self._spilled = 0
+        self._spill_best = math.inf
+        self.stats = {
+            'queued': 0,
+            'dropped_seen': 0,
+            'dropped_depth': 0,
+            'dropped_offsite': 0,
+            'spilled': 0,
+            'refilled': 0,
+            'deepest': 0,
+        }
+        super().__init__()
+
+    # asyncio.Queue storage hooks (as in asyncio.PriorityQueue)
+
+    def _init(self, maxsize):
+        self._queue = []
+
+    def _put(self, url):
+        heapq.heappush(self._queue, (self._priority(url), url.depth, next(self._seq), url))
+        if len(self._queue) > self.max_in_memory:
+            self._spill()
+
+    def _get(self):
+        if self._spilled and (not self._queue or self._spill_best < self._queue[0][0]):
+            self._refill()
+        url = heapq.heappop(self._queue)[3]
+        self._active.add(url)
+        return url
+
+    def qsize(self):
+        return len(self._queue) + self._spilled
+
+    def empty(self):
+        return not self._queue and not self._spilled
+
+    # Admission
+
+    def allow(self, url):
+        """Restrict the crawl to `url`'s domain (plus any other allowed ones)."""
+        self.domains.add(urlsplit(url).netloc.lower())
+
+    def put_nowait(self, item):
+        """Queue a URL (plain strings are depth-0 seeds); returns False if it was not admitted."""
+        url = item if isinstance(item, FrontierURL) else FrontierURL(item, 0, 'seed')
+        if url in self.seen:
+            self.stats['dropped_seen'] += 1
+            return False
+        self.seen.add(url)
+        if url.depth > self.max_depth:
+            self.stats['dropped_depth'] += 1
+            return False
+        if self.domains and urlsplit(url).netloc.lower() not in self.domains:
+            self.stats['dropped_offsite'] += 1
+            return False
+        super().put_nowait(url)
+        self.stats['queued'] += 1
+        self.stats['deepest'] = max(self.stats['deepest'], url.depth)
+        return True
+
+    def push(self, url, depth, label=None):
+        return self.put_nowait(FrontierURL(url, depth, label))
+
+    # Yield estimates
+
+    def expected_yield(self, url, label=None):
+        prior = self.priors.get(label, self.priors[None])
+        observed = self._yields.get((urlsplit(url).netloc.lower(), label))
+        if observed is None:
+            return prior
+        products, pages = observed
+        return (products + prior * PRIOR_WEIGHT) / (pages + PRIOR_WEIGHT)
+
+    def _priority(self, url):
+        return -self.expected_yield(url, url.label)
+
+    def finish(self, url):
+        """Mark a URL taken from the frontier as no longer in progress."""
+        self._active.discard(url)
+
+    def record_yield(self, url, products):
+        """Feed back how many new products a crawled page produced, and mark it finished."""
+        self.finish(url)
+        key = (urlsplit(url).netloc.lower(), getattr(url, 'label', None))
+        observed = self._yields.setdefault(key, [0, 0])
+        observed[0] += products
+        observed[1] += 1
+
+    # Disk spill
+
+    def _spill_db(self):
+        if self._db is None:
+            if self.spill_path is None:
+                fd, self.spill_path = tempfile.mkstemp(prefix='frontier_', suffix='.sqlite')
+                os.close(fd)
+                self._owns_spill_file = True
+            self._db = sqlite3.connect(self.spill_path)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=OFF')
+            self._db.execute('DROP TABLE IF EXISTS frontier')
+            self._db.execute(
+                'CREATE TABLE frontier (priority REAL, depth INTEGER, seq INTEGER, url TEXT, label TEXT)'
+            )
+            self._db.execute('CREATE INDEX frontier_order ON frontier (priority, depth, seq)')
+        return self._db
+
+    def _spill(self):
+        """Move the lower-priority half of the heap to disk."""
+        self._queue.sort()
+        keep = self.max_in_memory // 2
+        spilled = self._queue[keep:]
+        # A sorted list is a valid heap, so the kept half needs no heapify
+        del self._queue[keep:]
+        db = self._spill_db()
+        with db:
+            db.executemany(
+                'INSERT INTO frontier (priority, depth, seq, url, label) VALUES (?, ?, ?, ?, ?)',
+                [(priority, depth, seq, str(url), url.label) for priority, depth, seq, url in spilled]
+            )
+        self._spilled += len(spilled)
+        self._spill_best = min(self._spill_best, spilled[0][0])
+        self.stats['spilled'] += len(spilled)
+        logger.debug(f"Frontier spilled {len(spilled)} URLs to {self.spill_path}")
+
+    def _refill(self):
+        """Read the best spilled entries back into the heap."""
+        db = self._spill_db()
+        rows = db.execute(
+            'SELECT rowid, priority, depth, seq, url, label FROM frontier ORDER BY priority, depth, seq LIMIT ?',
+            (max(1, self.max_in_memory // 4),)
+        ).fetchall()
+        with db:
+            db.executemany('DELETE FROM frontier WHERE rowid = ?', [(row[0],) for row in rows])
+        for _, priority, depth, seq, url, label in rows:
+            heapq.heappush(self._queue, (priority, depth, seq, FrontierURL(url, depth, label)))
+        self._spilled -= len(rows)
+        best = db.execute('SELECT MIN(priority) FROM frontier').fetchone()[0]
+        self._spill_best = best if best is not None else math.inf
+        self.stats['refilled'] += len(rows)
+
+    # Checkpoints
+
+    def snapshot(self):
+        """Queued and unfinished entries as [url, depth, label] lists, for checkpoints."""
+        entries = [[str(url), url.depth, url.label] for url in self._active]
+        entries.extend([str(url), url.depth, url.label] for _, _, _, url in sorted(self._queue))
+        if self._spilled:
+            entries.extend([url, depth, label] for url, depth, label in self._db.execute(
+                'SELECT url, depth, label FROM frontier ORDER BY priority, depth, seq'))
+        return entries
+
+    def restore(self, entries):
+        """Re-queue entries saved by snapshot() (plain URL strings are depth-0 seeds)."""
+        for entry in entries:
+            url = FrontierURL(entry, 0, 'seed') if isinstance(entry, str) else FrontierURL(*entry)
+            # Restored entries were admitted before, so they are queued even if already seen
+            self.seen.add(url)
+            super().put_nowait(url)
+
+    def close(self):
+        """Drop the spill file."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            if self._owns_spill_file:
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(self.spill_path + suffix):
+                        os.remove(self.spill_path + suffix)
+        self._spilled = 0
+        self._spill_best = math.inf
@@ -0,0 +1,158 @@
+import html as html_lib
+import logging
+import re
+from urllib.parse import urljoin
+
+logger = logging.getLogger(__name__)
+
+# Matches the href of every <a> tag without building a tree
+HREF_TOKEN_RE = re.compile(
+    r"""<a\b[^>]*?\shref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""",
+    re.IGNORECASE
+)
+
+
+def iter_hrefs(html):
+    """Stream raw href values of <a> tags straight from the HTML text."""
+    for match in HREF_TOKEN_RE.finditer(html):
+        href = match.group(1) or match.group(2) or match.group(3)
+        if href:
+            yield html_lib.unescape(href) if '&' in href else href
+
+
+def combine_selectors(product_selectors, link_selectors):
+    """Fold every product/link selector pair into one descendant selector group."""
+    return ', '.join(f'{product} {link}' for product in product_selectors for link in link_selectors)
+
+
+class ParserBackend:
+    """Base class: selects product link hrefs with a selector group compiled once per site."""
+
+    name = None
+
+    def __init__(self):
+        self._compiled = {}
+
+    def compiled(self, product_selectors, link_selectors):
+        key = (tuple(product_selectors), tuple(link_selectors))
+        selector = self._compiled.get(key)
+        if selector is None:
+            selector = self._compiled[key] = self.compile(combine_selectors(product_selectors, link_selectors))
+        return selector
+
+    def compile(self, selector_group):
+        return selector_group
+
+    def select_hrefs(self, html, product_selectors, link_selectors):
+        raise NotImplementedError
+
+
+class SelectolaxBackend(ParserBackend):
+    """selectolax on the lexbor engine."""
+
+    name = 'selectolax'
+
+    def __init__(self):
+        super().__init__()
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def select_hrefs(self, html, product_selectors, link_selectors):
+        tree = self._parser(html)
+        selector = self.compiled(product_selectors, link_selectors)
+        return [href for href in (node.attributes.get('href') for node in tree.css(selector)) if href]
+
+
+class LxmlBackend(ParserBackend):
+    """lxml.html with cssselect selectors translated to XPath once."""
+
+    name = 'lxml'
+
+    def __init__(self):
+        super().__init__()
+        from lxml import html as lxml_html
+        self._fromstring = lxml_html.fromstring
+        # Parsing UTF-8 bytes with an explicit encoding accepts pages that start with an
+        # <?xml ... encoding=...?> declaration, which lxml rejects in a str
+        self._parser = lxml_html.HTMLParser(encoding='utf-8')
+
+    def compile(self, selector_group):
+        from lxml.cssselect import CSSSelector
+        return CSSSelector(selector_group)
+
+    def select_hrefs(self, html, product_selectors, link_selectors):
+        if not html.strip():
+            return []
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        root = self._fromstring(html, parser=self._parser)
+        selector = self.compiled(product_selectors, link_selectors)
+        return [href for href in (el.get('href') for el in selector(root)) if href]
+
+
+class SoupBackend(ParserBackend):
+    """BeautifulSoup with the stdlib html.parser; always available."""
+
+    name = 'html.parser'
+
+    def select_hrefs(self, html, product_selectors, link_selectors):
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+        selector = self.compiled(product_selectors, link_selectors)
+        return [href for href in (el.get('href') for el in soup.select(selector)) if href]
+
+
+BACKENDS = {
+    'selectolax': SelectolaxBackend,
+    'lxml': LxmlBackend,
+    'html.parser': SoupBackend,
+}
+
+# Fastest first
+BACKEND_PREFERENCE = ('selectolax', 'lxml', 'html.parser')
+
+_backend_cache = {}
+
+
+def get_parser_backend(name=None):
+    """Return the named backend, or the fastest one that can be imported."""
+    names = [name] if name else BACKEND_PREFERENCE
+    for candidate in names:
+        if candidate in _backend_cache:
+            return _backend_cache[candidate]
+        try:
+            backend = BACKENDS[candidate]()
+        except ImportError as e:
+            if name:
+                raise
+            logger.debug(f"Parser backend {candidate} unavailable: {e}")
+            continue
+        _backend_cache[candidate] = backend
+        return backend
+    raise ImportError("No HTML parser backend available")
+
+
+def available_backends():
+    """Names of the backends that can be imported here."""
+    names = []
+    for name in BACKEND_PREFERENCE:
+        try:
+            get_parser_backend(name)
+            names.append(name)
+        except ImportError:
+            continue
+    return names
+
+
+def parse_links(html, base_url, product_selectors=(), link_selectors=(), backend=None):
+    """Return (site_links, all_links) as absolute URLs.
+
+    `site_links` come from the product/link selectors; `all_links` is the
+    fallback pass over every <a href> in the document.
+    """
+    site_links = []
+    if product_selectors and link_selectors:
+        backend = backend or get_parser_backend()
+        site_links = [urljoin(base_url, href) for href in backend.select_hrefs(html, product_selectors, link_selectors)]
+    all_links = [urljoin(base_url, href) for href in iter_hrefs(html)]
+    return site_links, all_links
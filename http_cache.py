@@ -0,0 +1,183 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = '.http_cache.sqlite'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Response headers kept with a cached body
+STORED_HEADERS = ('content-type', 'etag', 'last-modified', 'cache-control', 'date')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+class ReplayMiss(LookupError):
+    """Raised in replay-only mode when a URL has no cached response."""
+
+
+def normalize_url(url):
+    """Cache key for `url`: lowercase scheme/host, no default port or fragment, sorted query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+class CachedResponse:
+    """A response read back from the cache."""
+
+    def __init__(self, url, status, headers, text, etag=None, last_modified=None, stored_at=None):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def validators(self):
+        """Conditional request headers that revalidate this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """SQLite-backed response cache with zlib-compressed bodies.
+
+    Entries are keyed by normalize_url() and revalidated with ETag /
+    Last-Modified conditional GETs by HTTPClient. Once the stored bodies
+    exceed `max_bytes`, the least recently used entries are evicted. With
+    `replay_only`, HTTPClient never touches the network and a cache miss
+    raises ReplayMiss.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, replay_only=False,
+                 compress_level=6):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.replay_only = replay_only
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'revalidated': 0,
+            'stored': 0,
+            'evicted': 0,
+        }
+
+    def get(self, url):
+        """Cached response for `url`, or None. Marks the entry as recently used."""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, status, headers, body, etag, last_modified, stored_at FROM responses WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        self.stats['hits'] += 1
+        cached_url, status, headers, body, etag, last_modified, stored_at = row
+        text = zlib.decompress(body).decode('utf-8', errors='replace')
+        return CachedResponse(cached_url, status, json.loads(headers), text, etag, last_modified, stored_at)
+
+    def put(self, url, status, headers, text):
+        """Store a response body; only 200s with a body are worth caching."""
+        if status != 200 or not text:
+            return
+        headers = {name.lower(): value for name, value in dict(headers or {}).items()
+                   if name.lower() in STORED_HEADERS}
+        if 'no-store' in headers.get('cache-control', '').lower():
+            return
+        key = normalize_url(url)
+        body = zlib.compress(text.encode('utf-8'), self.compress_level)
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, url, status, headers, body, etag, last_modified, size, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, url, status, json.dumps(headers), body, headers.get('etag'),
+                 headers.get('last-modified'), len(body), now, now)
+            )
+            self._total_bytes += len(body) - (previous[0] if previous else 0)
+            self.stats['stored'] += 1
+            self._evict()
+
+    def touch(self, url):
+        """Record a successful 304 revalidation."""
+        with self._lock:
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?',
+                               (time.time(), normalize_url(url)))
+        self.stats['revalidated'] += 1
+
+    def _evict(self):
+        """Drop least recently used entries until the store fits in `max_bytes`."""
+        if not self.max_bytes or self._total_bytes <= self.max_bytes:
+            return
+        # Evict down to 90% so a full cache doesn't evict on every put
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute('SELECT key, size FROM responses ORDER BY accessed_at').fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany('DELETE FROM responses WHERE key = ?', doomed)
+        self.stats['evicted'] += len(doomed)
+        logger.debug(f"HTTP cache evicted {len(doomed)} entries")
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        logger.info(f"HTTP cache closed. Stats: {self.stats}")
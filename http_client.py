@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+from http_cache import ReplayMiss
+from rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+class HTTPResponse:
+    """Backend-neutral response: status, headers, decoded text and final URL."""
+
+    def __init__(self, status, headers, text, url, from_cache=False):
+        self.status = status
+        self.headers = headers
+        self.text = text
+        self.url = url
+        self.from_cache = from_cache
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+
+class HTTPClient:
+    """One keep-alive HTTP layer for every fetch path.
+
+    Async requests go through a single pooled session: httpx with HTTP/2 when
+    `h2` is installed, otherwise aiohttp with per-host connection limits and a
+    DNS cache (aiodns is used automatically when present). Requests through a
+    proxy always use aiohttp, which supports per-request proxies.
+    `get_sync` and `cloudscraper_get` are the sync facade for legacy callers,
+    backed by a pooled requests.Session and one shared cloudscraper.
+
+    With an http_cache.HTTPCache attached, every path revalidates cached
+    pages with conditional GETs and serves 304s from the cache; in
+    replay-only mode nothing goes to the network.
+
+    With a rate_limiter.DomainRateLimiter attached, every network request
+    waits for its domain's token and reports its status and latency back,
+    unless made with `limited=False` (proxy checks, whose failures say
+    nothing about the target domain).
+    """
+
+    def __init__(self, user_agent=None, limit=100, limit_per_host=8, dns_ttl=300,
+                 keepalive_timeout=30, timeout=20, http2=True, cache=None, limiter=None):
+        self.headers = dict(DEFAULT_HEADERS)
+        if user_agent:
+            self.headers['User-Agent'] = user_agent
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.http2 = http2 and _h2_available()
+        self.cache = cache
+        self.limiter = limiter
+
+        self._aiohttp = None
+        self._httpx = None
+        self._loop = None
+        self._host_slots = {}
+        self._sync_session = None
+        self._cloudscraper = None
+        self._sync_lock = threading.Lock()
+
+    # -- async --------------------------------------------------------------
+
+    def _bind_loop(self):
+        """Sessions belong to one event loop; start fresh ones on a new loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._aiohttp = None
+            self._httpx = None
+            self._host_slots = {}
+
+    def _aiohttp_session(self):
+        import aiohttp
+
+        if self._aiohttp is None or self._aiohttp.closed:
+            self._aiohttp = aiohttp.ClientSession(
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=self.dns_ttl,
+                    keepalive_timeout=self.keepalive_timeout
+                )
+            )
+        return self._aiohttp
+
+    def _httpx_client(self):
+        import httpx
+
+        if self._httpx is None or self._httpx.is_closed:
+            self._httpx = httpx.AsyncClient(
+                http2=True,
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.limit,
+                    max_keepalive_connections=self.limit,
+                    keepalive_expiry=self.keepalive_timeout
+                )
+            )
+        return self._httpx
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc.lower()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.limit_per_host)
+        return slot
+
+    async def get(self, url, headers=None, proxy=None, timeout=None, limited=True):
+        """GET `url` on the shared pooled session (through the cache when one is attached)."""
+        if self.cache is None:
+            return await self._get(url, headers, proxy, timeout, limited)
+        cached = await asyncio.to_thread(self._cache_lookup, url)
+        if self.cache.replay_only:
+            return _from_cached(cached)
+        response = await self._get(url, _conditional(headers, cached), proxy, timeout, limited)
+        return await asyncio.to_thread(self._cache_update, url, cached, response)
+
+    async def _get(self, url, headers, proxy, timeout, limited=True):
+        if self.limiter is None or not limited:
+            return await self._fetch(url, headers, proxy, timeout)
+        await self.limiter.acquire(url)
+        start = time.monotonic()
+        try:
+            response = await self._fetch(url, headers, proxy, timeout)
+        except Exception:
+            self.limiter.observe(url, None)
+            raise
+        self._observe(url, response, time.monotonic() - start)
+        return response
+
+    async def _fetch(self, url, headers, proxy, timeout):
+        self._bind_loop()
+        if self.http2 and proxy is None:
+            # httpx has no per-host connection cap, so enforce it here
+            async with self._host_slot(url):
+                response = await self._httpx_client().get(url, headers=headers, timeout=timeout or self.timeout)
+                return HTTPResponse(response.status_code, response.headers, response.text, str(response.url))
+
+        import aiohttp
+
+        kwargs = {'headers': headers, 'proxy': proxy}
+        if timeout:
+            kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+        async with self._aiohttp_session().get(url, **kwargs) as response:
+            text = await response.text(errors='replace')
+            return HTTPResponse(response.status, response.headers, text, str(response.url))
+
+    async def close(self):
+        """Close the async sessions (the sync facade stays usable)."""
+        if self._aiohttp is not None and not self._aiohttp.closed:
+            await self._aiohttp.close()
+        if self._httpx is not None and not self._httpx.is_closed:
+            await self._httpx.aclose()
+        self._aiohttp = None
+        self._httpx = None
+
+    # -- cache --------------------------------------------------------------
+
+    def _cache_lookup(self, url):
+        cached = self.cache.get(url)
+        if cached is None and self.cache.replay_only:
+            raise ReplayMiss(f"No cached response for {url} (replay-only mode)")
+        return cached
+
+    def _cache_update(self, url, cached, response):
+        """Serve a 304 from the cache, store a fresh 200, pass anything else through."""
+        if response.status == 304 and cached is not None:
+            self.cache.touch(url)
+            return _from_cached(cached)
+        self.cache.put(url, response.status, response.headers, response.text)
+        return response
+
+    def _observe(self, url, response, latency):
+        self.limiter.observe(url, response.status, latency, response.headers.get('Retry-After'))
+
+    def _limited_sync(self, url, fetch, limited=True):
+        """Wrap a blocking fetch so it waits for and reports to the rate limiter."""
+        if self.limiter is None or not limited:
+            return fetch
+
+        def limited(request_headers):
+            self.limiter.acquire_sync(url)
+            start = time.monotonic()
+            try:
+                response = fetch(request_headers)
+            except Exception:
+                self.limiter.observe(url, None)
+                raise
+            self._observe(url, response, time.monotonic() - start)
+            return response
+        return limited
+
+    def _cached_sync(self, url, headers, fetch, limited=True):
+        fetch = self._limited_sync(url, fetch, limited)
+        if self.cache is None:
+            return fetch(headers)
+        cached = self._cache_lookup(url)
+        if self.cache.replay_only:
+            return _from_cached(cached)
+        return self._cache_update(url, cached, fetch(_conditional(headers, cached)))
+
+    # -- sync facade --------------------------------------------------------
+
+    def _requests_session(self):
+        with self._sync_lock:
+            if self._sync_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.limit, pool_maxsize=self.limit_per_host)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update(self.headers)
+                self._sync_session = session
+            return self._sync_session
+
+    def _cloudscraper_session(self):
+        with self._sync_lock:
+            if self._cloudscraper is None:
+                import cloudscraper
+                self._cloudscraper = cloudscraper.create_scraper()
+            return self._cloudscraper
+
+    def get_sync(self, url, headers=None, proxies=None, timeout=None, limited=True):
+        """Blocking GET on the pooled requests.Session."""
+        def fetch(request_headers):
+            response = self._requests_session().get(url, headers=request_headers, proxies=proxies,
+                                                    timeout=timeout or self.timeout)
+            return HTTPResponse(response.status_code, response.headers, response.text, response.url)
+        return self._cached_sync(url, headers, fetch, limited)
+
+    def cloudscraper_get(self, url, headers=None, timeout=None, limited=True):
+        """Blocking GET through the shared cloudscraper (reuses its Cloudflare clearance)."""
+        def fetch(request_headers):
+            response = self._cloudscraper_session().get(url, headers=request_headers, timeout=timeout or self.timeout)
+            return HTTPResponse(response.status_code, response.headers, response.text, response.url)
+        return self._cached_sync(url, headers, fetch, limited)
+
+    def close_sync(self):
+        with self._sync_lock:
+            for session in (self._sync_session, self._cloudscraper):
+                if session is not None:
+                    session.close()
+            self._sync_session = None
+            self._cloudscraper = None
+
+
+def _conditional(headers, cached):
+    """Request headers plus the cached entry's revalidation headers."""
+    if cached is None:
+        return headers
+    merged = cached.validators()
+    merged.update(headers or {})
+    return merged or headers
+
+
+def _from_cached(cached):
+    return HTTPResponse(cached.status, cached.headers, cached.text, cached.url, from_cache=True)
+
+
+def _h2_available():
+    try:
+        import h2  # noqa: F401
+        import httpx  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+_shared_client = None
+
+
+def get_http_client(user_agent=None, cache=None):
+    """Process-wide shared HTTPClient, paced by the shared rate limiter. Passing `cache` attaches it."""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = HTTPClient(user_agent=user_agent, limiter=get_rate_limiter())
+    if cache is not None:
+        _shared_client.cache = cache
+    return _shared_client
@@ -0,0 +1,197 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse
+
+# Query parameters that carry the page number, in the order they are tried
+PAGE_PARAMS = ('page', 'p', 'pg', 'pageNumber', 'pageNum')
+
+# Page parameter per site when the listing does not show one yet
+SITE_PAGE_PARAMS = {
+    'amazon': 'page',
+    'noon': 'page',
+    'sharafdg': 'page',
+    'alibaba': 'page',
+}
+
+# Every link on the page plus the numeric labels of pagination controls, in one evaluate call.
+# Windowed paginators (e.g. Amazon's "1 2 3 ... 20") show the last page as plain text.
+PAGINATION_INFO_JS = """
+() => {
+    const hrefs = Array.from(document.querySelectorAll('a[href]'), a => a.getAttribute('href'));
+    const controls = document.querySelectorAll(
+        '[class*="pagination"] a, [class*="pagination"] span, [class*="pagination"] li, ' +
+        '[class*="Pagination"] a, [class*="Pagination"] li, nav[aria-label*="agination"] a'
+    );
+    const labels = Array.from(controls, el => el.textContent.trim()).filter(text => /^\\d{1,5}$/.test(text));
+    return {hrefs, labels};
+}
+"""
+
+# Text that usually holds the result count ("1-48 of over 10,000 results")
+RESULT_COUNT_JS = """
+() => {
+    const selectors = ['[data-component-type="s-result-info-bar"]', '[class*="result-count"]',
+                       '[class*="resultCount"]', '[class*="results-count"]', 'h1'];
+    for (const selector of selectors) {
+        const el = document.querySelector(selector);
+        if (el && /\\d/.test(el.textContent)) return el.textContent;
+    }
+    return document.body ? document.body.innerText.slice(0, 20000) : '';
+}
+"""
+
+RESULT_COUNT_PATTERNS = [
+    re.compile(r'of\s+(?:over\s+|about\s+)?([\d,.]+)\s+results', re.IGNORECASE),
+    re.compile(r'([\d,.]+)\s+(?:results|products|items)\b', re.IGNORECASE),
+]
+
+
+def parse_result_count(text):
+    """Total result count from listing header text, or None."""
+    for pattern in RESULT_COUNT_PATTERNS:
+        match = pattern.search(text or '')
+        if match:
+            digits = re.sub(r'[^\d]', '', match.group(1))
+            if digits:
+                return int(digits)
+    return None
+
+
+class PlannedPage(str):
+    """A listing page URL scheduled by a PagePlan, carrying its page number."""
+
+    def __new__(cls, url, plan, number):
+        obj = super().__new__(cls, url)
+        obj.plan = plan
+        obj.number = number
+        return obj
+
+
+class PagePlan:
+    """Page URLs of one listing, from `first` to `total`, and which of them are finished."""
+
+    def __init__(self, planner, category_url, listing_url, param, first, total):
+        self.planner = planner
+        self.category_url = category_url
+        self.listing_url = listing_url
+        self.param = param
+        self.first = first
+        self.total = total
+        self.finished = set()
+        self.failed = set()
+        self.page_urls = {first: listing_url}
+        # CrawlEngine running the plan's pages, so extensions can be submitted to it
+        self.engine = None
+
+    def pages(self, start=None):
+        """PlannedPages from `start` (default: after the first page) up to the total."""
+        start = self.first + 1 if start is None else start
+        planned = []
+        for number in range(start, self.total + 1):
+            url = self.planner.page_url(self.listing_url, number, self.param)
+            self.page_urls[number] = url
+            planned.append(PlannedPage(url, self, number))
+        return planned
+
+    def extend(self, total):
+        """Grow the plan to `total` pages; returns the newly planned pages."""
+        if total <= self.total:
+            return []
+        start, self.total = self.total + 1, total
+        return self.pages(start)
+
+    def finish(self, number, ok=True):
+        (self.finished if ok else self.failed).add(number)
+
+    def contiguous(self):
+        """Last page number up to which every page has finished."""
+        number = self.first
+        while number + 1 in self.finished:
+            number += 1
+        return number
+
+    @property
+    def settled(self):
+        """Whether every planned page has finished or failed."""
+        return len(self.finished) + len(self.failed) >= self.total - self.first
+
+    @property
+    def complete(self):
+        return not self.failed and self.contiguous() >= self.total
+
+
+class PaginationPlanner:
+    """Plans every page of a listing up front from its page parameter and page count.
+
+    The page count is the highest page number the first listing page links to
+    (same path, any of PAGE_PARAMS) or shows as a pagination label. Page
+    URLs are the listing URL with that parameter set, so pages can be fetched
+    concurrently instead of by clicking through. Windowed paginators that only
+    link a few pages ahead are handled by extending the plan from later pages.
+    """
+
+    def __init__(self, max_pages=50, site_params=None):
+        self.max_pages = max_pages
+        self.site_params = dict(SITE_PAGE_PARAMS)
+        self.site_params.update(site_params or {})
+
+    @staticmethod
+    def current_page(url):
+        """(param, page number) of `url`, or (None, 1) when it has no page parameter."""
+        query = dict(parse_qsl(urlparse(url).query))
+        for param in PAGE_PARAMS:
+            if query.get(param, '').isdigit():
+                return param, int(query[param])
+        return None, 1
+
+    def page_param(self, url, hrefs=(), site_type=None):
+        """The parameter `url`'s listing paginates with."""
+        param, _ = self.current_page(url)
+        if param:
+            return param
+        for param, _ in self._linked_pages(url, hrefs):
+            return param
+        return self.site_params.get(site_type, PAGE_PARAMS[0])
+
+    def page_url(self, url, number, param=None):
+        """`url` with its page parameter set to `number`."""
+        parsed_url = urlparse(url)
+        query_params = dict(parse_qsl(parsed_url.query))
+        query_params[param or self.page_param(url)] = str(number)
+        return parsed_url._replace(query=urlencode(query_params)).geturl()
+
+    def next_page_url(self, url):
+        param, number = self.current_page(url)
+        return self.page_url(url, number + 1, param)
+
+    @staticmethod
+    def _linked_pages(url, hrefs):
+        """(param, number) for every link to another page of the same listing."""
+        listing = urlparse(url)
+        host, path = listing.netloc.lower(), listing.path.rstrip('/')
+        for href in hrefs:
+            if not href:
+                continue
+            link = urlparse(urljoin(url, href))
+            if link.netloc.lower() != host or link.path.rstrip('/') != path:
+                continue
+            query = dict(parse_qsl(link.query))
+            for param in PAGE_PARAMS:
+                if query.get(param, '').isdigit():
+                    yield param, int(query[param])
+                    break
+
+    def total_pages(self, url, hrefs=(), labels=()):
+        """Page count of `url`'s listing from its pagination links and labels (capped at max_pages)."""
+        total = self.current_page(url)[1]
+        for _, number in self._linked_pages(url, hrefs):
+            total = max(total, number)
+        for label in labels:
+            if str(label).isdigit():
+                total = max(total, int(label))
+        return min(total, self.max_pages)
+
+    def plan(self, category_url, url, hrefs=(), labels=(), site_type=None):
+        """PagePlan for the listing whose page `url` was just processed."""
+        param = self.page_param(url, hrefs, site_type)
+        first = self.current_page(url)[1]
+        return PagePlan(self, category_url, url, param, first, self.total_pages(url, hrefs, labels))
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from html_parsers import get_parser_backend, parse_links
+from url_canonicalizer import get_canonicalizer
+from url_classifier import LABELS, URLClassifier
+
+logger = logging.getLogger(__name__)
+
+# One classifier per worker process, built on first use
+_classifier = None
+
+
+def _get_classifier():
+    global _classifier
+    if _classifier is None:
+        _classifier = URLClassifier()
+    return _classifier
+
+
+def parse_page(html, base_url, site_type, product_selectors=(), link_selectors=(), backend_name=None):
+    """Parse raw HTML (str or UTF-8 bytes) and return classified links.
+
+    Runs in-process or inside a ParseWorkerPool process. Returns a dict with
+    `site_links`, the product URLs among them (`site_products`) and every
+    absolute http(s) link paired with its primary label (`links`). Links are
+    classified as found and returned canonicalized, without duplicates.
+    """
+    if isinstance(html, (bytes, bytearray, memoryview)):
+        html = bytes(html).decode('utf-8', errors='replace')
+    backend = get_parser_backend(backend_name) if product_selectors and link_selectors else None
+    site_links, all_links = parse_links(html, base_url, product_selectors, link_selectors, backend=backend)
+
+    classifier = _get_classifier()
+    canonicalizer = get_canonicalizer()
+    site_canonical = canonicalizer.canonicalize_many(site_links)
+    site_products = list(dict.fromkeys(
+        canonical for canonical, labels in zip(site_canonical, classifier.classify_many(site_links, site_type))
+        if 'product' in labels
+    ))
+
+    candidates = [url for url in all_links if url.startswith(('http://', 'https://'))]
+    links = {}
+    for canonical, labels in zip(canonicalizer.canonicalize_many(candidates),
+                                 classifier.classify_many(candidates, site_type)):
+        if canonical not in links:
+            links[canonical] = next((name for name in LABELS if name in labels), None)
+
+    return {
+        'site_links': list(dict.fromkeys(site_canonical)),
+        'site_products': site_products,
+        'links': list(links.items()),
+    }
+
+
+class ParseWorkerPool:
+    """ProcessPoolExecutor-backed HTML parsing with bounded in-flight work.
+
+    At most `max_pending` pages are queued or parsing at once; further
+    submissions wait, so producers slow down instead of piling HTML up in
+    memory while the event loop keeps serving I/O.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or os.cpu_count() or 2
+        self.max_pending = max_pending or self.workers * 2
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._sync_slots = threading.BoundedSemaphore(self.max_pending)
+        self._async_slots = None
+        self.stats = {
+            'parsed': 0,
+            'failed': 0,
+            'backpressure_waits': 0,
+        }
+
+    def _slots(self):
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_pending)
+        return self._async_slots
+
+    async def parse(self, html, base_url, site_type, product_selectors=(), link_selectors=(), backend_name=None):
+        """Parse on a worker process without blocking the event loop."""
+        slots = self._slots()
+        if slots.locked():
+            self.stats['backpressure_waits'] += 1
+        async with slots:
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(
+                    self.executor, parse_page, _as_bytes(html), base_url, site_type,
+                    tuple(product_selectors), tuple(link_selectors), backend_name
+                )
+            except Exception:
+                self.stats['failed'] += 1
+                raise
+            self.stats['parsed'] += 1
+            return result
+
+    def parse_sync(self, html, base_url, site_type, product_selectors=(), link_selectors=(), backend_name=None):
+        """Blocking variant for synchronous callers."""
+        if not self._sync_slots.acquire(blocking=False):
+            self.stats['backpressure_waits'] += 1
+            self._sync_slots.acquire()
+        try:
+            future = self.executor.submit(
+                parse_page, _as_bytes(html), base_url, site_type,
+                tuple(product_selectors), tuple(link_selectors), backend_name
+            )
+            result = future.result()
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+        finally:
+            self._sync_slots.release()
+        self.stats['parsed'] += 1
+        return result
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        logger.info(f"Parse worker pool closed. Stats: {self.stats}")
+
+
+def _as_bytes(html):
+    return html.encode('utf-8') if isinstance(html, str) else html
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit
+from urllib.request import Request, urlopen
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean "slow down"
+THROTTLE_STATUSES = {429, 503}
+
+
+class _DomainState:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        # Upper bound on the rate from robots.txt (None until robots.txt is read)
+        self.rate_cap = None
+        self.latency = None
+        self.baseline = None
+        self.requests = 0
+        self.throttled = 0
+
+
+class DomainRateLimiter:
+    """Token-bucket rate limiter keyed by domain, shared by every fetch path.
+
+    Each domain starts at `initial_rate` requests per second. The rate
+    adapts AIMD-style to how the server behaves (`observe`): it grows by
+    `increase` after each fast successful response and is multiplied by
+    `decrease` on a 429 or 5xx, a failed request, or a response much slower
+    than the domain's baseline latency. A Retry-After header pauses the
+    domain for the time it asks, after which requests resume one token at a
+    time. With `respect_robots`, robots.txt is read once per domain and its
+    Crawl-delay / Request-rate caps the rate.
+
+    `acquire` waits for a token without blocking the event loop;
+    `acquire_sync` is the blocking variant for the sync fetch paths.
+    """
+
+    def __init__(self, initial_rate=2.0, min_rate=0.05, max_rate=20.0, burst=4, increase=0.1,
+                 decrease=0.5, slow_factor=3.0, respect_robots=True, user_agent='*', robots_timeout=10):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_factor = slow_factor
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.robots_timeout = robots_timeout
+        self._domains = {}
+        # Set once the domain's robots.txt has been read and applied
+        self._robots_ready = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def domain(url):
+        return urlsplit(url).netloc.lower()
+
+    def _state(self, domain):
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = _DomainState(self.initial_rate, self.burst)
+        return state
+
+    # Tokens
+
+    def _reserve(self, url):
+        """Take a token for `url`'s domain and return how long to wait before using it."""
+        with self._lock:
+            state = self._state(self.domain(url))
+            now = time.monotonic()
+            # `updated` is in the future while a Retry-After block lasts; tokens accrue from its end
+            if now > state.updated:
+                state.tokens = min(state.burst, state.tokens + (now - state.updated) * state.rate)
+                state.updated = now
+            state.tokens -= 1
+            state.requests += 1
+            wait = state.updated - now + (-state.tokens / state.rate if state.tokens < 0 else 0.0)
+            return max(wait, state.blocked_until - now)
+
+    async def acquire(self, url):
+        """Wait (without blocking the event loop) until a request to `url` is allowed."""
+        if self.respect_robots:
+            ready, owner = self._claim_robots(url)
+            if owner:
+                try:
+                    self._apply_robots(url, await asyncio.to_thread(self._read_robots, url))
+                finally:
+                    ready.set()
+            elif not ready.is_set():
+                await asyncio.to_thread(ready.wait)
+        wait = self._reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, url):
+        """Blocking variant of acquire for sync callers."""
+        if self.respect_robots:
+            ready, owner = self._claim_robots(url)
+            if owner:
+                try:
+                    self._apply_robots(url, self._read_robots(url))
+                finally:
+                    ready.set()
+            else:
+                ready.wait()
+        wait = self._reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    # Feedback
+
+    def observe(self, url, status=None, latency=None, retry_after=None):
+        """Adapt `url`'s domain rate to a response; `status` None means the request failed."""
+        with self._lock:
+            state = self._state(self.domain(url))
+            pause = _parse_retry_after(retry_after)
+            if pause:
+                state.blocked_until = max(state.blocked_until, time.monotonic() + pause)
+                # Restart the bucket at the end of the block so waiters resume one token at a time
+                state.tokens = min(state.tokens, 1)
+                state.updated = max(state.updated, state.blocked_until)
+            if status is None or status in THROTTLE_STATUSES or status >= 500:
+                state.throttled += 1
+                self._slow_down(state, self.decrease)
+                return
+            if latency is not None:
+                state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+                state.baseline = latency if state.baseline is None else min(state.baseline, state.latency)
+                if latency > self.slow_factor * state.baseline:
+                    # Latency climbing well above the baseline is an early congestion signal
+                    self._slow_down(state, (1 + self.decrease) / 2)
+                    return
+            if status < 400:
+                ceiling = self.max_rate if state.rate_cap is None else min(self.max_rate, state.rate_cap)
+                state.rate = min(ceiling, state.rate + self.increase)
+
+    def penalize(self, url):
+        """Slow `url`'s domain down after a failure seen outside the HTTP layer (e.g. a blocked page)."""
+        self.observe(url, None)
+
+    def _slow_down(self, state, factor):
+        state.rate = max(self.min_rate, state.rate * factor)
+        # Drop saved-up tokens so the lower rate takes effect immediately
+        state.tokens = min(state.tokens, 1)
+
+    def stats(self):
+        """Current rate, request and throttle counts by domain."""
+        with self._lock:
+            return {
+                domain: {'rate': round(state.rate, 3), 'requests': state.requests, 'throttled': state.throttled,
+                         'rate_cap': state.rate_cap}
+                for domain, state in self._domains.items()
+            }
+
+    # robots.txt
+
+    def _claim_robots(self, url):
+        """(ready event, whether the caller reads robots.txt) for `url`'s domain.
+
+        The first caller reads it and sets the event; everyone else waits on
+        the event so no request goes out before its Crawl-delay is applied.
+        """
+        domain = self.domain(url)
+        with self._lock:
+            ready = self._robots_ready.get(domain)
+            if ready is not None:
+                return ready, False
+            ready = self._robots_ready[domain] = threading.Event()
+            return ready, True
+
+    def _read_robots(self, url):
+        """Seconds between requests asked by `url`'s robots.txt, or None."""
+        parts = urlsplit(url)
+        robots_url = urlunsplit((parts.scheme or 'https', parts.netloc, '/robots.txt', '', ''))
+        try:
+            with urlopen(Request(robots_url, headers={'User-Agent': 'Mozilla/5.0'}), timeout=self.robots_timeout) as response:
+                lines = response.read().decode('utf-8', errors='replace').splitlines()
+        except Exception as e:
+            logger.debug(f"No robots.txt for {parts.netloc}: {e}")
+            return None
+        parser = RobotFileParser()
+        parser.parse(lines)
+        delay = parser.crawl_delay(self.user_agent)
+        request_rate = parser.request_rate(self.user_agent)
+        if request_rate and request_rate.requests:
+            rate_delay = request_rate.seconds / request_rate.requests
+            delay = max(delay or 0, rate_delay)
+        return float(delay) if delay else None
+
+    def _apply_robots(self, url, delay):
+        if not delay:
+            return
+        with self._lock:
+            state = self._state(self.domain(url))
+            state.rate_cap = 1 / delay
+            state.rate = min(state.rate, state.rate_cap)
+            state.burst = 1
+            state.tokens = min(state.tokens, 1)
+        logger.info(f"robots.txt asks {self.domain(url)} to be crawled every {delay:g}s")
+
+
+def _parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_shared_limiter = None
+
+
+def get_rate_limiter():
+    """Process-wide shared DomainRateLimiter."""
+    global _shared_limiter
+    if _shared_limiter is None:
+        _shared_limiter = DomainRateLimiter()
+    return _shared_limiter
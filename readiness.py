@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Identifies the listing currently shown: the first few links in the product containers
+_SIGNATURE_FN = """
+const signature = (containers) => {
+    const hrefs = [];
+    for (const selector of containers) {
+        let nodes;
+        try { nodes = document.querySelectorAll(selector); } catch (e) { continue; }
+        for (const node of nodes) {
+            const link = node.matches('a[href]') ? node : node.querySelector('a[href]');
+            if (link) hrefs.push(link.getAttribute('href'));
+            if (hrefs.length >= 3) break;
+        }
+        if (hrefs.length >= 3) break;
+    }
+    return hrefs.length ? hrefs.join('|') : location.href;
+};
+"""
+
+SIGNATURE_JS = "(containers) => {" + _SIGNATURE_FN + "return signature(containers); }"
+
+# Resolves once the page is ready: at least minCount containers whose count has stayed
+# the same for stableMs (or a next-page control is already rendered), showing a
+# different listing than `previous`. Resolves not-ready after timeoutMs.
+READY_JS = "([containers, nextPage, minCount, stableMs, timeoutMs, previous]) => {" + _SIGNATURE_FN + """
+    const count = () => containers.reduce((total, selector) => {
+        try { return total + document.querySelectorAll(selector).length; } catch (e) { return total; }
+    }, 0);
+    const hasNext = () => nextPage.some(selector => {
+        try { return !!document.querySelector(selector); } catch (e) { return false; }
+    });
+    return new Promise(resolve => {
+        const start = performance.now();
+        let lastCount = -1;
+        let stableSince = start;
+        const check = () => {
+            const now = performance.now();
+            const found = count();
+            if (found !== lastCount) {
+                lastCount = found;
+                stableSince = now;
+            }
+            const changed = previous === null || signature(containers) !== previous;
+            if (changed && found >= minCount && (now - stableSince >= stableMs || hasNext())) {
+                return resolve({ready: true, count: found});
+            }
+            if (now - start >= timeoutMs) {
+                return resolve({ready: false, count: found});
+            }
+            setTimeout(check, 50);
+        };
+        check();
+    });
+}
+"""
+
+
+class ReadinessRule:
+    """What "ready" means for a page: enough `containers`, their count settled or a next-page control shown."""
+
+    def __init__(self, containers, next_page=(), min_count=1, stable_ms=400, timeout_ms=15000):
+        self.containers = list(containers)
+        self.next_page = list(next_page)
+        self.min_count = min_count
+        self.stable_ms = stable_ms
+        self.timeout_ms = timeout_ms
+
+    def args(self, previous=None):
+        return [self.containers, self.next_page, self.min_count, self.stable_ms, self.timeout_ms, previous]
+
+
+# Per-site adjustments on top of the rules derived from the site selectors
+READINESS_OVERRIDES = {
+    # Search results render server-side; the enabled next button comes after the last result
+    'amazon': {
+        'containers': ['div[data-component-type="s-search-result"]'],
+        'next_page': ['.s-pagination-next:not([aria-disabled="true"])'],
+        'stable_ms': 250,
+    },
+    # Client-rendered grids fill in batches
+    'noon': {'stable_ms': 600},
+    'alibaba': {'stable_ms': 600},
+}
+
+
+class ReadinessEngine:
+    """Waits for per-site readiness conditions instead of network idle, and times every wait.
+
+    Rules come from the site selectors (product containers and next-page
+    controls) plus READINESS_OVERRIDES. A wait resolves in a single
+    page.evaluate as soon as the rule holds; passing the `previous`
+    signature (see `signature`) also requires the listing to have changed,
+    which is how pagination clicks are confirmed. `stats` keeps the count,
+    total and worst time of the waits per step.
+    """
+
+    def __init__(self, site_selectors, overrides=None, timeout_ms=15000):
+        self.rules = {}
+        overrides = READINESS_OVERRIDES if overrides is None else overrides
+        for site_type, selectors in site_selectors.items():
+            options = {
+                'containers': selectors.get('product', []),
+                'next_page': selectors.get('next_page', []),
+                'timeout_ms': timeout_ms,
+            }
+            options.update(overrides.get(site_type, {}))
+            self.rules[site_type] = ReadinessRule(**options)
+        self.stats = {}
+
+    def rule_for(self, site_type):
+        return self.rules.get(site_type) or self.rules['generic']
+
+    def _rule(self, rule):
+        return self.rule_for(rule) if isinstance(rule, str) else rule
+
+    async def signature(self, page, rule):
+        """Signature of the listing on `page`, for a later wait(previous=...)."""
+        try:
+            return await page.evaluate(SIGNATURE_JS, self._rule(rule).containers)
+        except Exception:
+            return None
+
+    async def wait(self, page, rule, step, previous=None):
+        """Wait until `page` satisfies `rule` (a ReadinessRule or site type); returns whether it did."""
+        rule = self._rule(rule)
+        start = time.perf_counter()
+        deadline = start + rule.timeout_ms / 1000
+        result = {'ready': False, 'count': 0}
+        while True:
+            remaining_ms = int((deadline - time.perf_counter()) * 1000)
+            if remaining_ms <= 0:
+                break
+            try:
+                args = rule.args(previous)
+                args[4] = remaining_ms
+                result = await page.evaluate(READY_JS, args)
+                break
+            except Exception as e:
+                # A navigation replaced the document mid-wait; check again on the new one
+                logger.debug(f"Readiness check interrupted on {page.url}: {e}")
+                try:
+                    await page.wait_for_load_state('domcontentloaded', timeout=max(1, remaining_ms))
+                except Exception:
+                    await asyncio.sleep(0.05)
+        return self._record(step, page.url, result, time.perf_counter() - start)
+
+    def wait_sync(self, page, rule, step, previous=None):
+        """wait() for sync Playwright pages."""
+        rule = self._rule(rule)
+        start = time.perf_counter()
+        try:
+            result = page.evaluate(READY_JS, rule.args(previous))
+        except Exception as e:
+            logger.debug(f"Readiness check failed on {page.url}: {e}")
+            result = {'ready': False, 'count': 0}
+        return self._record(step, page.url, result, time.perf_counter() - start)
+
+    def _record(self, step, url, result, elapsed):
+        stats = self.stats.setdefault(step, {'waits': 0, 'timeouts': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+        stats['waits'] += 1
+        stats['seconds'] += elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+        if not result['ready']:
+            stats['timeouts'] += 1
+            logger.info(f"{step}: {url} not ready after {elapsed:.2f}s ({result['count']} containers)")
+        else:
+            logger.debug(f"{step}: {url} ready in {elapsed:.2f}s ({result['count']} containers)")
+        return result['ready']
+
+    def summary(self):
+        """Per-step wait count, timeouts and average/worst seconds."""
+        return {
+            step: {
+                'waits': stats['waits'],
+                'timeouts': stats['timeouts'],
+                'avg_seconds': round(stats['seconds'] / stats['waits'], 3),
+                'max_seconds': round(stats['max_seconds'], 3),
+            }
+            for step, stats in self.stats.items()
+        }
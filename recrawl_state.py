@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = 'recrawl_state.json'
+DEFAULT_UNCHANGED_PAGES = 3
+
+
+def fingerprint(urls):
+    """Order-independent hash of a page's product-URL set."""
+    digest = hashlib.blake2b(digest_size=16)
+    for url in sorted(set(urls)):
+        digest.update(url.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class ListingRun:
+    """One walk over a category's pagination, compared page by page with the previous run."""
+
+    def __init__(self, category_url, previous_pages, unchanged_pages):
+        self.category_url = category_url
+        self.previous_pages = previous_pages
+        self.unchanged_pages = unchanged_pages
+        self.pages = {}
+        self.unchanged_prefix = 0
+        self.changed = False
+
+    def observe(self, page_number, product_urls):
+        """Record one page. Returns True once the first K pages all match the previous run."""
+        page_fingerprint = fingerprint(product_urls)
+        self.pages[str(page_number)] = {'fingerprint': page_fingerprint, 'products': sorted(set(product_urls))}
+        previous = self.previous_pages.get(str(page_number))
+        if not self.changed and previous and previous['fingerprint'] == page_fingerprint:
+            self.unchanged_prefix += 1
+        else:
+            self.changed = True
+        return self.should_stop()
+
+    def should_stop(self):
+        return (bool(self.unchanged_pages) and not self.changed
+                and self.unchanged_prefix >= self.unchanged_pages)
+
+    def final_pages(self, complete):
+        """Pages to remember for the next run.
+
+        A walk that reached the natural end of the pagination replaces the
+        old pages; one cut short (early stop, page limit, error) keeps the
+        previous fingerprints for the pages it never reached.
+        """
+        if complete and not self.should_stop():
+            return dict(self.pages)
+        pages = dict(self.previous_pages)
+        pages.update(self.pages)
+        return pages
+
+
+class RecrawlState:
+    """Per-category page fingerprints persisted between runs, plus the delta of this run.
+
+    `begin()` opens a ListingRun for a category URL; `finish()` folds it
+    back in and accumulates the product URLs added and removed since the
+    previous run. `save()` writes the state atomically.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH, unchanged_pages=DEFAULT_UNCHANGED_PAGES):
+        self.path = path
+        self.unchanged_pages = unchanged_pages
+        self.categories = {}
+        self.delta = {}
+        self.stats = {
+            'categories': 0,
+            'stopped_early': 0,
+            'pages_walked': 0,
+            'pages_skipped': 0,
+        }
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.categories = json.load(f).get('categories', {})
+            except Exception as e:
+                logger.error(f"Could not read recrawl state {path}: {e}")
+
+    def begin(self, category_url):
+        previous = self.categories.get(category_url, {}).get('pages', {})
+        return ListingRun(category_url, previous, self.unchanged_pages)
+
+    def finish(self, run, complete=True):
+        """Fold a finished ListingRun into the state and record its product delta."""
+        old_products = _products(run.previous_pages)
+        pages = run.final_pages(complete)
+        new_products = _products(pages)
+
+        self.categories[run.category_url] = {
+            'updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'pages': pages,
+        }
+        self.delta[run.category_url] = {
+            'added': sorted(new_products - old_products),
+            'removed': sorted(old_products - new_products),
+        }
+
+        self.stats['categories'] += 1
+        self.stats['pages_walked'] += len(run.pages)
+        if run.should_stop():
+            self.stats['stopped_early'] += 1
+            self.stats['pages_skipped'] += max(len(pages) - len(run.pages), 0)
+        return self.delta[run.category_url]
+
+    def save(self):
+        """Write the fingerprints atomically (temp file + rename)."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': 1, 'categories': self.categories}, f)
+        os.replace(tmp_path, self.path)
+
+    def write_delta(self, path):
+        """Write the added/removed product URLs of this run, overall and per category."""
+        added = set()
+        removed = set()
+        for change in self.delta.values():
+            added.update(change['added'])
+            removed.update(change['removed'])
+        data = {
+            'added': sorted(added),
+            'removed': sorted(removed),
+            'categories': self.delta,
+            'stats': dict(self.stats, generated=datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
+        return data
+
+
+def _products(pages):
+    products = set()
+    for page in pages.values():
+        products.update(page['products'])
+    return products
@@ -0,0 +1,157 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# File extensions that identify a resource type from its URL alone
+RESOURCE_EXTENSIONS = {
+    'image': ['png', 'jpe?g', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp'],
+    'font': ['woff2?', 'ttf', 'otf', 'eot'],
+    'stylesheet': ['css'],
+    'media': ['mp4', 'webm', 'm3u8', 'ts', 'mp3', 'ogg', 'wav', 'mov'],
+}
+
+# Rough transfer sizes used to estimate bytes saved by a blocked request
+TYPICAL_RESOURCE_BYTES = {
+    'image': 45000,
+    'font': 60000,
+    'stylesheet': 30000,
+    'media': 500000,
+    'script': 50000,
+    'xhr': 10000,
+    'fetch': 10000,
+    'other': 5000,
+}
+
+# Ad, analytics and tracking hosts that never carry product links
+TRACKER_PATTERNS = [
+    r'doubleclick\.net',
+    r'googlesyndication\.com',
+    r'google-analytics\.com',
+    r'googletagmanager\.com',
+    r'amazon-adsystem\.com',
+    r'facebook\.(?:net|com)/tr',
+    r'connect\.facebook\.net',
+    r'hotjar\.com',
+    r'criteo\.(?:com|net)',
+    r'/(?:ads|adserver|pixel|beacon)/',
+]
+
+
+class InterceptionStats:
+    """Requests blocked (and estimated bytes saved) per page for one context."""
+
+    def __init__(self, profile_name):
+        self.profile_name = profile_name
+        self.pages = {}
+
+    def record(self, page, resource_type):
+        entry = self.pages.setdefault(page, {'requests': 0, 'bytes': 0, 'by_type': {}})
+        entry['requests'] += 1
+        entry['bytes'] += TYPICAL_RESOURCE_BYTES.get(resource_type, TYPICAL_RESOURCE_BYTES['other'])
+        entry['by_type'][resource_type] = entry['by_type'].get(resource_type, 0) + 1
+
+    def for_page(self, page):
+        return self.pages.get(page, {'requests': 0, 'bytes': 0, 'by_type': {}})
+
+    def totals(self):
+        return {
+            'requests': sum(entry['requests'] for entry in self.pages.values()),
+            'bytes': sum(entry['bytes'] for entry in self.pages.values()),
+        }
+
+
+class InterceptionProfile:
+    """Blocks resources by type and URL pattern at browser-context level.
+
+    Types are matched by file extension and folded with the URL patterns into
+    one regex handed to `context.route`, so Playwright only calls back into
+    Python for requests that are actually blocked. `strict_types` adds a
+    catch-all route that checks `resource_type` for extension-less URLs, at
+    the cost of a Python callback per request.
+    """
+
+    def __init__(self, name, block_types=(), block_patterns=(), strict_types=False):
+        self.name = name
+        self.block_types = frozenset(block_types)
+        self.block_patterns = list(block_patterns)
+        self.strict_types = strict_types
+
+        parts = list(self.block_patterns)
+        extensions = [ext for t in sorted(self.block_types) for ext in RESOURCE_EXTENSIONS.get(t, [])]
+        if extensions:
+            parts.append(r'\.(?:' + '|'.join(extensions) + r')(?:[?#]|$)')
+        self.regex = re.compile('|'.join(parts), re.IGNORECASE) if parts else None
+
+    @property
+    def blocks_anything(self):
+        return self.regex is not None or (self.strict_types and bool(self.block_types))
+
+    def _handler(self, stats):
+        def handle(route):
+            request = route.request
+            try:
+                page = request.frame.page
+            except Exception:
+                page = None
+            stats.record(page, request.resource_type)
+            return route.abort()
+        return handle
+
+    def _strict_handler(self, stats):
+        def handle(route):
+            request = route.request
+            if request.resource_type in self.block_types:
+                try:
+                    page = request.frame.page
+                except Exception:
+                    page = None
+                stats.record(page, request.resource_type)
+                return route.abort()
+            return route.fallback()
+        return handle
+
+    async def apply(self, context):
+        """Install the profile on an async Playwright context; returns its InterceptionStats."""
+        stats = InterceptionStats(self.name)
+        if self.strict_types and self.block_types:
+            await context.route('**/*', self._strict_handler(stats))
+        if self.regex is not None:
+            await context.route(self.regex, self._handler(stats))
+        return stats
+
+    def apply_sync(self, context):
+        """Install the profile on a sync Playwright context; returns its InterceptionStats."""
+        stats = InterceptionStats(self.name)
+        if self.strict_types and self.block_types:
+            context.route('**/*', self._strict_handler(stats))
+        if self.regex is not None:
+            context.route(self.regex, self._handler(stats))
+        return stats
+
+
+PROFILES = {
+    # Listing crawls only need the DOM and the scripts that build it
+    'links-only': InterceptionProfile(
+        'links-only',
+        block_types=('image', 'font', 'stylesheet', 'media'),
+        block_patterns=TRACKER_PATTERNS,
+    ),
+    # Detail pages keep stylesheets so visibility-dependent widgets still render
+    'detail-fields': InterceptionProfile(
+        'detail-fields',
+        block_types=('image', 'font', 'media'),
+        block_patterns=TRACKER_PATTERNS,
+    ),
+    'full': InterceptionProfile('full'),
+}
+
+
+def get_profile(profile):
+    """Resolve a profile name (or pass an InterceptionProfile through)."""
+    if profile is None or isinstance(profile, InterceptionProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown interception profile: {profile!r} (choose from {', '.join(PROFILES)})")
@@ -1,10 +1,19 @@
+import argparse
 import asyncio
 import json
 import logging
+import os
 import random
+import time
 from time import sleep
 from fake_useragent import UserAgent
-from playwright.async_api import async_playwright
+from browser_pool import BrowserPool
+from field_extractor import Field, FieldSpec, clean_text
+from rate_limiter import get_rate_limiter
+from readiness import ReadinessEngine, ReadinessRule
+from sinks import SINK_TYPES, open_sink
+from url_canonicalizer import get_canonicalizer
+from url_store import CompactURLSet
 
 # Configure logger
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -26,7 +35,8 @@ class Utils:
 
     @staticmethod
     async def mimic_mouse(page):
-        width, height = await page.viewport_size()
+        viewport = page.viewport_size or {"width": 1280, "height": 720}
+        width, height = viewport["width"], viewport["height"]
         for _ in range(5):
             x, y = random.randint(0, width), random.randint(0, height)
             logger.info("Mimicking mouse movement to: (%d, %d)", x, y)
@@ -50,6 +60,23 @@ class CSSSelectors:
     LOGIN_MODAL = "div.login-modal"  # Placeholder for login modal
     LOGIN_CLOSE_BUTTON = "button.close-modal"  # Placeholder for modal close button
 
+# Declarative product field spec; one spec serves live pages and offline HTML
+PRODUCT_FIELDS = FieldSpec([
+    Field("title", CSSSelectors.TITLE, post=clean_text),
+    Field("ASIN", CSSSelectors.ASIN, post=clean_text),
+    Field("price", CSSSelectors.PRICE, post=clean_text),
+    Field("old_price", CSSSelectors.OLD_PRICE, post=clean_text),
+    Field("savings", CSSSelectors.SAVINGS, post=clean_text),
+    Field("rating", CSSSelectors.RATING, post=clean_text),
+    Field("rating_count", CSSSelectors.RATING_COUNT, post=clean_text),
+    Field("review_count", CSSSelectors.REVIEW_COUNT, post=clean_text),
+    Field("image_url", CSSSelectors.IMAGE, attr="src"),
+])
+
+# A product page is ready once its title or price has rendered
+PRODUCT_READY = ReadinessRule([CSSSelectors.TITLE, CSSSelectors.PRICE], stable_ms=200, timeout_ms=5000)
+readiness = ReadinessEngine({})
+
 class Scraper:
     """Core scraper class for handling product scraping."""
 
@@ -68,53 +95,132 @@ class Scraper:
                 logger.warning("No close button found for login modal.")
 
     @staticmethod
-    async def scrape_product_details(product_url, page):
+    async def scrape_product_details(product_url, page, limiter=None):
+        """Scrape one product page; navigation is paced by `limiter` (the shared rate limiter by default)."""
+        limiter = limiter or get_rate_limiter()
+        await limiter.acquire(product_url)
         logger.info("Navigating to product URL: %s", product_url)
-        await page.goto(product_url)
+        start = time.monotonic()
+        try:
+            response = await page.goto(product_url)
+        except Exception:
+            limiter.observe(product_url, None)
+            raise
+        if response is not None:
+            limiter.observe(product_url, response.status, time.monotonic() - start,
+                            response.headers.get("retry-after"))
         await Scraper.handle_login_popup(page)
+        await readiness.wait(page, PRODUCT_READY, "product")
         await Utils.mimic_mouse(page)
-        await page.wait_for_timeout(random.uniform(2000, 4000))
-
-        # Extract specific details using selectors
-        product_data = {
-            "title": await page.query_selector(CSSSelectors.TITLE).text_content() if await page.query_selector(CSSSelectors.TITLE) else "",
-            "ASIN": await page.query_selector(CSSSelectors.ASIN).text_content() if await page.query_selector(CSSSelectors.ASIN) else "",
-            "price": await page.query_selector(CSSSelectors.PRICE).text_content() if await page.query_selector(CSSSelectors.PRICE) else "",
-            "old_price": await page.query_selector(CSSSelectors.OLD_PRICE).text_content() if await page.query_selector(CSSSelectors.OLD_PRICE) else "",
-            "savings": await page.query_selector(CSSSelectors.SAVINGS).text_content() if await page.query_selector(CSSSelectors.SAVINGS) else "",
-            "rating": await page.query_selector(CSSSelectors.RATING).text_content() if await page.query_selector(CSSSelectors.RATING) else "",
-            "rating_count": await page.query_selector(CSSSelectors.RATING_COUNT).text_content() if await page.query_selector(CSSSelectors.RATING_COUNT) else "",
-            "review_count": await page.query_selector(CSSSelectors.REVIEW_COUNT).text_content() if await page.query_selector(CSSSelectors.REVIEW_COUNT) else "",
+
+        # Extract all fields in a single browser round-trip
+        fields = await PRODUCT_FIELDS.extract_page(page)
+        product_data = Scraper.build_product_data(fields, product_url)
+
+        logger.info("Scraped product details: %s", product_data)
+        return product_data
+
+    @staticmethod
+    def build_product_data(fields, product_url):
+        """Assemble the product record from extracted fields."""
+        return {
+            "title": fields["title"],
+            "ASIN": fields["ASIN"],
+            "price": fields["price"],
+            "old_price": fields["old_price"],
+            "savings": fields["savings"],
+            "rating": fields["rating"],
+            "rating_count": fields["rating_count"],
+            "review_count": fields["review_count"],
             "key_features": {},  # Needs detailed parsing based on the structure
             "category_tree": [],  # Needs detailed parsing based on the structure
             "product_url": product_url,
-            "image_url": await page.query_selector(CSSSelectors.IMAGE).get_attribute("src") if await page.query_selector(CSSSelectors.IMAGE) else ""
+            "image_url": fields["image_url"]
         }
 
-        logger.info("Scraped product details: %s", product_data)
-        return product_data
+    @staticmethod
+    def parse_product_html(html, product_url):
+        """Offline mode: extract product details from saved HTML with the same field spec."""
+        return Scraper.build_product_data(PRODUCT_FIELDS.extract_html(html), product_url)
 
     @staticmethod
-    async def scrape_all_products(product_urls):
-        logger.info("Starting product details scraping for %d products.", len(product_urls))
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent=Utils.get_random_user_agent()
-            )
-            page = await context.new_page()
-
-            results = []
+    async def iter_product_details(product_urls, concurrency=5, limiter=None):
+        """Scrape product URLs on `concurrency` leased pages, yielding results as they finish.
+
+        `product_urls` may be any iterable, including a lazy file reader; it is
+        consumed through bounded queues, so at most a small window of URLs and
+        results is held in memory at once. Requests are paced per domain by
+        `limiter` (rate_limiter.DomainRateLimiter, the shared one by default).
+        """
+        limiter = limiter or get_rate_limiter()
+        workers = max(1, concurrency)
+        url_queue = asyncio.Queue(maxsize=workers * 2)
+        results = asyncio.Queue(maxsize=workers * 2)
+        finished = object()
+
+        async def produce():
             for product_url in product_urls:
-                Utils.random_delay(2, 5)
-                product_data = await Scraper.scrape_product_details(product_url, page)
-                results.append(product_data)
+                await url_queue.put(product_url)
+            for _ in range(workers):
+                await url_queue.put(finished)
+
+        async def worker(pool):
+            async with pool.lease_page(profile="detail-fields", user_agent=Utils.get_random_user_agent()) as page:
+                while True:
+                    product_url = await url_queue.get()
+                    if product_url is finished:
+                        return
+                    try:
+                        await results.put(await Scraper.scrape_product_details(product_url, page, limiter))
+                    except Exception as e:
+                        logger.error("Failed to scrape %s: %s", product_url, e)
 
-            await browser.close()
+        async def run_workers(pool):
+            producer = asyncio.create_task(produce())
+            outcomes = await asyncio.gather(*(worker(pool) for _ in range(workers)), return_exceptions=True)
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            for outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    logger.error("Worker stopped with error: %s", outcome)
+            await results.put(finished)
+
+        async with BrowserPool(size=max(1, concurrency // 4)) as pool:
+            runner = asyncio.create_task(run_workers(pool))
+            try:
+                while True:
+                    product_data = await results.get()
+                    if product_data is finished:
+                        break
+                    yield product_data
+            finally:
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+
+    @staticmethod
+    async def scrape_all_products(product_urls, concurrency=5):
+        logger.info("Starting product details scraping for %d products.", len(product_urls))
+        results = []
+        async for product_data in Scraper.iter_product_details(product_urls, concurrency=concurrency):
+            results.append(product_data)
 
         logger.info("Completed scraping product details for all products.")
         return results
 
+    @staticmethod
+    async def scrape_to_sink(product_urls, sink, concurrency=5):
+        """Scrape lazily and write each product to `sink` as it completes; returns the count."""
+        count = 0
+        async for product_data in Scraper.iter_product_details(product_urls, concurrency=concurrency):
+            sink.write(product_data)
+            count += 1
+            if count % 100 == 0:
+                logger.info("Scraped %d products so far.", count)
+        sink.sync()
+        logger.info("Completed scraping %d products into %s.", count, sink.path)
+        logger.info("Readiness waits: %s", readiness.summary())
+        return count
+
 class FileHandler:
     """Class to handle file reading and writing."""
 
@@ -123,19 +229,103 @@ class FileHandler:
         with open(file_path, "r") as f:
             return json.load(f)
 
+    @staticmethod
+    def iter_urls(file_path):
+        """Lazily yield product URLs from a JSONL file or a JSON array.
+
+        Items may be plain URL strings or records with a `url`/`product_url`
+        field; records carrying a `type` other than "product" are skipped, so
+        URLBreacher's JSONL output can be fed in directly. URLs are
+        canonicalized and variants of an already-yielded product skipped.
+        """
+        canonicalizer = get_canonicalizer()
+        seen = CompactURLSet(track_new=False)
+        with open(file_path, "r", encoding="utf-8") as f:
+            if file_path.endswith(".jsonl"):
+                items = (json.loads(line) for line in f if line.strip())
+            else:
+                items = FileHandler.iter_json_array(f)
+            for item in items:
+                if isinstance(item, dict):
+                    if item.get("type", "product") != "product":
+                        continue
+                    item = item.get("url") or item.get("product_url")
+                if not item:
+                    continue
+                url = canonicalizer.canonicalize(item)
+                if seen.add(url):
+                    yield url
+
+    @staticmethod
+    def iter_json_array(f, chunk_size=1 << 16):
+        """Incrementally parse the first JSON array in `f`, yielding its items.
+
+        Uses ijson when installed; otherwise decodes item by item from a
+        sliding buffer with JSONDecoder.raw_decode. For an object document
+        such as URLBreacher's output, the first array is its `product_urls`.
+        """
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+        if ijson is not None:
+            head = f.read(1)
+            while head and head.isspace():
+                head = f.read(1)
+            f.seek(0)
+            yield from ijson.items(f, "product_urls.item" if head == "{" else "item")
+            return
+
+        decoder = json.JSONDecoder()
+        buffer = ""
+        while "[" not in buffer:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buffer += chunk
+        buffer = buffer[buffer.index("[") + 1:]
+        exhausted = False
+        while True:
+            buffer = buffer.lstrip().lstrip(",").lstrip()
+            if buffer.startswith("]"):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+                # A value that runs to the end of the buffer may continue in the next chunk
+                complete = end < len(buffer) or exhausted
+            except json.JSONDecodeError:
+                complete = False
+            if complete:
+                yield item
+                buffer = buffer[end:]
+                continue
+            if exhausted:
+                raise ValueError(f"Truncated JSON array in {getattr(f, 'name', f)}")
+            chunk = f.read(chunk_size)
+            exhausted = not chunk
+            buffer += chunk
+
     @staticmethod
     def save_json(file_path, data):
         with open(file_path, "w") as f:
             json.dump(data, f, indent=4)
         logger.info("Saved data to %s", file_path)
 
-async def main(input_file, output_file):
-    product_urls = FileHandler.load_json(input_file)
-    product_details = await Scraper.scrape_all_products(product_urls)
-    FileHandler.save_json(output_file, product_details)
+async def main(input_file, output_file, sink="jsonl", concurrency=5):
+    # Read URLs lazily and flush each product to the sink as soon as it is scraped
+    product_urls = FileHandler.iter_urls(input_file)
+    with open_sink(os.path.splitext(output_file)[0], kind=sink, key="product_url") as out:
+        await Scraper.scrape_to_sink(product_urls, out, concurrency=concurrency)
 
 # Example usage
 if __name__ == "__main__":
-    input_file = "product_urls.json"  # Replace with the actual file containing product URLs
-    output_file = "product_details.json"
-    asyncio.run(main(input_file, output_file))
+    parser = argparse.ArgumentParser(description="Scrape product details for a list of product URLs.")
+    parser.add_argument("input_file", nargs="?", default="product_urls.json",
+                        help="JSON array or JSONL file containing product URLs")
+    parser.add_argument("output_file", nargs="?", default="product_details.jsonl",
+                        help="Output file; the extension follows --sink")
+    parser.add_argument("--sink", choices=sorted(SINK_TYPES), default="jsonl",
+                        help="Output backend for product rows (default: jsonl)")
+    parser.add_argument("--concurrency", type=int, default=5, help="Pages scraped at once")
+    args = parser.parse_args()
+    asyncio.run(main(args.input_file, args.output_file, sink=args.sink, concurrency=args.concurrency))
@@ -0,0 +1,95 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Scrolls an infinite feed inside the page and collects the hrefs of every element
+# matching `selectors` as a MutationObserver sees it added. Scrolls again as soon as
+# new nodes stop arriving for quietMs; stops when a scroll brings neither new nodes
+# nor a taller page within settleMs.
+SCROLL_HARVEST_JS = """
+async ({selectors, quietMs, settleMs, maxScrolls, maxMs}) => {
+    const start = performance.now();
+    const hrefs = new Set();
+    const collect = root => {
+        for (const selector of selectors) {
+            try {
+                if (root.matches && root.matches(selector)) {
+                    const href = root.getAttribute('href');
+                    if (href) hrefs.add(href);
+                }
+                for (const el of root.querySelectorAll(selector)) {
+                    const href = el.getAttribute('href');
+                    if (href) hrefs.add(href);
+                }
+            } catch (e) {}
+        }
+    };
+    collect(document);
+    const initial = hrefs.size;
+
+    let mutations = 0;
+    let lastMutation = performance.now();
+    const observer = new MutationObserver(records => {
+        for (const record of records) {
+            for (const node of record.addedNodes) {
+                if (node.nodeType === 1) collect(node);
+            }
+        }
+        mutations += records.length;
+        lastMutation = performance.now();
+    });
+    observer.observe(document.body, {childList: true, subtree: true});
+
+    const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+    const elapsed = () => performance.now() - start;
+    let scrolls = 0;
+    let reachedEnd = false;
+    try {
+        while (scrolls < maxScrolls && elapsed() < maxMs) {
+            const height = document.body.scrollHeight;
+            const before = mutations;
+            window.scrollTo(0, height);
+            scrolls++;
+            // Wait for the feed to react to the scroll...
+            const scrolledAt = performance.now();
+            while (mutations === before && performance.now() - scrolledAt < settleMs) await sleep(50);
+            if (mutations === before) {
+                if (document.body.scrollHeight <= height) {
+                    reachedEnd = true;
+                    break;
+                }
+                continue;
+            }
+            // ...then only until new nodes stop arriving
+            while (performance.now() - lastMutation < quietMs && elapsed() < maxMs) await sleep(50);
+        }
+    } finally {
+        observer.disconnect();
+    }
+    // Pick up links whose href was filled in after their node was added
+    collect(document);
+    return {hrefs: Array.from(hrefs), added: hrefs.size - initial, scrolls, reachedEnd, ms: Math.round(elapsed())};
+}
+"""
+
+
+async def harvest_infinite_scroll(page, selectors, quiet_ms=400, settle_ms=1500, max_scrolls=100, max_ms=60000):
+    """Scroll an infinite feed to its end and return the hrefs of every link matching `selectors`.
+
+    Runs in a single page.evaluate. Returns a dict with the unique raw
+    `hrefs`, how many were `added` by scrolling, the number of `scrolls`,
+    whether the feed `reachedEnd` and the time taken in `ms`.
+    """
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    result = await page.evaluate(SCROLL_HARVEST_JS, {
+        'selectors': list(selectors),
+        'quietMs': quiet_ms,
+        'settleMs': settle_ms,
+        'maxScrolls': max_scrolls,
+        'maxMs': max_ms,
+    })
+    logger.info(f"Infinite scroll: {len(result['hrefs'])} links (+{result['added']}) after "
+                f"{result['scrolls']} scrolls in {result['ms'] / 1000:.1f}s"
+                f"{'' if result['reachedEnd'] else ' (stopped before the end)'}")
+    return result
@@ -0,0 +1,314 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class TrackedURLSet(set):
+    """A set that remembers which members were added since the last `drain_new()`.
+
+    Lets a sink persist only the new URLs of each batch instead of
+    re-serializing the whole set.
+    """
+
+    def __init__(self, iterable=()):
+        super().__init__()
+        self._new = []
+        self.update(iterable)
+
+    def add(self, url):
+        if url not in self:
+            super().add(url)
+            self._new.append(url)
+
+    def update(self, *iterables):
+        for iterable in iterables:
+            for url in iterable:
+                self.add(url)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def restore(self, urls):
+        """Add members that are already persisted (e.g. on resume) without marking them new."""
+        set.update(self, urls)
+
+    @property
+    def pending(self):
+        """Number of members added since the last drain."""
+        return len(self._new)
+
+    def drain_new(self):
+        """Return the members added since the last call and forget them."""
+        new, self._new = self._new, []
+        return new
+
+
+class ResultSink:
+    """Base class for batched result writers.
+
+    Subclasses implement `write`, `sync`, `iter_records` and `close`;
+    `compact()` turns any of them back into one JSON document. `key` names
+    the record field that identifies a row ('url' for URL records,
+    'product_url' for product details).
+    """
+
+    extension = ''
+
+    def __init__(self, path, key='url'):
+        self.path = path
+        self.key = key
+        self.records_written = 0
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def sync(self):
+        """Make everything written so far durable."""
+
+    def iter_records(self):
+        raise NotImplementedError
+
+    def compact(self, output_path, groups, stats=None, group_by='type'):
+        """Write a JSON document with one URL list per group, streaming from the sink.
+
+        `groups` maps an output key (e.g. 'product_urls') to the `group_by`
+        value of the records it collects (e.g. 'product'). Each group is a
+        separate pass over the sink, so memory stays flat. The document is
+        written to a temp file and renamed into place.
+        """
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            out.write('{')
+            for index, (name, value) in enumerate(groups.items()):
+                out.write(',\n' if index else '\n')
+                out.write(f'    {json.dumps(name)}: [')
+                first = True
+                for record in self.iter_records():
+                    if record.get(group_by) != value:
+                        continue
+                    out.write('\n        ' if first else ',\n        ')
+                    out.write(json.dumps(record[self.key], ensure_ascii=False))
+                    first = False
+                out.write('\n    ]' if not first else ']')
+            if stats is not None:
+                out.write(',\n    "stats": ' + json.dumps(stats, indent=4, default=str).replace('\n', '\n    '))
+            out.write('\n}\n')
+        os.replace(tmp_path, output_path)
+        return output_path
+
+    def close(self):
+        self.sync()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class JSONLSink(ResultSink):
+    """Append-only JSON Lines writer.
+
+    Each record is one line, so writing a record costs the same however
+    large the file already is. The file is flushed and fsynced every
+    `fsync_every` records or `fsync_interval` seconds, whichever comes first.
+    """
+
+    extension = '.jsonl'
+
+    def __init__(self, path, key='url', fsync_every=100, fsync_interval=5.0):
+        super().__init__(path, key)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _open(self):
+        # Opened on first write so an idle sink leaves no empty file behind
+        if self._file is None or self._file.closed:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        return self._file
+
+    def write(self, record):
+        self._open().write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.records_written += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """Flush buffered lines and fsync them to disk."""
+        if self._file is None or self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def iter_records(self):
+        """Stream the records written so far (including earlier runs on the same file)."""
+        self.sync()
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash; everything before it is intact
+                    logger.warning(f"Skipping unreadable line in {self.path}")
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self.sync()
+            self._file.close()
+
+
+class SQLiteSink(ResultSink):
+    """SQLite table in WAL mode keyed by URL, written in batched transactions.
+
+    Re-writing a URL replaces its row, so reruns upsert instead of
+    duplicating. The full record is kept as JSON next to the key and type.
+    """
+
+    extension = '.sqlite'
+
+    def __init__(self, path, key='url', table='records', batch_size=500):
+        super().__init__(path, key)
+        self.table = table
+        self.batch_size = batch_size
+        self._rows = []
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {table} ('
+            'url TEXT PRIMARY KEY, type TEXT, data TEXT NOT NULL, written_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+
+    def write(self, record):
+        self._rows.append((record[self.key], record.get('type'),
+                           json.dumps(record, ensure_ascii=False), time.time()))
+        self.records_written += 1
+        if len(self._rows) >= self.batch_size:
+            self.sync()
+
+    def sync(self):
+        if not self._rows:
+            return
+        with self._conn:
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO {self.table} (url, type, data, written_at) VALUES (?, ?, ?, ?)',
+                self._rows
+            )
+        self._rows = []
+
+    def iter_records(self):
+        self.sync()
+        for (data,) in self._conn.execute(f'SELECT data FROM {self.table} ORDER BY written_at'):
+            yield json.loads(data)
+
+    def close(self):
+        self.sync()
+        self._conn.close()
+
+
+class ParquetSink(ResultSink):
+    """Columnar output as a directory of Parquet part files (an Arrow dataset).
+
+    Rows are buffered and written as one part file per `batch_size` rows
+    (and on every `sync()`), so readers such as pyarrow.dataset, pandas or
+    DuckDB can scan millions of rows column by column. Nested values are
+    stored as JSON strings. Requires pyarrow.
+    """
+
+    extension = '.parquet'
+
+    def __init__(self, path, key='url', batch_size=10000, compression='zstd'):
+        super().__init__(path, key)
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ImportError("The parquet sink requires pyarrow (pip install pyarrow)")
+        self.batch_size = batch_size
+        self.compression = compression
+        self._rows = []
+        os.makedirs(path, exist_ok=True)
+        self._parts = len([name for name in os.listdir(path) if name.endswith('.parquet')])
+
+    def write(self, record):
+        self._rows.append({
+            name: json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+            for name, value in record.items()
+        })
+        self.records_written += 1
+        if len(self._rows) >= self.batch_size:
+            self.sync()
+
+    def sync(self):
+        if not self._rows:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        part_path = os.path.join(self.path, f'part-{self._parts:05d}.parquet')
+        pq.write_table(pa.Table.from_pylist(self._rows), part_path, compression=self.compression)
+        self._parts += 1
+        self._rows = []
+
+    def iter_records(self):
+        import pyarrow.parquet as pq
+
+        self.sync()
+        for name in sorted(os.listdir(self.path)):
+            if not name.endswith('.parquet'):
+                continue
+            for batch in pq.ParquetFile(os.path.join(self.path, name)).iter_batches():
+                yield from batch.to_pylist()
+
+
+SINK_TYPES = {
+    'jsonl': JSONLSink,
+    'sqlite': SQLiteSink,
+    'parquet': ParquetSink,
+}
+
+
+def open_sink(path, kind=None, **options):
+    """Create a result sink by name, or from the extension of `path`.
+
+    `path` may omit the extension; the sink's own is appended
+    (`scraped_urls` + 'sqlite' -> `scraped_urls.sqlite`).
+    """
+    if kind is None:
+        extension = os.path.splitext(path)[1].lower()
+        kind = next((name for name, cls in SINK_TYPES.items() if cls.extension == extension), 'jsonl')
+    try:
+        cls = SINK_TYPES[kind]
+    except KeyError:
+        raise ValueError(f"Unknown sink: {kind!r} (choose from {', '.join(SINK_TYPES)})")
+    if not path.endswith(cls.extension):
+        path += cls.extension
+    return cls(path, **options)
+
+
+def url_records(urls, record_type):
+    """JSONL records for newly found URLs of one type."""
+    found_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return ({'url': url, 'type': record_type, 'found_at': found_at} for url in urls)
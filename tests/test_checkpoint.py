@@ -0,0 +1,42 @@
+from checkpoint import Checkpointer, load_checkpoint
+
+
+START_URL = "https://uae.sharafdg.com/c/kitchen/"
+
+
+def category_state(done):
+    return {
+        'start_urls': [START_URL],
+        'categories': {START_URL: {'page': 3, 'page_url': f"{START_URL}?page=3", 'done': done}},
+        'frontier': [],
+        'frontier_crawl': False,
+    }
+
+
+def test_finished_run_leaves_no_checkpoint(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    checkpointer = Checkpointer(str(path))
+    checkpointer.save(category_state(done=False))
+    assert path.exists()
+
+    checkpointer.finish(category_state(done=True))
+    assert not path.exists()
+
+
+def test_unfinished_run_keeps_final_checkpoint(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    checkpointer = Checkpointer(str(path))
+    checkpointer.finish(category_state(done=False))
+    assert load_checkpoint(str(path))['categories'][START_URL]['page'] == 3
+
+
+def test_drained_frontier_leaves_no_checkpoint(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    checkpointer = Checkpointer(str(path))
+    queued = dict(category_state(done=False), frontier_crawl=True,
+                  frontier=[[f"{START_URL}?page=2", 1, 'pagination']])
+    checkpointer.finish(queued)
+    assert path.exists()
+
+    checkpointer.finish(dict(queued, frontier=[]))
+    assert not path.exists()
@@ -0,0 +1,28 @@
+import pytest
+
+from field_extractor import Field, FieldSpec, clean_text
+
+XML_DECLARED_PRODUCT = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html>
+<html><body>
+  <h1 class="title">  Café   grinder </h1>
+  <span class="price">AED 199</span>
+  <img class="gallery" src="/img/1.jpg"><img class="gallery" src="/img/2.jpg">
+</body></html>
+"""
+
+
+def test_extract_html_accepts_xml_declaration():
+    pytest.importorskip("lxml.cssselect")
+    spec = FieldSpec([
+        Field("title", "h1.title", post=clean_text),
+        Field("price", "span.price"),
+        Field("images", "img.gallery", attr="src", many=True),
+        Field("brand", "span.brand", default="unknown"),
+    ])
+    assert spec.extract_html(XML_DECLARED_PRODUCT) == {
+        "title": "Café grinder",
+        "price": "AED 199",
+        "images": ["/img/1.jpg", "/img/2.jpg"],
+        "brand": "unknown",
+    }
@@ -0,0 +1,26 @@
+import pytest
+
+from html_parsers import get_parser_backend
+from parse_workers import parse_page
+
+XML_DECLARED_PAGE = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html>
+<html><body>
+  <div class="product-item"><a class="product-url" href="/p/12345/">Café grinder</a></div>
+  <div class="product-item"><a class="product-url" href="/p/67890/">Kettle</a></div>
+</body></html>
+"""
+
+
+def test_lxml_backend_accepts_xml_declaration():
+    pytest.importorskip("lxml.cssselect")
+    backend = get_parser_backend("lxml")
+    hrefs = backend.select_hrefs(XML_DECLARED_PAGE, ["div.product-item"], ["a.product-url"])
+    assert hrefs == ["/p/12345/", "/p/67890/"]
+
+
+def test_parse_page_with_xml_declaration():
+    pytest.importorskip("lxml.cssselect")
+    parsed = parse_page(XML_DECLARED_PAGE, "https://uae.sharafdg.com/c/kitchen/", "sharafdg",
+                        ["div.product-item"], ["a.product-url"], "lxml")
+    assert parsed["site_products"] == ["https://uae.sharafdg.com/p/12345/", "https://uae.sharafdg.com/p/67890/"]
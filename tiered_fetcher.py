@@ -0,0 +1,95 @@
+import logging
+import time
+from urllib.parse import urlparse
+
+from http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+TIERS = ('http', 'browser')
+
+# Minimum product links a listing page must yield over plain HTTP to skip the browser
+MIN_PRODUCT_LINKS = {
+    'amazon': 10,
+    'noon': 10,
+    'sharafdg': 8,
+    'alibaba': 8,
+    'generic': 5,
+}
+
+
+class DomainVerdictCache:
+    """Per-domain verdicts (e.g. "behind Cloudflare") that expire after `ttl` seconds."""
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self._verdicts = {}
+
+    def get(self, url):
+        """Cached verdict for `url`'s domain, or None when unknown or expired."""
+        entry = self._verdicts.get(urlparse(url).netloc.lower())
+        if entry is None:
+            return None
+        verdict, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._verdicts[urlparse(url).netloc.lower()]
+            return None
+        return verdict
+
+    def set(self, url, verdict):
+        self._verdicts[urlparse(url).netloc.lower()] = (verdict, time.monotonic() + self.ttl)
+
+
+class TieredFetcher:
+    """HTTP-first fetching that escalates to a browser only when HTTP is not enough.
+
+    The winning tier is remembered per domain, so once plain HTTP proves
+    sufficient for a site, later pages skip Chromium entirely; once a site
+    needs the browser, later pages skip the doomed HTTP attempt.
+    """
+
+    def __init__(self, client=None, min_product_links=None, timeout=20):
+        self.client = client or get_http_client()
+        self.min_product_links = dict(MIN_PRODUCT_LINKS)
+        self.min_product_links.update(min_product_links or {})
+        self.timeout = timeout
+        self.winning_tier = {}
+        self.stats = {tier: 0 for tier in TIERS}
+        self.stats['escalations'] = 0
+
+    @staticmethod
+    def domain(url):
+        return urlparse(url).netloc.lower()
+
+    def preferred_tier(self, url):
+        return self.winning_tier.get(self.domain(url), TIERS[0])
+
+    def record(self, url, tier):
+        """Remember which tier served `url`'s domain."""
+        domain = self.domain(url)
+        if tier != self.winning_tier.get(domain):
+            logger.info(f"Fetch tier for {domain}: {tier}")
+        if tier == 'browser' and self.winning_tier.get(domain, TIERS[0]) == 'http':
+            self.stats['escalations'] += 1
+        self.winning_tier[domain] = tier
+        self.stats[tier] += 1
+
+    def is_sufficient(self, product_count, site_type):
+        return product_count >= self.min_product_links.get(site_type, self.min_product_links['generic'])
+
+    async def fetch_http(self, url):
+        """GET `url` on the shared pooled client; returns the body on HTTP 200, else None."""
+        start = time.perf_counter()
+        try:
+            response = await self.client.get(url, timeout=self.timeout)
+        except Exception as e:
+            logger.info(f"HTTP tier failed for {url}: {e}")
+            return None
+        if response.status != 200:
+            logger.info(f"HTTP tier got {response.status} for {url}")
+            return None
+        logger.debug(f"HTTP tier fetched {url} in {time.perf_counter() - start:.2f}s")
+        return response.text
+
+    async def close(self):
+        await self.client.close()
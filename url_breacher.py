@@ -1,4 +1,5 @@
 import time
+import argparse
 import asyncio
 import nest_asyncio
 import json
@@ -19,16 +20,31 @@ from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from playwright.sync_api import sync_playwright
-import cloudscraper
-import requests
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-from queue import Queue
 from threading import Lock
 import signal
 import os
 from urllib.parse import parse_qsl, urlencode
-import aiohttp
+from browser_pool import BrowserPool
+from request_profiles import get_profile
+from tiered_fetcher import DomainVerdictCache, TieredFetcher
+from http_client import get_http_client
+from http_cache import HTTPCache, ReplayMiss
+from rate_limiter import get_rate_limiter
+from readiness import ReadinessEngine
+from scroll_harvester import harvest_infinite_scroll
+from pagination_planner import (PAGE_PARAMS, PAGINATION_INFO_JS, RESULT_COUNT_JS, PaginationPlanner, PlannedPage,
+                                 parse_result_count)
+from crawl_engine import CrawlEngine
+from frontier import Frontier
+from url_classifier import URLClassifier
+from url_canonicalizer import get_canonicalizer
+from html_parsers import get_parser_backend
+from parse_workers import ParseWorkerPool, parse_page
+from recrawl_state import RecrawlState
+from sinks import SINK_TYPES, TrackedURLSet, open_sink, url_records
+from checkpoint import DEFAULT_CHECKPOINT_PATH, Checkpointer, load_checkpoint
+from url_store import CompactURLSet, dump_url_set, load_url_set
 
 # Apply nest_asyncio to allow nested event loops
 nest_asyncio.apply()
@@ -43,26 +59,170 @@ logging.basicConfig(
     ]
 )
 
+# Site-specific selectors
+SITE_SELECTORS = {
+    'alibaba': {
+        'product': ['div.product-card', 'div.product-item'],
+        'link': ['a.product-link', 'a[href*="/product/"]'],
+        'next_page': ['a.next-page', 'button.next-btn'],
+        'infinite_scroll': True
+    },
+    'noon': {
+        'product': ['div.product-grid-item', 'div.productContainer'],
+        'link': ['a[href*="/product"]', 'a.product-link'],
+        'next_page': ['button[class*="next"]', 'a.next-page'],
+        'infinite_scroll': True
+    },
+    'sharafdg': {
+        'product': ['div.product-item', 'div.product-box'],
+        'link': ['a.product-url', 'a[href*="/p/"]'],
+        'next_page': ['a.next', 'button.load-more'],
+        'infinite_scroll': False
+    },
+    'amazon': {
+        'product': [
+            'div[data-component-type="s-search-result"]',
+            'div.s-result-item:not(.AdHolder)',
+            '.s-card-container'
+        ],
+        'link': [
+            'h2 a.a-link-normal',
+            'a.a-link-normal.s-no-outline',
+            'h2.a-size-mini a',
+            'a[href*="/dp/"]'
+        ],
+        'next_page': [
+            '.s-pagination-next',
+            'a[href*="page="]',
+            'span.s-pagination-next'
+        ],
+        'infinite_scroll': False
+    },
+    'generic': {
+        'product': ['div.product', 'div[class*="product"]', 'article.product'],
+        'link': ['a[href*="product"]', 'a[href*="/p/"]', 'a.product-link'],
+        'next_page': ['a.next', 'a[rel="next"]', 'button.load-more'],
+        'infinite_scroll': False
+    }
+}
+
+# Collects the href of every link inside every product container in one evaluate call.
+# With firstMatch, only the first link selector that hits a container is used.
+HARVEST_LINKS_JS = """
+([productSelectors, linkSelectors, firstMatch]) => {
+    const hrefs = [];
+    let containers = 0;
+    for (const productSelector of productSelectors) {
+        let products;
+        try { products = document.querySelectorAll(productSelector); } catch (e) { continue; }
+        containers += products.length;
+        for (const product of products) {
+            for (const linkSelector of linkSelectors) {
+                let link;
+                try { link = product.querySelector(linkSelector); } catch (e) { continue; }
+                const href = link && link.getAttribute('href');
+                if (href) {
+                    hrefs.push(href);
+                    if (firstMatch) break;
+                }
+            }
+        }
+    }
+    return {containers, hrefs};
+}
+"""
+
+# Collects every anchor href on the page in one evaluate call
+HARVEST_ALL_HREFS_JS = "() => Array.from(document.querySelectorAll('a[href]'), a => a.getAttribute('href'))"
+
 class URLBreacher:
-    def __init__(self, base_url=None, max_depth=3):
+    def __init__(self, base_url=None, max_depth=3, browser_pool_size=2, parser_backend=None,
+                 parse_workers=0, interception_profile='links-only', http_cache=None, replay_only=False,
+                 recrawl_state=None, unchanged_pages=3, sink='jsonl', checkpoint_file=None,
+                 checkpoint_interval=30, resume=False, url_store='compact'):
         self.user_agent = UserAgent().random
         self.working_proxies = []
         self.current_proxy = None
         self.base_url = base_url
         self.max_depth = max_depth
+        self.max_pages = 50
+        
+        # Listing pages are planned from the page parameter and fetched `page_concurrency` at a time
+        self.pagination_planner = PaginationPlanner(max_pages=self.max_pages)
+        self.page_concurrency = 4
+        # Engine of the running crawl_many; planned pages are queued on it so its caps cover them too
+        self.crawl_engine = None
+        
+        # Crash-safe checkpoints; with resume, pick up the checkpointed run's state and output files
+        self.checkpointer = Checkpointer(checkpoint_file, checkpoint_interval) if checkpoint_file else None
+        resume_state = load_checkpoint(checkpoint_file) if resume and checkpoint_file else None
+        self.start_urls = []
+        self.category_progress = {}
+        
+        # Optional on-disk response cache (a path or an HTTPCache) under every HTTP fetch path
+        if isinstance(http_cache, str):
+            http_cache = HTTPCache(http_cache, replay_only=replay_only)
+        self.http_cache = http_cache
+        # Replay-only runs serve everything from the cache, so the browser tier is off too
+        self.replay_only = bool(http_cache is not None and http_cache.replay_only)
+        
+        # Shared keep-alive HTTP client for proxies, cloudscraper and the HTTP tier
+        self.http = get_http_client(self.user_agent, cache=http_cache)
+        
+        # Warm browser pool shared by attempt_breach, crawl and scrape_url
+        self.browser_pool_size = browser_pool_size
+        self.browser_pool = None
+        
+        # Per-domain adaptive pacing shared by the HTTP client and browser navigations
+        self.rate_limiter = self.http.limiter or get_rate_limiter()
+        
+        # HTTP-first fetching; remembers per domain whether the browser is needed
+        self.fetcher = TieredFetcher(client=self.http)
+        
+        # Cached per-domain Cloudflare verdicts so scrape() probes each site once per TTL
+        self.protection_verdicts = DomainVerdictCache(ttl=3600)
+        
+        # Request interception profile for listing pages (see request_profiles.PROFILES)
+        self.interception_profile = interception_profile
         
         # Product tracking
         self.total_products_found = 0
         self.products_per_page = []
-        self.last_save_count = 0
         self.save_batch_size = 10
         
-        # File handling
+        # File handling: new URLs are appended to a result sink (jsonl, sqlite or parquet)
+        # and compacted into output_file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.output_file = f'scraped_urls_{timestamp}.json'
+        sink_path = f'scraped_urls_{timestamp}'
+        if resume_state:
+            self.output_file = resume_state['output_file']
+            sink_path, sink = resume_state['sink_path'], resume_state['sink_kind']
+            url_store = resume_state.get('url_store', url_store)
+        self.sink_kind = sink
+        self.sink = open_sink(sink_path, kind=sink)
+        
+        # Incremental recrawl: per-page fingerprints from the previous run, stop after
+        # `unchanged_pages` identical leading pages and write a delta of added/removed products
+        self.recrawl = RecrawlState(recrawl_state, unchanged_pages) if recrawl_state else None
+        self.delta_file = f'recrawl_delta_{timestamp}.json'
+        
+        # Product URLs found on the most recently extracted listing page
+        self.last_page_urls = set()
         
-        self.visited_urls = set()
-        self.url_queue = Queue()
+        # URL storage: 'compact' keeps 64-bit hashes of canonical URLs instead of strings,
+        # 'bloom' also turns the visited check into a scalable Bloom filter, 'set' keeps plain sets
+        if url_store not in ('compact', 'bloom', 'set'):
+            raise ValueError(f"Unknown url_store: {url_store!r} (choose from compact, bloom, set)")
+        self.url_store = url_store
+        if url_store == 'set':
+            self.visited_urls = set()
+        else:
+            self.visited_urls = CompactURLSet(capacity=1_000_000 if url_store == 'bloom' else 1024,
+                                              bloom=url_store == 'bloom', track_new=False)
+        # Crawl frontier: links to follow, best expected product yield first, spilling to disk
+        self.frontier = Frontier(max_depth=max_depth, seen=self.visited_urls)
+        self.frontier_crawl = False
         self.url_patterns = {}
         self.url_lock = Lock()
         
@@ -71,57 +231,28 @@ class URLBreacher:
         
         self.initialize_proxies()
         
-        # URL Storage
-        self.product_urls = set()
-        self.category_urls = set()
-        self.pagination_urls = set()
+        # URL Storage; the compact product set spills its strings to disk for iteration
+        if url_store == 'set':
+            self.product_urls = TrackedURLSet()
+            self.category_urls = TrackedURLSet()
+            self.pagination_urls = TrackedURLSet()
+        else:
+            self.product_urls = CompactURLSet(spill_path=f'{os.path.splitext(self.output_file)[0]}.product_urls.txt')
+            self.category_urls = CompactURLSet()
+            self.pagination_urls = CompactURLSet()
+        self.url_classifier = URLClassifier()
+        self.canonicalizer = get_canonicalizer()
+        
+        # HTML parser backend for extract_urls (selectolax > lxml > html.parser)
+        self.parser_backend = get_parser_backend(parser_backend)
+        
+        # Optional process pool so parsing scales across cores off the event loop
+        self.parse_pool = ParseWorkerPool(workers=parse_workers) if parse_workers else None
         
         # Site-specific selectors
-        self.site_selectors = {
-            'alibaba': {
-                'product': ['div.product-card', 'div.product-item'],
-                'link': ['a.product-link', 'a[href*="/product/"]'],
-                'next_page': ['a.next-page', 'button.next-btn'],
-                'infinite_scroll': True
-            },
-            'noon': {
-                'product': ['div.product-grid-item', 'div.productContainer'],
-                'link': ['a[href*="/product"]', 'a.product-link'],
-                'next_page': ['button[class*="next"]', 'a.next-page'],
-                'infinite_scroll': True
-            },
-            'sharafdg': {
-                'product': ['div.product-item', 'div.product-box'],
-                'link': ['a.product-url', 'a[href*="/p/"]'],
-                'next_page': ['a.next', 'button.load-more'],
-                'infinite_scroll': False
-            },
-            'amazon': {
-                'product': [
-                    'div[data-component-type="s-search-result"]',
-                    'div.s-result-item:not(.AdHolder)',
-                    '.s-card-container'
-                ],
-                'link': [
-                    'h2 a.a-link-normal',
-                    'a.a-link-normal.s-no-outline',
-                    'h2.a-size-mini a',
-                    'a[href*="/dp/"]'
-                ],
-                'next_page': [
-                    '.s-pagination-next',
-                    'a[href*="page="]',
-                    'span.s-pagination-next'
-                ],
-                'infinite_scroll': False
-            },
-            'generic': {
-                'product': ['div.product', 'div[class*="product"]', 'article.product'],
-                'link': ['a[href*="product"]', 'a[href*="/p/"]', 'a.product-link'],
-                'next_page': ['a.next', 'a[rel="next"]', 'button.load-more'],
-                'infinite_scroll': False
-            }
-        }
+        self.site_selectors = dict(SITE_SELECTORS)
+        # Per-site "page is ready" conditions used instead of network idle
+        self.readiness = ReadinessEngine(self.site_selectors)
         
         # Statistics
         self.stats = {
@@ -131,9 +262,13 @@ class URLBreacher:
             'start_time': None,
             'end_time': None,
             'products_per_page': [],
-            'total_products': 0
+            'total_products': 0,
+            'replay_misses': 0
         }
         
+        if resume_state:
+            self._restore_checkpoint(resume_state)
+        
         self.debug_print("Initialized URLBreacher", 'INFO')
 
     def debug_print(self, message, level='INFO'):
@@ -150,44 +285,121 @@ class URLBreacher:
         print(f"[{timestamp}] {emoji} {message}")
         
     def save_batch(self, force=False):
-        """Save URLs in batches to avoid data loss."""
-        if len(self.product_urls) - self.last_save_count >= self.save_batch_size or force:
-            self.debug_print(f"Saving batch of URLs. Total URLs: {len(self.product_urls)}", 'INFO')
-            
-            # Load existing data if file exists
-            existing_data = {}
-            try:
-                if os.path.exists(self.output_file):
-                    with open(self.output_file, 'r') as f:
-                        existing_data = json.load(f)
-            except Exception as e:
-                self.debug_print(f"Error reading existing file: {e}", 'ERROR')
-                existing_data = {}
-            
-            # Update data
-            current_data = {
-                'product_urls': list(self.product_urls),
-                'stats': {
-                    'total_products': self.total_products_found,
-                    'products_per_page': self.products_per_page,
-                    'total_pages_processed': len(self.products_per_page),
-                    'average_products_per_page': sum(self.products_per_page) / len(self.products_per_page) if self.products_per_page else 0,
-                    'last_update': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-            }
-            
-            # Merge with existing data
-            if existing_data:
-                current_data['product_urls'] = list(set(current_data['product_urls']))  # Remove duplicates
-            
-            # Save to file
-            try:
-                with open(self.output_file, 'w') as f:
-                    json.dump(current_data, f, indent=4)
-                self.last_save_count = len(self.product_urls)
+        """Append newly found URLs to the JSONL sink; on `force`, compact it into the output JSON."""
+        if self.product_urls.pending < self.save_batch_size and not force:
+            return
+        self.debug_print(f"Saving batch of URLs. Total URLs: {len(self.product_urls)}", 'INFO')
+        try:
+            self._append_new_urls()
+            if force:
+                self.sink.compact(self.output_file, {'product_urls': 'product'}, stats=self._output_stats())
                 self.debug_print(f"Successfully saved batch to {self.output_file}", 'SUCCESS')
-            except Exception as e:
-                self.debug_print(f"Error saving batch: {e}", 'ERROR')
+        except Exception as e:
+            self.debug_print(f"Error saving batch: {e}", 'ERROR')
+
+    def _append_new_urls(self):
+        """Write only the URLs found since the last save, one JSONL record each."""
+        for record_type, urls in (('product', self.product_urls),
+                                  ('category', self.category_urls),
+                                  ('pagination', self.pagination_urls)):
+            self.sink.write_many(url_records(urls.drain_new(), record_type))
+
+    def _output_stats(self):
+        return {
+            'total_products': self.total_products_found,
+            'products_per_page': self.products_per_page,
+            'total_pages_processed': len(self.products_per_page),
+            'average_products_per_page': sum(self.products_per_page) / len(self.products_per_page) if self.products_per_page else 0,
+            'last_update': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def save_checkpoint(self, force=False, final=False):
+        """Write a checkpoint if one is due (or `force`); new URLs are synced to the sink first.
+        
+        The `final` checkpoint of a run is removed instead once nothing is left to resume.
+        """
+        if self.checkpointer is None or not (force or final or self.checkpointer.due()):
+            return
+        try:
+            self._append_new_urls()
+            self.sink.sync()
+            if final:
+                self.checkpointer.finish(self._checkpoint_state())
+            else:
+                self.checkpointer.save(self._checkpoint_state())
+        except Exception as e:
+            self.debug_print(f"Error saving checkpoint: {e}", 'ERROR')
+
+    def _checkpoint_state(self):
+        with self.url_lock:
+            frontier = self.frontier.snapshot()
+            visited = dump_url_set(self.visited_urls)
+        return {
+            'output_file': self.output_file,
+            'sink_path': self.sink.path,
+            'sink_kind': self.sink_kind,
+            'max_depth': self.max_depth,
+            'url_store': self.url_store,
+            'start_urls': self.start_urls,
+            'categories': self.category_progress,
+            'frontier': frontier,
+            'frontier_crawl': self.frontier_crawl,
+            'frontier_domains': sorted(self.frontier.domains),
+            'visited': visited,
+            'stats': {name: value for name, value in self.stats.items() if name not in ('start_time', 'end_time')},
+            'products_per_page': self.products_per_page,
+            'total_products_found': self.total_products_found,
+        }
+
+    def _restore_checkpoint(self, state):
+        """Rebuild crawl state from a checkpoint; found URLs are reloaded from the sink."""
+        self.max_depth = self.frontier.max_depth = state['max_depth']
+        self.start_urls = list(state['start_urls'])
+        self.category_progress = state['categories']
+        load_url_set(self.visited_urls, state['visited'])
+        self.frontier.restore(state['frontier'])
+        self.frontier.domains.update(state.get('frontier_domains', ()))
+        self.frontier_crawl = state.get('frontier_crawl', False)
+        self.stats.update(state['stats'])
+        self.products_per_page = state['products_per_page']
+        self.total_products_found = state['total_products_found']
+        
+        url_sets = {'product': self.product_urls, 'category': self.category_urls, 'pagination': self.pagination_urls}
+        for record in self.sink.iter_records():
+            url_set = url_sets.get(record.get('type'))
+            if url_set is not None:
+                url_set.restore((record['url'],))
+        
+        pending = [url for url in self.start_urls if not self.category_progress.get(url, {}).get('done')]
+        self.debug_print(f"Resumed from checkpoint: {len(self.product_urls)} products, "
+                         f"{len(pending)} of {len(self.start_urls)} start URLs unfinished", 'SUCCESS')
+
+    def _add_start_url(self, url):
+        if url not in self.start_urls:
+            self.start_urls.append(url)
+        self.frontier.allow(url)
+
+    def _resume_point(self, url):
+        """Page URL and page number to start `url` from: where a checkpointed run stopped, else page 1."""
+        progress = self.category_progress.get(url)
+        if progress and not progress['done']:
+            return progress['page_url'], progress['page']
+        return url, 1
+
+    def _record_progress(self, category_url, page_number, page_url, done=False):
+        """Remember the last finished page of a category walk and checkpoint if due."""
+        self.category_progress[category_url] = {'page': page_number, 'page_url': page_url, 'done': done}
+        self.save_checkpoint(force=done)
+
+    async def resume_crawl(self, concurrency=8, per_domain=4):
+        """Continue every unfinished start URL (or the frontier) of the checkpointed run."""
+        if self.frontier_crawl:
+            return await self.crawl_frontier((), concurrency=concurrency, per_domain=per_domain)
+        pending = [url for url in self.start_urls if not self.category_progress.get(url, {}).get('done')]
+        if not pending:
+            self.debug_print("Nothing to resume, every start URL is finished", 'INFO')
+            return {}
+        return await self.crawl_many(pending, concurrency=concurrency, per_domain=per_domain)
 
     def test_proxy(self, proxy):
         """Test if a proxy is working."""
@@ -197,17 +409,21 @@ class URLBreacher:
                 "http": f"http://{proxy}",
                 "https": f"http://{proxy}"
             }
-            response = requests.get(test_url, proxies=proxies, timeout=10)
-            return response.status_code == 200
+            response = self.http.get_sync(test_url, proxies=proxies, timeout=10, limited=False)
+            return response.status == 200
         except Exception:
             return False
 
     def initialize_proxies(self):
         """Initialize and test proxies."""
+        if self.replay_only:
+            logging.info("Replay-only mode: skipping proxy validation")
+            return
         logging.info("Fetching and testing proxies...")
         try:
-            response = requests.get('https://raw.githubusercontent.com/TheSpeedX/PROXY-List/master/http.txt', timeout=10)
-            if response.status_code == 200:
+            response = self.http.get_sync('https://raw.githubusercontent.com/TheSpeedX/PROXY-List/master/http.txt',
+                                          timeout=10, limited=False)
+            if response.status == 200:
                 proxies = [proxy.strip() for proxy in response.text.split('\n') if proxy.strip()]
                 
                 for proxy in proxies:
@@ -245,127 +461,137 @@ class URLBreacher:
         domain = urlparse(url).netloc.lower()
         if 'alibaba' in domain:
             return 'alibaba'
+        elif 'amazon' in domain:
+            return 'amazon'
         elif 'noon' in domain:
             return 'noon'
         elif 'sharafdg' in domain:
             return 'sharafdg'
         return 'generic'
 
-    async def scroll_to_bottom(self, page):
-        """Scroll to bottom for infinite scroll pages."""
+    async def scroll_to_bottom(self, page, selectors=('a[href]',)):
+        """Scroll an infinite-scroll page to its end; returns the hrefs matching `selectors` seen on the way."""
         try:
-            previous_height = await page.evaluate('document.body.scrollHeight')
-            while True:
-                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                await page.wait_for_timeout(2000)  # Wait for content to load
-                new_height = await page.evaluate('document.body.scrollHeight')
-                if new_height == previous_height:
-                    break
-                previous_height = new_height
+            return (await harvest_infinite_scroll(page, selectors))['hrefs']
         except Exception as e:
             logging.error(f"Error during scrolling: {e}")
+            return []
 
-    def extract_urls(self, html_content, current_url):
-        """Extract and categorize URLs from HTML content."""
-        soup = BeautifulSoup(html_content, 'html.parser')
+    def _scroll_selectors(self, site_type):
+        """Selectors for the product links inside `site_type`'s product containers."""
+        selectors = self.site_selectors.get(site_type) or self.site_selectors['generic']
+        return [f"{product} {link}" for product in selectors['product'] for link in selectors['link']]
+
+    async def harvest_scroll_feed(self, page, site_type):
+        """Collect product URLs from an infinite-scroll listing in one scroll pass; returns how many were new."""
+        hrefs = await self.scroll_to_bottom(page, self._scroll_selectors(site_type))
+        base_url = self.base_url or page.url
+        full_urls = [urljoin(base_url, href) for href in hrefs]
+        products = {
+            canonical for canonical, labels in zip(self.canonicalizer.canonicalize_many(full_urls),
+                                                   self.url_classifier.classify_many(full_urls, site_type))
+            if 'product' in labels
+        }
+        new_products = {product for product in products if product not in self.product_urls}
+        self.product_urls.update(products)
+        self.last_page_urls = products
+        self.total_products_found += len(new_products)
+        self.debug_print(f"Infinite scroll: {len(products)} products ({len(new_products)} new)",
+                         'SUCCESS' if new_products else 'INFO')
+        self.save_batch()
+        return len(new_products)
+
+    def _parse_args(self, html_content, current_url):
+        """Arguments for parse_workers.parse_page for a page fetched from `current_url`."""
         site_type = self.detect_site_type(current_url)
         selectors = self.site_selectors.get(site_type, {})
         base_url = self.base_url or urlparse(current_url).scheme + "://" + urlparse(current_url).netloc
-        
-        # Extract product URLs using site-specific selectors
-        if selectors:
-            for product_selector in selectors['product']:
-                products = soup.select(product_selector)
-                for product in products:
-                    for link_selector in selectors['link']:
-                        links = product.select(link_selector)
-                        for link in links:
-                            url = link.get('href')
-                            if url:
-                                url = urljoin(base_url, url)
-                                if url not in self.visited_urls:
-                                    if self.is_product_url(url):
-                                        self.product_urls.add(url)
-                                    self.url_queue.put(url)
-                                    self.visited_urls.add(url)
-                                    self.stats['total_urls_found'] += 1
-
-        # Generic URL extraction as fallback
-        for link in soup.find_all('a', href=True):
-            url = urljoin(base_url, link['href'])
-            
-            if not url.startswith(('http://', 'https://')) or url in self.visited_urls:
-                continue
-                
-            if self.is_product_url(url):
-                self.product_urls.add(url)
-            elif self.is_category_url(url):
-                self.category_urls.add(url)
-            elif self.is_pagination_url(url):
-                self.pagination_urls.add(url) 
-            
+        return (html_content, base_url, site_type,
+                tuple(selectors.get('product', ())), tuple(selectors.get('link', ())),
+                self.parser_backend.name)
+
+    def extract_urls(self, html_content, current_url):
+        """Extract and categorize URLs from HTML content."""
+        self._merge_parsed(self._parse_html(html_content, current_url))
+
+    def _parse_html(self, html_content, current_url):
+        args = self._parse_args(html_content, current_url)
+        if self.parse_pool is not None:
+            return self.parse_pool.parse_sync(*args)
+        return parse_page(*args)
+
+    async def extract_urls_async(self, html_content, current_url):
+        """Extract URLs, parsing on the worker pool (if any) so the event loop stays free."""
+        self._merge_parsed(await self._parse_html_async(html_content, current_url))
+
+    async def _parse_html_async(self, html_content, current_url):
+        args = self._parse_args(html_content, current_url)
+        if self.parse_pool is not None:
+            return await self.parse_pool.parse(*args)
+        return parse_page(*args)
+
+    @staticmethod
+    def _parsed_product_urls(parsed):
+        """Distinct product URLs found by parse_page."""
+        products = set(parsed['site_products'])
+        products.update(url for url, label in parsed['links'] if label == 'product')
+        return products
+
+    def _merge_parsed(self, parsed, depth=0):
+        """Merge parse_page output from a page at `depth` into the URL sets and the frontier."""
+        # Generic labels, overridden by the site-specific selectors' product links
+        labels = dict(parsed['links'])
+        site_products = set(parsed['site_products'])
+        for url in parsed['site_links']:
+            if url in site_products:
+                labels[url] = 'product'
+            else:
+                labels.setdefault(url, None)
+
+        for url, label in labels.items():
             with self.url_lock:
-                self.visited_urls.add(url)
+                if url in self.visited_urls:
+                    continue
                 self.stats['total_urls_found'] += 1
                 
-            if len(self.visited_urls) <= self.max_depth:
-                self.url_queue.put(url)
+                # Product pages are results, not pages to crawl
+                if label == 'product':
+                    self.product_urls.add(url)
+                    self.visited_urls.add(url)
+                    continue
+                if label == 'category':
+                    self.category_urls.add(url)
+                elif label == 'pagination':
+                    self.pagination_urls.add(url)
+                
+                # The frontier marks the URL visited; a next page continues the same listing,
+                # so it stays at its parent's depth
+                self.frontier.push(url, depth if label == 'pagination' else depth + 1, label)
 
-    def is_product_url(self, url):
+    def shutdown_parse_pool(self):
+        """Stop the parse worker processes."""
+        if self.parse_pool is not None:
+            self.parse_pool.close()
+            self.parse_pool = None
+
+    def is_product_url(self, url, site_type=None):
         """Identify if URL is a product page using enhanced patterns."""
-        patterns = [
-            # Generic patterns
-            r'/p/',
-            r'/product/',
-            r'/item/',
-            r'pid=',
-            r'product_id=',
-            # Alibaba patterns
-            r'/item/\d+',
-            r'/product/\d+-\d+',
-            # Noon patterns
-            r'/product-p\d+',
-            r'/\w+/\d+/p/',
-            # Sharaf DG patterns
-            r'/p/\d+',
-            r'/product-details/'
-        ]
-        return any(re.search(pattern, url.lower()) for pattern in patterns)
-
-    def is_category_url(self, url):
+        return self.url_classifier.is_product(url, site_type)
+
+    def is_category_url(self, url, site_type=None):
         """Identify if URL is a category page using enhanced patterns."""
-        patterns = [
-            # Generic patterns
-            r'/c/',
-            r'/category/',
-            r'/department/',
-            r'cat=',
-            r'category_id=',
-            # Site-specific patterns
-            r'/catalog/',
-            r'/products/',
-            r'/collection/',
-            r'/shop/',
-            r'/deals/'
-        ]
-        return any(re.search(pattern, url.lower()) for pattern in patterns)
-
-    def is_pagination_url(self, url):
+        return self.url_classifier.is_category(url, site_type)
+
+    def is_pagination_url(self, url, site_type=None):
         """Identify if URL is a pagination page."""
-        patterns = [
-            r'page=',
-            r'/page/',
-            r'p=\d+',
-            r'offset=',
-        ]
-        return any(re.search(pattern, url.lower()) for pattern in patterns)
+        return self.url_classifier.is_pagination(url, site_type)
 
     async def handle_dynamic_content(self, page, site_type):
         """Handle dynamic content loading based on site type."""
         selectors = self.site_selectors.get(site_type, {})
         
         if selectors.get('infinite_scroll', False):
-            await self.scroll_to_bottom(page)
+            await self.scroll_to_bottom(page, self._scroll_selectors(site_type))
         else:
             # Handle pagination
             next_page_selectors = selectors.get('next_page', [])
@@ -373,16 +599,17 @@ class URLBreacher:
                 try:
                     next_button = await page.query_selector(selector)
                     if next_button and await next_button.is_visible():
+                        previous = await self.readiness.signature(page, site_type)
                         await next_button.click()
-                        await page.wait_for_load_state('networkidle')
-                        return True
+                        return await self.readiness.wait(page, site_type, 'pagination', previous)
                 except Exception as e:
                     logging.error(f"Error handling pagination: {e}")
         return False
 
     async def extract_product_urls(self, page, site_type):
-        """Extract product URLs from the current page."""
+        """Extract product URLs from the current page (also recorded in `last_page_urls`)."""
         self.debug_print(f"Starting product URL extraction for site type: {site_type}", 'STEP')
+        self.last_page_urls = set()
         
         try:
             # For Amazon, use a specific extraction strategy
@@ -392,36 +619,26 @@ class URLBreacher:
                     # Wait for products to load
                     await page.wait_for_selector('div[data-component-type="s-search-result"]', timeout=10000)
                     
-                    # Get all product containers
-                    products = await page.query_selector_all('div[data-component-type="s-search-result"]')
-                    self.debug_print(f"Found {len(products)} product containers", 'INFO')
+                    # Harvest every product link in a single round-trip
+                    harvest = await self.harvest_links(
+                        page,
+                        ['div[data-component-type="s-search-result"]'],
+                        ['h2 a.a-link-normal', 'a[href*="/dp/"]'],
+                        first_match=True
+                    )
+                    self.debug_print(f"Found {harvest['containers']} product containers", 'INFO')
                     
-                    product_count = 0
-                    for product in products:
-                        try:
-                            # Try to get the product link
-                            link_element = await product.query_selector('h2 a.a-link-normal')
-                            if not link_element:
-                                link_element = await product.query_selector('a[href*="/dp/"]')
-                            
-                            if link_element:
-                                url = await link_element.get_attribute('href')
-                                if url:
-                                    # Clean and validate the URL
-                                    full_url = urljoin(self.base_url, url)
-                                    # Extract the product ID (ASIN)
-                                    asin_match = re.search(r'/dp/([A-Z0-9]{10})', full_url)
-                                    if asin_match:
-                                        # Standardize Amazon URL format
-                                        clean_url = f"https://www.amazon.in/dp/{asin_match.group(1)}"
-                                        self.product_urls.add(clean_url)
-                                        product_count += 1
-                                        
-                                        if product_count % 5 == 0:  # Log every 5 products
-                                            self.debug_print(f"Extracted {product_count} products so far", 'SUCCESS')
-                        except Exception as e:
-                            continue
+                    base_url = self.base_url or page.url
+                    full_urls = [urljoin(base_url, url) for url in harvest['hrefs']]
+                    # Keep only links with an ASIN, standardized to /dp/{ASIN}
+                    page_urls = {
+                        self.canonicalizer.canonicalize(full_url) for full_url in full_urls
+                        if self.canonicalizer.product_id(full_url)
+                    }
+                    self.product_urls.update(page_urls)
+                    product_count = len(page_urls)
                     
+                    self.last_page_urls = page_urls
                     self.debug_print(f"Successfully extracted {product_count} Amazon product URLs", 'SUCCESS')
                     return product_count
                     
@@ -436,9 +653,28 @@ class URLBreacher:
             self.debug_print(f"Error in product URL extraction: {e}", 'ERROR')
             return 0
 
+    async def count_total_pages(self, page, site_type):
+        """Page count of the listing open on `page`, from its pagination links and labels."""
+        try:
+            info = await page.evaluate(PAGINATION_INFO_JS)
+            return self.pagination_planner.total_pages(page.url, info['hrefs'], info['labels'])
+        except Exception as e:
+            self.debug_print(f"Could not count pages: {e}", 'WARNING')
+            return None
+
+    async def estimate_total_products(self, page, site_type):
+        """Result count shown in the listing header ("1-48 of over 10,000 results"), or None."""
+        try:
+            return parse_result_count(await page.evaluate(RESULT_COUNT_JS))
+        except Exception as e:
+            self.debug_print(f"Could not estimate product count: {e}", 'WARNING')
+            return None
+
     async def handle_pagination(self, page, site_type):
         """Handle pagination with improved error handling and task management."""
         try:
+            # Every next-page navigation (click or URL) takes a token from the domain's bucket
+            await self.rate_limiter.acquire(page.url)
             self.debug_print("Attempting pagination...", 'STEP')
             
             if site_type == 'amazon':
@@ -451,11 +687,12 @@ class URLBreacher:
                         is_visible = await next_button.is_visible()
                         if is_visible:
                             self.debug_print("Found active next page button", 'SUCCESS')
+                            previous = await self.readiness.signature(page, site_type)
                             await next_button.click()
-                            await page.wait_for_load_state('networkidle')
                             
-                            # Verify page changed
-                            await page.wait_for_selector('div[data-component-type="s-search-result"]', timeout=10000)
+                            # Ready once a different set of results has rendered
+                            if not await self.readiness.wait(page, site_type, 'pagination', previous):
+                                raise Exception("Next page did not render new results")
                             self.debug_print("Successfully navigated to next page", 'SUCCESS')
                             return True
                     else:
@@ -467,19 +704,10 @@ class URLBreacher:
                     
                     # Fallback: Try URL modification
                     try:
-                        current_url = page.url
-                        current_page = re.search(r'page=(\d+)', current_url)
-                        if current_page:
-                            next_page = int(current_page.group(1)) + 1
-                            next_url = re.sub(r'page=\d+', f'page={next_page}', current_url)
-                        else:
-                            if '?' in current_url:
-                                next_url = current_url + '&page=2'
-                            else:
-                                next_url = current_url + '?page=2'
-                        
-                        await page.goto(next_url, wait_until='networkidle')
-                        await page.wait_for_selector('div[data-component-type="s-search-result"]', timeout=10000)
+                        next_url = self.pagination_planner.next_page_url(page.url)
+                        await self._goto(page, next_url, wait_until='domcontentloaded')
+                        if not await self.readiness.wait(page, site_type, 'pagination'):
+                            return False
                         self.debug_print("Successfully navigated to next page via URL modification", 'SUCCESS')
                         return True
                     except Exception as e:
@@ -506,6 +734,9 @@ class URLBreacher:
                 viewport={'width': 1920, 'height': 1080},
                 user_agent=UserAgent().random
             )
+            profile = get_profile(self.interception_profile)
+            if profile:
+                await profile.apply(context)
             page = await context.new_page()
             
             # Set default timeouts
@@ -558,6 +789,10 @@ class URLBreacher:
                 ignore_https_errors=True
             )
 
+            profile = get_profile(self.interception_profile)
+            if profile:
+                await profile.apply(context)
+
             # Add stealth scripts
             await context.add_init_script("""
                 Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
@@ -581,59 +816,142 @@ class URLBreacher:
             self.debug_print(f"Error creating page: {e}", 'ERROR')
             raise
 
+    async def get_browser_pool(self):
+        """Return the shared browser pool, starting it on first use."""
+        if self.browser_pool is None:
+            self.browser_pool = BrowserPool(size=self.browser_pool_size)
+        if not self.browser_pool.started:
+            self.debug_print(f"Starting browser pool with {self.browser_pool_size} browsers...", 'STEP')
+            await self.browser_pool.start()
+        return self.browser_pool
+
+    async def close_browser_pool(self):
+        """Shut down the shared browser pool and the HTTP tier session."""
+        if self.browser_pool is not None:
+            await self.browser_pool.close()
+            self.browser_pool = None
+        await self.fetcher.close()
+
+    async def _serve_html(self, page, url, html):
+        """Load an already-fetched body into `page` under its real URL without refetching it.
+        
+        In replay-only mode every other request of the page is aborted for the
+        rest of its lease, so nothing it loads or clicks reaches the network.
+        """
+        served = False
+        replay_only = self.replay_only
+        
+        # Playwright normalizes the navigation URL (trailing slash, percent-encoding, fragment),
+        # so fulfill the first document request rather than matching the URL string
+        async def fulfill(route):
+            nonlocal served
+            if served or not route.request.is_navigation_request():
+                return await (route.abort() if replay_only else route.fallback())
+            served = True
+            await route.fulfill(status=200, content_type='text/html; charset=utf-8', body=html)
+        
+        await page.route('**/*', fulfill)
+        try:
+            await page.goto(url, wait_until='domcontentloaded')
+        finally:
+            if not replay_only:
+                await page.unroute('**/*', fulfill)
+
+    def _http_first(self, url):
+        """Whether to try the HTTP tier for `url` (always in replay-only mode, where it is the cache)."""
+        return self.replay_only or self.fetcher.preferred_tier(url) == 'http'
+
+    def _require_network(self, url):
+        """Raise ReplayMiss instead of loading `url` in the browser in replay-only mode."""
+        if self.replay_only:
+            self.stats['replay_misses'] += 1
+            raise ReplayMiss(f"No cached response for {url} (replay-only mode)")
+
+    async def _goto(self, page, url, **kwargs):
+        """page.goto paced by the domain rate limiter, reporting the response back to it."""
+        self._require_network(url)
+        await self.rate_limiter.acquire(url)
+        start = time.monotonic()
+        try:
+            response = await page.goto(url, **kwargs)
+        except Exception:
+            self.rate_limiter.observe(url, None)
+            raise
+        if response is not None:
+            self.rate_limiter.observe(url, response.status, time.monotonic() - start,
+                                      response.headers.get('retry-after'))
+        return response
+
     async def attempt_breach(self, url, max_retries=3):
-        """Attempt to breach the website with multiple strategies."""
+        """Attempt to breach the website with multiple strategies.
+        
+        Returns a PageLease from the browser pool; the caller must release it.
+        """
         self.debug_print("=== Starting Website Breach Attempt ===", 'STEP')
+        pool = await self.get_browser_pool()
+        site_type = self.detect_site_type(url)
+        
+        # Tier 1: plain HTTP on the pooled session, unless this domain needed a browser before
+        http_content = None
+        if self._http_first(url):
+            self.debug_print("Attempting HTTP tier...", 'STEP')
+            http_content = await self.fetcher.fetch_http(url)
+            if http_content:
+                parsed = await self._parse_html_async(http_content, url)
+                product_count = len(self._parsed_product_urls(parsed))
+                # Replaying, the cached body is all there is, so it is served even if thin
+                if self.replay_only or self.fetcher.is_sufficient(product_count, site_type):
+                    self.fetcher.record(url, 'http')
+                    lease = await pool.acquire_page(profile=self.interception_profile, user_agent=UserAgent().random)
+                    try:
+                        await self._serve_html(lease.page, url, http_content)
+                    except BaseException:
+                        await lease.release()
+                        raise
+                    self.debug_print(f"HTTP tier sufficient ({product_count} product links)", 'SUCCESS')
+                    return lease
+                self.debug_print(f"HTTP tier insufficient ({product_count} product links), escalating to browser", 'WARNING')
+            # A replay miss: the browser would go to the network
+            self._require_network(url)
+            self.fetcher.record(url, 'browser')
+        
         for attempt in range(max_retries):
+            lease = None
             try:
                 self.debug_print(f"Breach Attempt {attempt + 1}/{max_retries}", 'STEP')
                 
-                # Initialize Playwright
-                playwright = await async_playwright().start()
-                browser = await playwright.chromium.launch(
-                    headless=True,
-                    args=['--disable-dev-shm-usage', '--no-sandbox']
-                )
-                context = await browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent=UserAgent().random
-                )
-                page = await context.new_page()
-                
-                # Set default timeouts
-                await page.set_default_timeout(30000)
-                await page.set_default_navigation_timeout(30000)
+                # Lease a fresh context and page from the warm pool
+                lease = await pool.acquire_page(profile=self.interception_profile, user_agent=UserAgent().random)
+                page = lease.page
                 
                 try:
                     # Strategy 1: Direct access with stealth
                     self.debug_print("Attempting direct access with stealth...", 'STEP')
-                    await context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-                    await page.goto(url, wait_until='networkidle')
+                    await self._goto(page, url, wait_until='domcontentloaded')
+                    await self.readiness.wait(page, site_type, 'breach')
                     content = await page.content()
                     if len(content) > 1000:
                         self.debug_print("Direct access successful!", 'SUCCESS')
-                        return page, browser, context, playwright
+                        return lease
                 except Exception as e:
                     self.debug_print(f"Direct access failed: {str(e)}", 'ERROR')
                 
                 try:
-                    # Strategy 2: Try with aiohttp
-                    self.debug_print("Attempting aiohttp method...", 'STEP')
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(url, headers={'User-Agent': UserAgent().random}) as response:
-                            if response.status == 200:
-                                content = await response.text()
-                                await page.set_content(content)
-                                self.debug_print("Aiohttp access successful!", 'SUCCESS')
-                                return page, browser, context, playwright
+                    # Strategy 2: Serve the HTTP tier body even though it looked thin
+                    if http_content:
+                        self.debug_print("Falling back to HTTP tier content...", 'STEP')
+                        await self._serve_html(page, url, http_content)
+                        self.debug_print("HTTP content loaded into page", 'SUCCESS')
+                        return lease
                 except Exception as e:
-                    self.debug_print(f"Aiohttp failed: {str(e)}", 'ERROR')
+                    self.debug_print(f"HTTP content fallback failed: {str(e)}", 'ERROR')
                 
                 try:
                     # Strategy 3: Try with different user agent and proxy
                     self.debug_print("Attempting user agent and proxy rotation...", 'STEP')
-                    await context.clear_cookies()
-                    await context.new_context(
+                    await lease.release()
+                    lease = await pool.acquire_page(
+                        profile=self.interception_profile,
                         user_agent=UserAgent().random,
                         proxy={
                             'server': 'http://proxy-server.scraperapi.com:8001',
@@ -641,35 +959,29 @@ class URLBreacher:
                             'password': 'free'
                         }
                     )
-                    await page.goto(url, wait_until='networkidle')
+                    page = lease.page
+                    await self._goto(page, url, wait_until='domcontentloaded')
+                    await self.readiness.wait(page, site_type, 'breach')
                     content = await page.content()
                     if len(content) > 1000:
                         self.debug_print("User agent and proxy rotation successful!", 'SUCCESS')
-                        return page, browser, context, playwright
+                        return lease
                 except Exception as e:
                     self.debug_print(f"User agent and proxy rotation failed: {str(e)}", 'ERROR')
                 
-                # Clean up if all strategies fail
-                await context.close()
-                await browser.close()
-                await playwright.stop()
+                # Return the lease if all strategies fail
+                await lease.release()
                 
                 self.debug_print(f"All strategies failed for attempt {attempt + 1}", 'WARNING')
                 
-                # Wait between attempts
+                # Back off: the next attempt waits for the slowed-down domain rate
                 if attempt < max_retries - 1:
-                    delay = random.uniform(2, 5)
-                    self.debug_print(f"Waiting {delay:.1f} seconds before next attempt...")
-                    await asyncio.sleep(delay)
+                    self.rate_limiter.penalize(url)
             
             except Exception as e:
                 self.debug_print(f"Critical error in breach attempt {attempt + 1}: {str(e)}", 'ERROR')
-                try:
-                    await context.close()
-                    await browser.close()
-                    await playwright.stop()
-                except:
-                    pass
+                if lease is not None:
+                    await lease.release()
         
         self.debug_print("All breach attempts failed!", 'ERROR')
         raise Exception("Failed to breach website after all attempts")
@@ -680,6 +992,9 @@ class URLBreacher:
         self.stats['start_time'] = datetime.now()
         site_type = self.detect_site_type(url)
         self.debug_print(f"Detected site type: {site_type}", 'INFO')
+        owns_pool = self.browser_pool is None
+        self._add_start_url(url)
+        resume_url, start_page = self._resume_point(url)
         
         try:
             # Create event loop if needed
@@ -692,8 +1007,11 @@ class URLBreacher:
                 asyncio.set_event_loop(loop)
             
             # Attempt to breach the website
-            self.debug_print(f"Starting breach attempt for {url}...", 'STEP')
-            page, browser, context, playwright = await self.attempt_breach(url)
+            if start_page > 1:
+                self.debug_print(f"Resuming {url} at page {start_page}", 'INFO')
+            self.debug_print(f"Starting breach attempt for {resume_url}...", 'STEP')
+            lease = await self.attempt_breach(resume_url)
+            page = lease.page
             
             try:
                 self.debug_print("Website successfully breached!", 'SUCCESS')
@@ -713,7 +1031,9 @@ class URLBreacher:
                 """, 'INFO')
                 
                 # Extract URLs with multiple fallback methods
-                current_page = 1
+                run = self._begin_listing(url)
+                complete = False
+                current_page = start_page
                 while current_page <= total_pages:
                     self.debug_print(f"\n=== Processing Page {current_page}/{total_pages} ===", 'STEP')
                     
@@ -727,17 +1047,15 @@ class URLBreacher:
                     
                     if products_found == 0:
                         self.debug_print("Generic extraction failed, trying raw link extraction...", 'WARNING')
-                        all_links = await page.query_selector_all('a')
+                        all_links = await page.evaluate(HARVEST_ALL_HREFS_JS)
                         self.debug_print(f"Found {len(all_links)} raw links to analyze", 'INFO')
-                        for link in all_links:
-                            try:
-                                url = await link.get_attribute('href')
-                                if url and self.is_product_url(url):
-                                    full_url = urljoin(self.base_url, url)
-                                    self.product_urls.add(full_url)
-                                    products_found += 1
-                            except Exception as e:
-                                continue
+                        raw_products = self.canonicalizer.unique(
+                            urljoin(self.base_url or page.url, link_url) for link_url in all_links
+                            if self.is_product_url(link_url, site_type)
+                        )
+                        self.product_urls.update(raw_products)
+                        self.last_page_urls.update(raw_products)
+                        products_found += len(raw_products)
                     
                     self.debug_print(f"Found {products_found} products on page {current_page}", 'SUCCESS' if products_found > 0 else 'WARNING')
                     
@@ -746,6 +1064,15 @@ class URLBreacher:
                         self.debug_print("Saving current batch of URLs...")
                         self.save_batch()
                     
+                    self._record_progress(url, current_page, page.url)
+                    
+                    # Incremental mode: stop once the leading pages match the previous run
+                    if self._observe_page(run, current_page):
+                        break
+                    
+                    if current_page == total_pages:
+                        complete = True
+                    
                     # Handle pagination with fallback
                     if current_page < total_pages:
                         self.debug_print(f"\n=== Attempting Pagination to Page {current_page + 1} ===", 'STEP')
@@ -760,17 +1087,16 @@ class URLBreacher:
                         if success:
                             self.debug_print("Pagination successful!", 'SUCCESS')
                             current_page += 1
-                            await page.wait_for_load_state('networkidle')
-                            delay = random.uniform(1, 3)
-                            self.debug_print(f"Waiting {delay:.1f} seconds before processing next page...")
-                            await asyncio.sleep(delay)
                         else:
                             self.debug_print("All pagination attempts failed, stopping.", 'ERROR')
                             break
                 
+                self._finish_listing(run, complete and start_page == 1)
+                self._record_progress(url, current_page, page.url, done=True)
+                
             finally:
-                self.debug_print("Closing browser...")
-                await browser.close()
+                self.debug_print("Releasing browser lease...")
+                await lease.release()
                 
         except Exception as e:
             self.debug_print(f"Critical error during scrape: {str(e)}", 'ERROR')
@@ -788,51 +1114,29 @@ class URLBreacher:
             """, 'INFO')
             self._print_final_stats()
             self.save_batch(force=True)
+            self.save_recrawl()
+            self.save_checkpoint(final=True)
+            if owns_pool:
+                await self.close_browser_pool()
 
     async def crawl(self, url):
         """Crawl a URL and extract product URLs."""
         start_time = datetime.now()
+        owns_pool = self.browser_pool is None
+        self._add_start_url(url)
+        resume_url, start_page = self._resume_point(url)
         try:
             self.debug_print(f"Starting crawl for {url}...", 'STEP')
             logging.info(f"Starting crawl for {url}")
             
             # Attempt to breach the website
-            self.debug_print(f"Starting breach attempt for {url}...", 'STEP')
-            page, browser, context, playwright = await self.attempt_breach(url)
+            self.debug_print(f"Starting breach attempt for {resume_url}...", 'STEP')
+            lease = await self.attempt_breach(resume_url)
+            page = lease.page
             
             try:
                 self.debug_print("Website successfully breached!", 'SUCCESS')
-                
-                # Get the site type based on URL
-                site_type = self.detect_site_type(url)
-                self.debug_print(f"Detected site type: {site_type}", 'INFO')
-                
-                # Extract URLs from the current page
-                products_found = await self.extract_product_urls(page, site_type)
-                self.debug_print(f"Found {products_found} products on initial page", 'SUCCESS')
-                
-                # Handle pagination if products were found
-                if products_found > 0:
-                    page_count = 1
-                    while page_count < self.max_pages:
-                        self.debug_print(f"Attempting pagination...", 'STEP')
-                        if not await self.handle_pagination(page, site_type):
-                            self.debug_print("No more pages to process", 'INFO')
-                            break
-                        
-                        # Wait for content to load after pagination
-                        await page.wait_for_load_state('networkidle')
-                        
-                        # Extract URLs from the new page
-                        new_products = await self.extract_product_urls(page, site_type)
-                        if new_products == 0:
-                            self.debug_print("No new products found, stopping pagination", 'WARNING')
-                            break
-                            
-                        page_count += 1
-                        self.debug_print(f"Processed page {page_count}", 'SUCCESS')
-                
-                self.debug_print(f"Processed {page_count} pages", 'INFO')
+                await self._crawl_listing(page, url, start_page)
                 return True
                 
             except Exception as e:
@@ -841,10 +1145,8 @@ class URLBreacher:
                 return False
                 
             finally:
-                # Clean up
-                await context.close()
-                await browser.close()
-                await playwright.stop()
+                # Return the page to the pool
+                await lease.release()
                 
         except Exception as e:
             self.debug_print(f"Error during crawl: {e}", 'ERROR')
@@ -858,15 +1160,409 @@ class URLBreacher:
             - Duration: {duration}
             - Total URLs found: {len(self.product_urls)}
             - Successful scrapes: {len(self.products_per_page)}
-            - Failed scrapes: {self.failed_scrapes}
+            - Failed scrapes: {self.stats['failed_scrapes']}
             - Product URLs found: {len(self.product_urls)}
             - Category URLs found: {len(self.category_urls)}
             """, 'INFO')
+            self.save_batch(force=True)
+            self.save_recrawl()
+            self.save_checkpoint(final=True)
+            if owns_pool:
+                await self.close_browser_pool()
+
+    async def _crawl_listing(self, page, url, start_page=1):
+        """Extract products from an opened listing page and walk its pagination.
+        
+        `start_page` is the page number of the opened page when resuming mid-walk.
+        """
+        # Get the site type based on URL
+        site_type = self.detect_site_type(url)
+        self.debug_print(f"Detected site type: {site_type}", 'INFO')
+        run = self._begin_listing(url)
+        complete = False
+        
+        try:
+            # Extract URLs from the current page
+            products_found = await self.extract_product_urls(page, site_type)
+            self.debug_print(f"Found {products_found} products on initial page", 'SUCCESS')
+            
+            # Handle pagination if products were found
+            page_count = start_page
+            last_url = page.url
+            self._record_progress(url, page_count, page.url)
+            if products_found == 0:
+                complete = True
+            elif not self._observe_page(run, page_count):
+                plan = await self._plan_browser_pages(url, page, site_type, run)
+                if plan is not None:
+                    page_count, complete = await self._crawl_plan(plan)
+                    last_url = plan.page_urls[page_count]
+                    self.debug_print(f"Processed {page_count} pages", 'INFO')
+                    self._record_progress(url, page_count, last_url, done=complete)
+                    return page_count
+                
+                # Infinite feeds are harvested in one scroll pass
+                if run is None and self.site_selectors.get(site_type, {}).get('infinite_scroll'):
+                    await self.harvest_scroll_feed(page, site_type)
+                    complete = True
+                    self.debug_print(f"Processed {page_count} pages", 'INFO')
+                    self._record_progress(url, page_count, last_url, done=True)
+                    return page_count
+                
+                # No page links to plan from (e.g. a load-more button): click through
+                while page_count < self.max_pages:
+                    self.debug_print(f"Attempting pagination...", 'STEP')
+                    if not await self.handle_pagination(page, site_type):
+                        self.debug_print("No more pages to process", 'INFO')
+                        complete = True
+                        break
+                    
+                    # Extract URLs from the new page
+                    new_products = await self.extract_product_urls(page, site_type)
+                    if new_products == 0:
+                        self.debug_print("No new products found, stopping pagination", 'WARNING')
+                        complete = True
+                        break
+                        
+                    page_count += 1
+                    last_url = page.url
+                    self.debug_print(f"Processed page {page_count}", 'SUCCESS')
+                    self._record_progress(url, page_count, page.url)
+                    if self._observe_page(run, page_count):
+                        break
+            
+            self.debug_print(f"Processed {page_count} pages", 'INFO')
+            self._record_progress(url, page_count, last_url, done=True)
+            return page_count
+        finally:
+            self._finish_listing(run, complete and start_page == 1)
+
+    def _begin_listing(self, url):
+        """Start fingerprinting a category walk (None unless incremental mode is on)."""
+        return self.recrawl.begin(url) if self.recrawl else None
+
+    def _observe_page(self, run, page_number):
+        """Fingerprint the last extracted page; True when the walk can stop early."""
+        if run is None:
+            return False
+        if run.observe(page_number, self.last_page_urls):
+            self.debug_print(f"First {run.unchanged_prefix} pages unchanged since last run, "
+                             f"stopping {run.category_url} early", 'SUCCESS')
+            return True
+        return False
+
+    def _finish_listing(self, run, complete):
+        if run is None:
+            return
+        delta = self.recrawl.finish(run, complete)
+        self.debug_print(f"Recrawl delta for {run.category_url}: "
+                         f"+{len(delta['added'])} / -{len(delta['removed'])} products", 'INFO')
+
+    def save_recrawl(self):
+        """Persist page fingerprints and write this run's product delta."""
+        if self.recrawl is None:
+            return
+        try:
+            self.recrawl.save()
+            data = self.recrawl.write_delta(self.delta_file)
+            self.debug_print(f"Recrawl delta saved to {self.delta_file} "
+                             f"(+{len(data['added'])} / -{len(data['removed'])})", 'SUCCESS')
+        except Exception as e:
+            self.debug_print(f"Error saving recrawl state: {e}", 'ERROR')
+
+    def _next_page_url(self, url):
+        """Next listing page URL by bumping the page parameter (page=2 if there is none)."""
+        return self.pagination_planner.next_page_url(url)
+
+    async def _crawl_listing_http(self, url, start_url=None, start_page=1):
+        """Walk a listing over plain HTTP. Returns pages processed, or 0 if the first page was insufficient.
+        
+        `start_url`/`start_page` continue a checkpointed walk from a later page.
+        """
+        site_type = self.detect_site_type(url)
+        run = self._begin_listing(url)
+        complete = False
+        page_count = start_page - 1
+        page_url = start_url or url
+        try:
+            while page_count < self.max_pages:
+                html = await self.fetcher.fetch_http(page_url)
+                if not html:
+                    break
+                parsed = await self._parse_html_async(html, page_url)
+                page_products = self._parsed_product_urls(parsed)
+                if page_count == 0 and not self.fetcher.is_sufficient(len(page_products), site_type):
+                    self.debug_print(f"HTTP tier insufficient for {url} ({len(page_products)} product links)", 'WARNING')
+                    # The browser tier walks this listing instead
+                    run = None
+                    return 0
+                new_products = self._absorb_http_page(parsed, page_products)
+                page_count += 1
+                self.debug_print(f"HTTP tier: {len(page_products)} products on page {page_count} of {url}", 'SUCCESS')
+                self._record_progress(url, page_count, page_url)
+                if self._observe_page(run, page_count):
+                    break
+                if not new_products:
+                    complete = True
+                    break
+                plan = self._plan_http_pages(url, page_url, parsed, site_type, run)
+                if plan is not None:
+                    page_count, complete = await self._crawl_plan(plan)
+                    self._record_progress(url, page_count, plan.page_urls[page_count], done=complete)
+                    return page_count
+                page_url = self._next_page_url(page_url)
+            if page_count:
+                self._record_progress(url, page_count, page_url, done=True)
+            return page_count
+        finally:
+            self._finish_listing(run, complete and start_page == 1)
+
+    def _absorb_http_page(self, parsed, page_products):
+        """Add one HTTP-fetched listing page's links to the URL sets; returns its new products."""
+        new_products = {product for product in page_products if product not in self.product_urls}
+        self._merge_parsed(parsed)
+        self.product_urls.update(page_products)
+        self.last_page_urls = page_products
+        self.products_per_page.append(len(page_products))
+        self.total_products_found += len(new_products)
+        return new_products
+
+    async def _plan_browser_pages(self, url, page, site_type, run):
+        """PagePlan for the remaining pages of the listing open on `page`, or None to click through."""
+        # Incremental mode stops at the first unchanged pages, so it keeps walking in order
+        if run is not None:
+            return None
+        try:
+            info = await page.evaluate(PAGINATION_INFO_JS)
+        except Exception as e:
+            self.debug_print(f"Could not read pagination: {e}", 'WARNING')
+            return None
+        plan = self.pagination_planner.plan(url, page.url, info['hrefs'], info['labels'], site_type)
+        return plan if plan.total > plan.first else None
+
+    def _plan_http_pages(self, url, page_url, parsed, site_type, run):
+        """PagePlan from an HTTP-fetched listing page's links, or None to keep walking in order."""
+        if run is not None:
+            return None
+        hrefs = parsed['site_links'] + [link for link, _ in parsed['links']]
+        plan = self.pagination_planner.plan(url, page_url, hrefs, site_type=site_type)
+        return plan if plan.total > plan.first else None
+
+    async def _crawl_plan(self, plan):
+        """Fetch a plan's pages concurrently; returns (last contiguous page done, whether all finished).
+        
+        Inside crawl_many the pages are queued on its engine and finished later
+        by its workers, so this returns right away with only the first page done.
+        """
+        if self.crawl_engine is not None:
+            self.debug_print(f"Planned pages {plan.first + 1}-{plan.total} of {plan.category_url} "
+                             f"(param {plan.param!r}, queued on the running crawl)", 'STEP')
+            plan.engine = self.crawl_engine
+            for planned in plan.pages():
+                plan.engine.submit(planned)
+            return plan.first, False
+        self.debug_print(f"Planned pages {plan.first + 1}-{plan.total} of {plan.category_url} "
+                         f"(param {plan.param!r}, {self.page_concurrency} at a time)", 'STEP')
+        plan.engine = CrawlEngine(self._crawl_planned_page, concurrency=self.page_concurrency,
+                                  per_domain=self.page_concurrency)
+        await plan.engine.run(plan.pages())
+        for page_url, error in plan.engine.errors.items():
+            self.debug_print(f"Failed to crawl page {page_url}: {error}", 'ERROR')
+        return plan.contiguous(), plan.complete
+
+    async def _crawl_planned_page(self, page_url):
+        """Crawl-engine handler for one planned listing page; grows the plan when the page links further."""
+        plan = page_url.plan
+        site_type = self.detect_site_type(page_url)
+        ok = False
+        try:
+            if self._http_first(page_url):
+                html = await self.fetcher.fetch_http(page_url)
+                if not html:
+                    raise Exception("HTTP tier returned no page")
+                parsed = await self._parse_html_async(html, page_url)
+                found = len(self._absorb_http_page(parsed, self._parsed_product_urls(parsed)))
+                hrefs, labels = parsed['site_links'] + [link for link, _ in parsed['links']], ()
+            else:
+                pool = await self.get_browser_pool()
+                async with pool.lease_page(profile=self.interception_profile, user_agent=UserAgent().random) as page:
+                    await self._goto(page, page_url, wait_until='domcontentloaded')
+                    await self.readiness.wait(page, site_type, 'page')
+                    found = await self.extract_product_urls(page, site_type)
+                    info = await page.evaluate(PAGINATION_INFO_JS)
+                hrefs, labels = info['hrefs'], info['labels']
+            # Extend before finishing this page so the plan never looks settled too early
+            for planned in plan.extend(self.pagination_planner.total_pages(page_url, hrefs, labels)):
+                plan.engine.submit(planned)
+            ok = True
+        finally:
+            plan.finish(page_url.number, ok)
+            done = plan.contiguous()
+            self._record_progress(plan.category_url, done, plan.page_urls[done], done=plan.settled and plan.complete)
+        
+        self.debug_print(f"{found} products on page {page_url.number}/{plan.total} of {plan.category_url}",
+                         'SUCCESS' if found else 'WARNING')
+        self.save_batch()
+        return found
+
+    async def _crawl_one(self, url):
+        """Crawl-engine handler: crawl one start URL over HTTP, or on a leased page if needed."""
+        if isinstance(url, PlannedPage):
+            return await self._crawl_planned_page(url)
+        resume_url, start_page = self._resume_point(url)
+        if self._http_first(url):
+            if start_page > 1:
+                # The checkpointed page is done; continue from the one after it
+                pages = await self._crawl_listing_http(url, self._next_page_url(resume_url), start_page + 1)
+            else:
+                pages = await self._crawl_listing_http(url)
+            if pages:
+                self.fetcher.record(url, 'http')
+                self.stats['successful_scrapes'] += 1
+                self.save_batch()
+                return pages
+            self.fetcher.record(url, 'browser')
+        
+        lease = await self.attempt_breach(resume_url)
+        try:
+            pages = await self._crawl_listing(lease.page, url, start_page)
+            self.stats['successful_scrapes'] += 1
+            self.save_batch()
+            return pages
+        except Exception:
+            self.stats['failed_scrapes'] += 1
+            raise
+        finally:
+            await lease.release()
+
+    async def crawl_many(self, urls, concurrency=8, per_domain=4):
+        """Crawl many category/brand URLs concurrently on leased pages.
+        
+        Returns a dict mapping each start URL to the number of pages processed.
+        Listing pages planned along the way run on the same engine, so
+        `concurrency` and `per_domain` bound them as well.
+        """
+        urls = list(dict.fromkeys(urls))
+        for url in urls:
+            self._add_start_url(url)
+        self.stats['start_time'] = datetime.now()
+        owns_pool = self.browser_pool is None
+        # Keep at least one warm browser per `max_leases_per_browser` workers
+        if owns_pool:
+            self.browser_pool_size = max(self.browser_pool_size, -(-concurrency // 8))
+        self.debug_print(f"Starting concurrent crawl of {len(urls)} URLs "
+                         f"(concurrency={concurrency}, per_domain={per_domain})", 'STEP')
+        
+        engine = self.crawl_engine = CrawlEngine(self._crawl_one, concurrency=concurrency, per_domain=per_domain)
+        try:
+            await self.get_browser_pool()
+            results = await engine.run(urls)
+            for url, error in engine.errors.items():
+                self.debug_print(f"Failed to crawl {url}: {error}", 'ERROR')
+            # Planned pages finish after their start URL's handler returned
+            return {url: self.category_progress.get(url, {}).get('page', results[url])
+                    for url in urls if url in results}
+        finally:
+            self.crawl_engine = None
+            self.stats['end_time'] = datetime.now()
+            self.debug_print(f"Concurrent crawl finished: {engine.stats}", 'INFO')
             self._print_final_stats()
             self.save_batch(force=True)
+            self.save_recrawl()
+            self.save_checkpoint(final=True)
+            if owns_pool:
+                await self.close_browser_pool()
+
+    async def _fetch_frontier_page(self, url, site_type, listing):
+        """Fetch and parse one frontier page, over HTTP when the domain allows it, else in the browser."""
+        parsed = None
+        if self._http_first(url):
+            html = await self.fetcher.fetch_http(url)
+            if html:
+                parsed = await self._parse_html_async(html, url)
+                known = self.fetcher.domain(url) in self.fetcher.winning_tier
+                # Only listing pages decide the domain's tier; other pages are taken as fetched
+                if listing and not known:
+                    if self.fetcher.is_sufficient(len(self._parsed_product_urls(parsed)), site_type):
+                        self.fetcher.record(url, 'http')
+                    else:
+                        parsed = None
+        if parsed is None:
+            lease = await self.attempt_breach(url)
+            try:
+                html = await lease.page.content()
+            finally:
+                await lease.release()
+            parsed = await self._parse_html_async(html, url)
+            if listing:
+                self.fetcher.record(url, 'browser')
+        return parsed
+
+    async def _crawl_frontier_url(self, url):
+        """Crawl-engine handler for the frontier: fetch one page and queue its links one level deeper."""
+        site_type = self.detect_site_type(url)
+        listing = url.label in ('seed', 'category', 'pagination')
+        try:
+            parsed = await self._fetch_frontier_page(url, site_type, listing)
+        except Exception:
+            # A failed page is dropped rather than retried on resume
+            self.frontier.finish(url)
+            raise
+        
+        page_products = self._parsed_product_urls(parsed)
+        new_products = {product for product in page_products if product not in self.product_urls}
+        self._merge_parsed(parsed, url.depth)
+        self.product_urls.update(page_products)
+        self.frontier.record_yield(url, len(new_products))
+        if page_products:
+            self.products_per_page.append(len(page_products))
+        self.total_products_found += len(new_products)
+        self.stats['successful_scrapes'] += 1
+        self.debug_print(f"Depth {url.depth}: {len(new_products)} new products on {url} "
+                         f"({self.frontier.qsize()} queued)", 'SUCCESS' if new_products else 'INFO')
+        self.save_batch()
+        self.save_checkpoint()
+        return len(new_products)
+
+    async def crawl_frontier(self, urls, concurrency=8, per_domain=4):
+        """Breadth-controlled crawl: follow links from `urls` up to `max_depth` levels deep.
+        
+        Pages are taken from the frontier best expected product yield first
+        and fanned out over the crawl engine. Returns a dict mapping each
+        crawled URL to the number of new products it yielded.
+        """
+        self.frontier_crawl = True
+        for url in urls:
+            self.frontier.allow(url)
+        self.stats['start_time'] = datetime.now()
+        owns_pool = self.browser_pool is None
+        if owns_pool:
+            self.browser_pool_size = max(self.browser_pool_size, -(-concurrency // 8))
+        self.debug_print(f"Starting frontier crawl from {len(urls)} URLs (max_depth={self.max_depth}, "
+                         f"{self.frontier.qsize()} already queued)", 'STEP')
+        
+        engine = CrawlEngine(self._crawl_frontier_url, concurrency=concurrency, per_domain=per_domain,
+                             queue=self.frontier)
+        try:
+            await self.get_browser_pool()
+            results = await engine.run(urls)
+            for url, error in engine.errors.items():
+                self.debug_print(f"Failed to crawl {url}: {error}", 'ERROR')
+            self.stats['failed_scrapes'] += engine.stats['failed']
+            return results
+        finally:
+            self.stats['end_time'] = datetime.now()
+            self.debug_print(f"Frontier crawl finished: {engine.stats}, frontier {self.frontier.stats}", 'INFO')
+            self._print_final_stats()
+            self.save_batch(force=True)
+            self.save_checkpoint(final=True)
+            self.frontier.close()
+            if owns_pool:
+                await self.close_browser_pool()
 
     def scrape_with_playwright(self, url):
         """Enhanced Playwright scraping focused on product URL extraction."""
+        self._require_network(url)
         logging.info("Starting Playwright scraping...")
         
         try:
@@ -885,16 +1581,21 @@ class URLBreacher:
                 page = context.new_page()
                 page.set_default_timeout(30000)
                 
-                # Handle bot detection
-                page.route("**/*", lambda route: route.continue_() 
-                         if route.request.resource_type in ['document', 'script', 'xhr', 'fetch']
-                         else route.abort())
+                # Block heavy resources at context level; only blocked requests reach Python
+                profile = get_profile(self.interception_profile)
+                interception = profile.apply_sync(context) if profile else None
                 
                 logging.info(f"Navigating to {url}")
-                response = page.goto(url, wait_until="networkidle", timeout=60000)
+                self.rate_limiter.acquire_sync(url)
+                start = time.monotonic()
+                response = page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                self.rate_limiter.observe(url, response.status, time.monotonic() - start,
+                                          response.headers.get('retry-after'))
                 
                 if response.status >= 400:
                     raise Exception(f"HTTP {response.status} error")
+                site_type = self.detect_site_type(url)
+                self.readiness.wait_sync(page, site_type, 'breach')
                 
                 # Handle common overlays
                 for selector in ['button[id*="cookie"]', 'button[class*="popup"]', 'div[class*="overlay"]']:
@@ -903,13 +1604,15 @@ class URLBreacher:
                     except:
                         pass
                 
-                site_type = self.detect_site_type(url)
                 pages_processed = asyncio.get_event_loop().run_until_complete(
                     self.handle_pagination(page, site_type)
                 )
                 
                 logging.info(f"Processed {pages_processed} pages")
                 logging.info(f"Total product URLs found: {len(self.product_urls)}")
+                if interception:
+                    saved = interception.for_page(page)
+                    logging.info(f"Blocked {saved['requests']} requests (~{saved['bytes'] / 1024:.0f} KiB saved): {saved['by_type']}")
                 
                 browser.close()
                 return True
@@ -920,6 +1623,7 @@ class URLBreacher:
 
     def scrape_with_selenium(self, url):
         """Scrape using Selenium with undetected chromedriver."""
+        self._require_network(url)
         last_error = None
         max_retries = 3
         
@@ -989,11 +1693,14 @@ class URLBreacher:
                 self.stats['failed_scrapes'] += 1
                 raise
 
-    def scrape_with_cloudscraper(self, url):
-        """Scrape using cloudscraper to bypass Cloudflare."""
+    def scrape_with_cloudscraper(self, url, response=None):
+        """Scrape using cloudscraper to bypass Cloudflare.
+        
+        Pass the probe `response` from scrape() to reuse it instead of fetching again.
+        """
         try:
-            scraper = cloudscraper.create_scraper()
-            response = scraper.get(url)
+            if response is None:
+                response = self.http.cloudscraper_get(url)
             content = response.text
             self.extract_urls(content, url)
             self.stats['successful_scrapes'] += 1
@@ -1004,30 +1711,67 @@ class URLBreacher:
             raise
 
     def scrape(self, url):
-        """Dynamically choose the best scraping approach."""
-        if self.is_cloudflare(url):
+        """Dynamically choose the best scraping approach.
+        
+        A successful (2xx) Cloudflare probe response is reused as the first
+        result, and the verdict is cached per domain so later URLs skip the probe.
+        """
+        verdict = self.protection_verdicts.get(url)
+        probe = None
+        if verdict is None:
+            probe = self._probe(url)
+            if probe is not None:
+                verdict = self._looks_like_cloudflare(probe)
+                self.protection_verdicts.set(url, verdict)
+        
+        if verdict:
             logging.info(f"Cloudflare detected on {url}, using cloudscraper.")
-            return self.scrape_with_cloudscraper(url)
-        else:
-            try:
-                logging.info(f"Trying Playwright for {url}")
-                return self.scrape_with_playwright(url)
-            except Exception as e:
-                logging.error(f"Playwright failed: {e}. Falling back to Selenium.")
-                return self.scrape_with_selenium(url)
+            # A challenge page (403/503) is not content; only a 2xx probe can stand in for the fetch
+            return self.scrape_with_cloudscraper(url, response=probe if probe is not None and probe.ok else None)
+        
+        # The probe already holds the page; keep it if it carries enough product links
+        if probe is not None and probe.ok:
+            parsed = self._parse_html(probe.text, url)
+            product_count = len(self._parsed_product_urls(parsed))
+            if self.fetcher.is_sufficient(product_count, self.detect_site_type(url)):
+                logging.info(f"Probe response for {url} has {product_count} product links, skipping browser.")
+                self._merge_parsed(parsed)
+                self.stats['successful_scrapes'] += 1
+                return probe.text
+        
+        self._require_network(url)
+        try:
+            logging.info(f"Trying Playwright for {url}")
+            return self.scrape_with_playwright(url)
+        except Exception as e:
+            logging.error(f"Playwright failed: {e}. Falling back to Selenium.")
+            return self.scrape_with_selenium(url)
 
-    def is_cloudflare(self, url):
-        """Detect if a website is protected by Cloudflare."""
+    def _probe(self, url):
+        """Fetch `url` once through cloudscraper; None on failure."""
         try:
-            scraper = cloudscraper.create_scraper()
-            response = scraper.get(url)
-            return "cloudflare" in response.text.lower()
+            return self.http.cloudscraper_get(url)
         except Exception as e:
             logging.error(f"Cloudflare detection failed: {e}")
-            return False
+            return None
+
+    @staticmethod
+    def _looks_like_cloudflare(response):
+        return "cloudflare" in response.text.lower()
 
-    def crawl(self, start_url=None):
-        """Start crawling from a category URL."""
+    def is_cloudflare(self, url):
+        """Detect if a website is protected by Cloudflare (cached per domain)."""
+        verdict = self.protection_verdicts.get(url)
+        if verdict is None:
+            probe = self._probe(url)
+            if probe is None:
+                return False
+            verdict = self._looks_like_cloudflare(probe)
+            self.protection_verdicts.set(url, verdict)
+        return verdict
+
+    def crawl_sync(self, start_url=None):
+        """Start crawling from a category URL with sync Playwright (no pool, tiers or checkpoints)."""
         if not start_url:
             logging.error("No start URL provided")
             return
@@ -1063,7 +1807,7 @@ class URLBreacher:
         - Failed scrapes: {self.stats['failed_scrapes']}
         - Product URLs found: {len(self.product_urls)}
         - Category URLs found: {len(self.category_urls)}
-        - Queue size: {self.url_queue.qsize()}
+        - Queue size: {self.frontier.qsize()}
         """)
         
     def _print_final_stats(self):
@@ -1077,27 +1821,31 @@ class URLBreacher:
         - Failed scrapes: {self.stats['failed_scrapes']}
         - Product URLs found: {len(self.product_urls)}
         - Category URLs found: {len(self.category_urls)}
+        - Domain rates: {self.rate_limiter.stats()}
+        - Readiness waits: {self.readiness.summary()}
         """)
 
     def _save_progress(self):
-        """Save current progress to file."""
+        """Save current progress to file (compacted from the JSONL sink)."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        data = {
-            'product_urls': list(self.product_urls),
-            'category_urls': list(self.category_urls),
-            'pagination_urls': list(self.pagination_urls),
-            'stats': {
+        filename = f'scraping_progress_{timestamp}.json'
+        self._append_new_urls()
+        self.sink.compact(
+            filename,
+            {'product_urls': 'product', 'category_urls': 'category', 'pagination_urls': 'pagination'},
+            stats={
                 'total_urls': len(self.visited_urls),
                 'successful_scrapes': self.stats['successful_scrapes'],
                 'failed_scrapes': self.stats['failed_scrapes']
             }
-        }
-        
-        filename = f'scraping_progress_{timestamp}.json'
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=4)
+        )
         logging.info(f"Progress saved to {filename}")
 
+    async def harvest_links(self, page, product_selectors, link_selectors, first_match=False):
+        """Collect raw hrefs for every product/link selector combination in one evaluate call."""
+        result = await page.evaluate(HARVEST_LINKS_JS, [list(product_selectors), list(link_selectors), first_match])
+        return result or {'containers': 0, 'hrefs': []}
+
     async def _general_extract_product_urls(self, page, site_type):
         """General method for extracting product URLs from any site."""
         selectors = self.site_selectors.get(site_type, {})
@@ -1105,60 +1853,45 @@ class URLBreacher:
         page_product_count = 0
         
         try:
-            # First try site-specific selectors
+            base_url = self.base_url or page.url
+            
+            # First try site-specific selectors, harvested in a single round-trip
             if selectors:
                 self.debug_print(f"Using site-specific selectors for {site_type}", 'INFO')
-                for product_selector in selectors['product']:
-                    try:
-                        products = await page.query_selector_all(product_selector)
-                        self.debug_print(f"Found {len(products)} potential products with selector: {product_selector}", 'INFO')
-                        
-                        for product in products:
-                            for link_selector in selectors['link']:
-                                try:
-                                    link = await product.query_selector(link_selector)
-                                    if link:
-                                        url = await link.get_attribute('href')
-                                        if url:
-                                            full_url = urljoin(self.base_url, url)
-                                            if self.is_product_url(full_url):
-                                                product_urls.add(full_url)
-                                                page_product_count += 1
-                                                self.total_products_found += 1
-                                                
-                                                if self.total_products_found % 10 == 0:
-                                                    self.debug_print(f"Milestone: Found {self.total_products_found} total products", 'SUCCESS')
-                                                    self.save_batch()
-                                except Exception as e:
-                                    continue
-                    except Exception as e:
-                        self.debug_print(f"Error with selector {product_selector}: {e}", 'ERROR')
-                        continue
+                harvest = await self.harvest_links(page, selectors['product'], selectors['link'])
+                self.debug_print(f"Found {harvest['containers']} potential products", 'INFO')
+                hrefs = harvest['hrefs']
+            else:
+                hrefs = []
+            
+            full_urls = [urljoin(base_url, url) for url in hrefs]
+            canonical_urls = self.canonicalizer.canonicalize_many(full_urls)
+            for canonical, labels in zip(canonical_urls, self.url_classifier.classify_many(full_urls, site_type)):
+                if 'product' in labels and canonical not in product_urls:
+                    product_urls.add(canonical)
+                    page_product_count += 1
             
             # Fallback to generic link extraction if no products found
             if not product_urls:
                 self.debug_print("No products found with specific selectors, trying generic extraction", 'WARNING')
-                all_links = await page.query_selector_all('a')
+                all_links = await page.evaluate(HARVEST_ALL_HREFS_JS)
                 self.debug_print(f"Found {len(all_links)} total links to analyze", 'INFO')
                 
-                for link in all_links:
-                    try:
-                        url = await link.get_attribute('href')
-                        if url:
-                            full_url = urljoin(self.base_url, url)
-                            if self.is_product_url(full_url):
-                                product_urls.add(full_url)
-                                page_product_count += 1
-                                self.total_products_found += 1
-                                
-                                if self.total_products_found % 10 == 0:
-                                    self.debug_print(f"Milestone: Found {self.total_products_found} total products", 'SUCCESS')
-                                    self.save_batch()
-                    except Exception as e:
-                        continue
+                full_urls = [urljoin(base_url, url) for url in all_links]
+                canonical_urls = self.canonicalizer.canonicalize_many(full_urls)
+                for canonical, labels in zip(canonical_urls, self.url_classifier.classify_many(full_urls, site_type)):
+                    if 'product' in labels and canonical not in product_urls:
+                        product_urls.add(canonical)
+                        page_product_count += 1
+            
+            self.total_products_found += page_product_count
+            if page_product_count:
+                self.debug_print(f"Milestone: Found {self.total_products_found} total products", 'SUCCESS')
             
             self.product_urls.update(product_urls)
+            self.last_page_urls = product_urls
             self.products_per_page.append(page_product_count)
+            self.save_batch()
             
             self.debug_print(f"""
             Page Statistics:
@@ -1188,8 +1921,10 @@ class URLBreacher:
                         # Check if button is enabled/clickable
                         is_disabled = await next_button.get_attribute('disabled')
                         if not is_disabled:
+                            previous = await self.readiness.signature(page, site_type)
                             await next_button.click()
-                            await page.wait_for_load_state('networkidle')
+                            if not await self.readiness.wait(page, site_type, 'pagination', previous):
+                                continue
                             self.debug_print("Successfully clicked next page button", 'SUCCESS')
                             return True
                 except Exception as e:
@@ -1202,17 +1937,16 @@ class URLBreacher:
                 parsed_url = urlparse(current_url)
                 query_params = dict(parse_qsl(parsed_url.query))
                 
-                # Common pagination parameters
-                page_params = ['page', 'p', 'pg', 'pageNumber', 'pageNum']
-                
-                for param in page_params:
+                for param in PAGE_PARAMS:
                     if param in query_params:
                         current_page = int(query_params[param])
                         query_params[param] = str(current_page + 1)
                         new_query = urlencode(query_params)
                         new_url = parsed_url._replace(query=new_query).geturl()
                         
-                        await page.goto(new_url, wait_until='networkidle')
+                        await self._goto(page, new_url, wait_until='domcontentloaded')
+                        if not await self.readiness.wait(page, site_type, 'pagination'):
+                            break
                         self.debug_print("Successfully navigated to next page via URL modification", 'SUCCESS')
                         return True
                 
@@ -1222,14 +1956,9 @@ class URLBreacher:
             # Fallback: Try infinite scroll
             if selectors.get('infinite_scroll', False):
                 try:
-                    # Scroll to bottom
-                    old_height = await page.evaluate('document.body.scrollHeight')
-                    await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                    await page.wait_for_timeout(2000)  # Wait for potential content load
-                    
-                    # Check if new content loaded
-                    new_height = await page.evaluate('document.body.scrollHeight')
-                    if new_height > old_height:
+                    # Scroll once; done as soon as new product links stop arriving
+                    harvest = await harvest_infinite_scroll(page, self._scroll_selectors(site_type), max_scrolls=1)
+                    if harvest['added']:
                         self.debug_print("Successfully loaded more content via infinite scroll", 'SUCCESS')
                         return True
                 except Exception as e:
@@ -1256,8 +1985,38 @@ class timeout:
     def __exit__(self, type, value, traceback):
         signal.alarm(0)
 
+def print_quick_stats(breacher):
+    print("\nQuick Statistics:")
+    print(f"Total URLs found: {breacher.stats['total_urls_found']}")
+    print(f"Successful scrapes: {breacher.stats['successful_scrapes']}")
+    print(f"Failed scrapes: {breacher.stats['failed_scrapes']}")
+    print(f"Product URLs found: {len(breacher.product_urls)}")
+    print(f"Category URLs found: {len(breacher.category_urls)}")
+    print(f"Pagination URLs found: {len(breacher.pagination_urls)}")
+
 def main():
+    parser = argparse.ArgumentParser(description="URL Breacher - Advanced Web Scraping Tool")
+    parser.add_argument('--sink', choices=sorted(SINK_TYPES), default='jsonl',
+                        help="Output backend for found URLs (default: jsonl)")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH,
+                        help=f"Checkpoint file written during the crawl (default: {DEFAULT_CHECKPOINT_PATH})")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the crawl saved in --checkpoint where it stopped")
+    args = parser.parse_args()
+    
     print("=== URL Breacher - Advanced Web Scraping Tool ===")
+    if args.resume:
+        # Finished runs remove their checkpoint
+        if not os.path.exists(args.checkpoint):
+            print(f"\nNothing to resume: no checkpoint at {args.checkpoint}")
+            return
+        breacher = URLBreacher(checkpoint_file=args.checkpoint, resume=True)
+        print(f"\nResuming crawl from {args.checkpoint}...")
+        asyncio.run(breacher.resume_crawl())
+        print("\nScraping completed successfully!")
+        print_quick_stats(breacher)
+        return
+    
     while True:
         url = input("\nEnter the URL to scrape (or 'quit' to exit): ")
         if url.lower() == 'quit':
@@ -1266,21 +2025,19 @@ def main():
         max_depth = input("Enter maximum crawling depth (default is 3): ")
         max_depth = int(max_depth) if max_depth.isdigit() else 3
         
-        breacher = URLBreacher(max_depth=max_depth)
+        breacher = URLBreacher(max_depth=max_depth, sink=args.sink, checkpoint_file=args.checkpoint)
         try:
             print("\nStarting scraping process...")
-            breacher.crawl(url)
+            # Depth 0 walks just this listing; otherwise follow its links breadth-first
+            if max_depth:
+                asyncio.run(breacher.crawl_frontier([url]))
+            else:
+                asyncio.run(breacher.crawl(url))
             print("\nScraping completed successfully!")
             print("\nResults have been saved to files.")
             
             # Display quick statistics
-            print("\nQuick Statistics:")
-            print(f"Total URLs found: {breacher.stats['total_urls_found']}")
-            print(f"Successful scrapes: {breacher.stats['successful_scrapes']}")
-            print(f"Failed scrapes: {breacher.stats['failed_scrapes']}")
-            print(f"Product URLs found: {len(breacher.product_urls)}")
-            print(f"Category URLs found: {len(breacher.category_urls)}")
-            print(f"Pagination URLs found: {len(breacher.pagination_urls)}")
+            print_quick_stats(breacher)
             
         except Exception as e:
             print(f"\nAn error occurred: {e}")
@@ -0,0 +1,161 @@
+import logging
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that never change which page is served
+TRACKING_PARAMS = frozenset({
+    'gclid', 'gclsrc', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid', 'srsltid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref', 'ref_', 'referrer', 'affiliate', 'aff_id',
+})
+TRACKING_PREFIXES = ('utm_', 'pd_rd_', 'pf_rd_', 'trk_')
+
+# Extra tracking parameters per site type
+SITE_TRACKING_PARAMS = {
+    'amazon': frozenset({'tag', 'psc', 'qid', 'sr', 'crid', 'sprefix', 'keywords', 'th', 'smid',
+                         '_encoding', 'dib', 'dib_tag', 'content-id', 'linkcode', 'linkid', 'camp', 'creative'}),
+    'noon': frozenset({'o', 'shareid'}),
+    'alibaba': frozenset({'spm', 'scm', 'tracelog', 'from'}),
+    'sharafdg': frozenset({'promo', 'position'}),
+}
+
+# Stable product IDs per site type: path regex (named groups) and the canonical path built from it
+PRODUCT_ID_RULES = {
+    'amazon': (re.compile(r'/(?:dp|gp/product|gp/aw/d|o/asin|product)/(?P<id>[A-Z0-9]{10})(?=[/?#]|$)',
+                          re.IGNORECASE), '/dp/{id}'),
+    'noon': (re.compile(r'^/(?P<locale>[a-z]{2,4}-[a-z]{2})/(?:[^/]+/)*?(?P<id>[A-Z0-9]{6,})/p/?$', re.IGNORECASE),
+             '/{locale}/{id}/p/'),
+    'sharafdg': (re.compile(r'/p/(?P<id>\d+)(?=[/?#]|$)'), '/p/{id}/'),
+}
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def site_for_host(host):
+    """Site type for a hostname (same names as URLBreacher.detect_site_type), or 'generic'."""
+    if 'amazon.' in host:
+        return 'amazon'
+    if 'noon.com' in host:
+        return 'noon'
+    if 'sharafdg' in host:
+        return 'sharafdg'
+    if 'alibaba' in host:
+        return 'alibaba'
+    return 'generic'
+
+
+class URLCanonicalizer:
+    """Collapses URL variants that serve the same page into one canonical form.
+
+    Product URLs with a stable ID are rebuilt from it (Amazon ASIN ->
+    /dp/{ASIN}, noon SKU -> /{locale}/{SKU}/p/, Sharaf DG -> /p/{id}/).
+    Everything else gets a lowercase scheme and host, no default port or
+    fragment, tracking parameters stripped and the remaining query sorted.
+    Results are memoized (up to `cache_size` URLs, 0 disables it) since
+    navigation links repeat on every page of a crawl.
+    """
+
+    def __init__(self, tracking_params=TRACKING_PARAMS, site_tracking_params=None, cache_size=200000):
+        self.tracking_params = frozenset(tracking_params)
+        self.site_tracking_params = SITE_TRACKING_PARAMS if site_tracking_params is None else site_tracking_params
+        self.cache_size = cache_size
+        self._cache = {}
+        self._hosts = {}
+
+    def _site(self, host):
+        site = self._hosts.get(host)
+        if site is None:
+            site = self._hosts[host] = site_for_host(host)
+        return site
+
+    def _is_tracking(self, name, site):
+        name = name.lower()
+        return (name in self.tracking_params or name.startswith(TRACKING_PREFIXES)
+                or name in self.site_tracking_params.get(site, ()))
+
+    @staticmethod
+    def _match_product(site, path):
+        rule = PRODUCT_ID_RULES.get(site)
+        if rule is None:
+            return None
+        match = rule[0].search(path)
+        if match is None:
+            return None
+        groups = match.groupdict()
+        groups['id'] = groups['id'].upper()
+        if groups.get('locale'):
+            groups['locale'] = groups['locale'].lower()
+        return groups
+
+    def product_id(self, url):
+        """(site type, stable product ID) for a product URL, or None."""
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return None
+        site = self._site((parts.hostname or '').lower())
+        groups = self._match_product(site, parts.path)
+        return (site, groups['id']) if groups else None
+
+    def canonicalize(self, url):
+        cached = self._cache.get(url)
+        if cached is not None:
+            return cached
+        canonical = self._canonicalize(url)
+        if self.cache_size:
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[url] = canonical
+        return canonical
+
+    def canonicalize_many(self, urls):
+        """Canonicalize a batch; returns the canonical URLs in input order."""
+        cache_get = self._cache.get
+        canonicalize = self.canonicalize
+        return [cache_get(url) or canonicalize(url) for url in urls]
+
+    def unique(self, urls):
+        """Canonical forms of `urls`, duplicates removed, first-seen order kept."""
+        return list(dict.fromkeys(self.canonicalize_many(urls)))
+
+    def _canonicalize(self, url):
+        try:
+            parts = urlsplit(url.strip())
+            port = parts.port
+        except ValueError:
+            return url
+        scheme = parts.scheme.lower()
+        if scheme not in _DEFAULT_PORTS:
+            return url
+        host = (parts.hostname or '').lower()
+        site = self._site(host)
+        netloc = host if port in (None, _DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+        groups = self._match_product(site, parts.path)
+        if groups:
+            path = PRODUCT_ID_RULES[site][1].format(**groups)
+            return urlunsplit((scheme, netloc, path, '', ''))
+
+        query = parts.query
+        if query:
+            params = [(name, value) for name, value in parse_qsl(query, keep_blank_values=True)
+                      if not self._is_tracking(name, site)]
+            query = urlencode(sorted(params))
+        return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+_default_canonicalizer = None
+
+
+def get_canonicalizer():
+    """Process-wide URLCanonicalizer (shared memo cache)."""
+    global _default_canonicalizer
+    if _default_canonicalizer is None:
+        _default_canonicalizer = URLCanonicalizer()
+    return _default_canonicalizer
+
+
+def canonicalize_url(url):
+    """Canonical form of `url` using the shared canonicalizer."""
+    return get_canonicalizer().canonicalize(url)
@@ -0,0 +1,144 @@
+import logging
+import re
+from bisect import bisect_right
+
+logger = logging.getLogger(__name__)
+
+# Labels in the order extract_urls files an URL under when several match
+LABELS = ('product', 'category', 'pagination')
+
+DEFAULT_PATTERNS = {
+    'product': [
+        # Generic patterns
+        r'/p/',
+        r'/product/',
+        r'/item/',
+        r'pid=',
+        r'product_id=',
+        # Alibaba patterns
+        r'/item/\d+',
+        r'/product/\d+-\d+',
+        # Noon patterns
+        r'/product-p\d+',
+        r'/\w+/\d+/p/',
+        # Sharaf DG patterns
+        r'/p/\d+',
+        r'/product-details/'
+    ],
+    'category': [
+        # Generic patterns
+        r'/c/',
+        r'/category/',
+        r'/department/',
+        r'cat=',
+        r'category_id=',
+        # Site-specific patterns
+        r'/catalog/',
+        r'/products/',
+        r'/collection/',
+        r'/shop/',
+        r'/deals/'
+    ],
+    'pagination': [
+        r'page=',
+        r'/page/',
+        r'p=\d+',
+        r'offset=',
+    ],
+}
+
+# Extra patterns layered on top of the defaults for a given site type
+SITE_PATTERNS = {
+    'amazon': {
+        'product': [r'/dp/[a-z0-9]{10}', r'/gp/product/'],
+        'category': [r'/b/', r'[?&]node='],
+    },
+}
+
+
+class URLClassifier:
+    """Classifies URLs as product/category/pagination with precompiled per-site regexes.
+
+    Every label's patterns are compiled once into a single alternation, so a URL
+    costs one lowercase and one search per label instead of one `re.search` per
+    pattern. `classify_many` scans a whole batch joined into one string and skips
+    to the next line after each hit, so a page of URLs costs a few C-level scans.
+    """
+
+    def __init__(self, patterns=None, site_patterns=None):
+        self.patterns = patterns or DEFAULT_PATTERNS
+        self.site_patterns = SITE_PATTERNS if site_patterns is None else site_patterns
+        self._compiled = {}
+
+    def _patterns_for(self, site_type):
+        merged = {label: list(self.patterns.get(label, [])) for label in LABELS}
+        for label, extra in self.site_patterns.get(site_type, {}).items():
+            merged.setdefault(label, []).extend(extra)
+        return merged
+
+    def compile(self, site_type=None):
+        """Return [(label, regex)] for `site_type`, compiling on first use."""
+        compiled = self._compiled.get(site_type)
+        if compiled is None:
+            compiled = self._compiled[site_type] = [
+                (label, re.compile('|'.join(f'(?:{p})' for p in patterns)))
+                for label, patterns in self._patterns_for(site_type).items()
+                if patterns
+            ]
+        return compiled
+
+    def classify(self, url, site_type=None):
+        """Return the frozenset of every label matching `url`."""
+        lowered = url.lower()
+        return frozenset(label for label, regex in self.compile(site_type) if regex.search(lowered))
+
+    def label(self, url, site_type=None):
+        """Return the highest-priority label for `url`, or None."""
+        lowered = url.lower()
+        for label, regex in self.compile(site_type):
+            if regex.search(lowered):
+                return label
+        return None
+
+    def classify_many(self, urls, site_type=None):
+        """Classify a batch of URLs; returns a list of label sets in input order."""
+        urls = urls if isinstance(urls, list) else list(urls)
+        if not urls:
+            return []
+        text = '\n'.join(urls).lower()
+        lines = text.split('\n')
+        if len(lines) != len(urls):
+            # Some URL contained a newline; fall back to one URL at a time
+            return [self.classify(url, site_type) for url in urls]
+
+        # Offsets where each URL starts, plus a sentinel past the end
+        starts = [0]
+        for line in lines:
+            starts.append(starts[-1] + len(line) + 1)
+
+        hits = [[] for _ in urls]
+        for label, regex in self.compile(site_type):
+            pos = 0
+            while True:
+                match = regex.search(text, pos)
+                if match is None:
+                    break
+                line = bisect_right(starts, match.start()) - 1
+                hits[line].append(label)
+                pos = starts[line + 1]
+        return [frozenset(labels) for labels in hits]
+
+    def _matches(self, label, url, site_type):
+        for compiled_label, regex in self.compile(site_type):
+            if compiled_label == label:
+                return regex.search(url.lower()) is not None
+        return False
+
+    def is_product(self, url, site_type=None):
+        return self._matches('product', url, site_type)
+
+    def is_category(self, url, site_type=None):
+        return self._matches('category', url, site_type)
+
+    def is_pagination(self, url, site_type=None):
+        return self._matches('pagination', url, site_type)
@@ -0,0 +1,292 @@
+import base64
+import hashlib
+import logging
+import math
+from array import array
+
+from url_canonicalizer import URLCanonicalizer
+
+logger = logging.getLogger(__name__)
+
+# No memo cache here: it would hold on to the strings this module exists to avoid keeping
+_canonicalizer = URLCanonicalizer(cache_size=0)
+
+
+def url_hash(canonical_url):
+    """64-bit blake2b hash of an already canonical URL (never 0, which marks an empty slot)."""
+    value = int.from_bytes(hashlib.blake2b(canonical_url.encode('utf-8'), digest_size=8).digest(), 'little')
+    return value or 1
+
+
+class HashSet:
+    """Open-addressing set of 64-bit hashes in one array('Q') with linear probing.
+
+    Costs 8 bytes per slot (~13 bytes per member at the default load factor)
+    instead of a URL string plus a set entry.
+    """
+
+    def __init__(self, capacity=1024, max_load=0.6):
+        self.max_load = max_load
+        size = 1 << max(4, math.ceil(capacity / max_load).bit_length())
+        self._slots = array('Q', bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def _index(self, value):
+        slots = self._slots
+        mask = self._mask
+        i = value & mask
+        while True:
+            current = slots[i]
+            if current == 0 or current == value:
+                return i
+            i = (i + 1) & mask
+
+    def add(self, value):
+        """Insert `value`; returns True if it was not present."""
+        i = self._index(value)
+        if self._slots[i]:
+            return False
+        self._slots[i] = value
+        self._count += 1
+        if self._count > len(self._slots) * self.max_load:
+            self._grow()
+        return True
+
+    def __contains__(self, value):
+        return self._slots[self._index(value)] != 0
+
+    def _grow(self):
+        old = self._slots
+        self._slots = array('Q', bytes(8 * len(old) * 2))
+        self._mask = len(self._slots) - 1
+        for value in old:
+            if value:
+                self._slots[self._index(value)] = value
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return (value for value in self._slots if value)
+
+    @property
+    def nbytes(self):
+        return len(self._slots) * self._slots.itemsize
+
+    def to_state(self):
+        return {'kind': 'hash', 'count': self._count, 'slots': base64.b64encode(self._slots.tobytes()).decode('ascii')}
+
+    @classmethod
+    def from_state(cls, state):
+        hash_set = cls.__new__(cls)
+        hash_set.max_load = 0.6
+        hash_set._slots = array('Q')
+        hash_set._slots.frombytes(base64.b64decode(state['slots']))
+        hash_set._mask = len(hash_set._slots) - 1
+        hash_set._count = state['count']
+        return hash_set
+
+
+class BloomFilter:
+    """Fixed-capacity Bloom filter over 64-bit hashes (double hashing on the two halves)."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        low = value & 0xFFFFFFFF
+        high = (value >> 32) | 1
+        size = self.size
+        return [(low + i * high) % size for i in range(self.hash_count)]
+
+    def add(self, value):
+        """Set the bits for `value`; returns True if at least one was unset (i.e. new)."""
+        bits = self.bits
+        added = False
+        for position in self._positions(value):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, value):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    def to_state(self):
+        return {'capacity': self.capacity, 'error_rate': self.error_rate, 'count': self.count,
+                'bits': base64.b64encode(bytes(self.bits)).decode('ascii')}
+
+    @classmethod
+    def from_state(cls, state):
+        bloom = cls(state['capacity'], state['error_rate'])
+        bloom.bits = bytearray(base64.b64decode(state['bits']))
+        bloom.count = state['count']
+        return bloom
+
+
+class ScalableBloomFilter:
+    """Bloom filter that adds larger, tighter slices as it fills, so capacity need not be known.
+
+    Each new slice has `growth` times the capacity and `tightening` times the
+    error rate of the previous one, keeping the compound false-positive rate
+    below `error_rate / (1 - tightening)`.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=1e-6, growth=2, tightening=0.5):
+        self.initial_capacity = capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.slices = [BloomFilter(capacity, error_rate * (1 - tightening))]
+
+    def add(self, value):
+        if value in self:
+            return False
+        current = self.slices[-1]
+        if current.full:
+            current = BloomFilter(current.capacity * self.growth, current.error_rate * self.tightening)
+            self.slices.append(current)
+        current.add(value)
+        return True
+
+    def __contains__(self, value):
+        return any(value in bloom for bloom in reversed(self.slices))
+
+    def __len__(self):
+        return sum(bloom.count for bloom in self.slices)
+
+    @property
+    def nbytes(self):
+        return sum(len(bloom.bits) for bloom in self.slices)
+
+    def to_state(self):
+        return {'kind': 'bloom', 'capacity': self.initial_capacity, 'error_rate': self.error_rate,
+                'growth': self.growth, 'tightening': self.tightening,
+                'slices': [bloom.to_state() for bloom in self.slices]}
+
+    @classmethod
+    def from_state(cls, state):
+        bloom = cls(state['capacity'], state['error_rate'], state['growth'], state['tightening'])
+        bloom.slices = [BloomFilter.from_state(s) for s in state['slices']]
+        return bloom
+
+
+class CompactURLSet:
+    """Set-like URL store that keeps 64-bit hashes of canonical URLs instead of strings.
+
+    Drop-in for the URL sets URLBreacher keeps: `add`, `update`, `in` and
+    `len` work as on a set, and `drain_new()` hands the URLs added since the
+    last call to the result sink (as TrackedURLSet does). Membership uses a
+    HashSet, or a ScalableBloomFilter with `bloom=True` (smaller, with rare
+    false positives - fine for a visited check). The strings themselves are
+    only kept if `spill_path` is given: they are appended to that file, which
+    backs iteration.
+    """
+
+    def __init__(self, capacity=1024, bloom=False, error_rate=1e-6, spill_path=None, track_new=True,
+                 canonicalize=_canonicalizer.canonicalize):
+        self.canonicalize = canonicalize
+        self._hashes = ScalableBloomFilter(max(capacity, 1024), error_rate) if bloom else HashSet(capacity)
+        self._count = 0
+        self._new = [] if track_new else None
+        self.spill_path = spill_path
+        # The spill file mirrors this process's set, so it starts empty
+        self._spill = open(spill_path, 'w+', encoding='utf-8') if spill_path else None
+
+    def hash(self, url):
+        return url_hash(self.canonicalize(url))
+
+    def add(self, url):
+        return self._add(url, track=True)
+
+    def _add(self, url, track):
+        if not self._hashes.add(self.hash(url)):
+            return False
+        self._count += 1
+        if track and self._new is not None:
+            self._new.append(url)
+        if self._spill is not None:
+            self._spill.write(url + '\n')
+        return True
+
+    def update(self, *iterables):
+        for iterable in iterables:
+            for url in iterable:
+                self._add(url, track=True)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def restore(self, urls):
+        """Add members that are already persisted (e.g. on resume) without marking them new."""
+        for url in urls:
+            self._add(url, track=False)
+
+    @property
+    def pending(self):
+        return len(self._new) if self._new is not None else 0
+
+    def drain_new(self):
+        new, self._new = self._new or [], ([] if self._new is not None else None)
+        return new
+
+    def __contains__(self, url):
+        return self.hash(url) in self._hashes
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        if self._spill is None:
+            raise TypeError("CompactURLSet keeps only hashes; pass spill_path to iterate over URLs")
+        self._spill.flush()
+        with open(self.spill_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield line.rstrip('\n')
+
+    @property
+    def nbytes(self):
+        """Bytes held in memory by the membership structure."""
+        return self._hashes.nbytes
+
+    def to_state(self):
+        return dict(self._hashes.to_state(), members=self._count)
+
+    def load_state(self, state):
+        """Replace the membership structure with one saved by `to_state()`."""
+        self._hashes = ScalableBloomFilter.from_state(state) if state['kind'] == 'bloom' else HashSet.from_state(state)
+        self._count = state['members']
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+
+
+def dump_url_set(urls):
+    """JSON-serializable form of a URL set (plain set or CompactURLSet) for checkpoints."""
+    return urls.to_state() if isinstance(urls, CompactURLSet) else list(urls)
+
+
+def load_url_set(urls, state):
+    """Load checkpointed members saved by dump_url_set into `urls`."""
+    if isinstance(state, list):
+        urls.update(state)
+    elif isinstance(urls, CompactURLSet):
+        urls.load_state(state)
+    else:
+        raise ValueError("Checkpoint holds a compact URL store; resume with url_store='compact' or 'bloom'")